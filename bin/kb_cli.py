@@ -11,7 +11,6 @@ Usage:
 
 import sys
 import os
-import platform
 import argparse
 from pathlib import Path
 
@@ -28,18 +27,8 @@ SCRIPT_DIR = Path(__file__).parent
 LIB_DIR = SCRIPT_DIR / "lib"
 sys.path.insert(0, str(LIB_DIR))
 
-# Import KB modules
-try:
-    from kb_search import search_kb
-    from kb_add import add_entry
-    from kb_index import update_index
-    from kb_stats import show_stats
-    from kb_list import list_entries
-    from kb_compound import compound_operation
-except ImportError as e:
-    print(f"Error: Could not import KB modules: {e}")
-    print(f"Make sure all required files are in {LIB_DIR}")
-    sys.exit(1)
+# KB modules are imported by the command handlers below (see COMMANDS),
+# so each invocation only loads what its command needs
 
 
 class Colors:
@@ -70,7 +59,7 @@ class Colors:
     @staticmethod
     def enable_windows_colors():
         """Enable ANSI colors on Windows"""
-        if platform.system() == 'Windows':
+        if sys.platform == 'win32':
             try:
                 import ctypes
                 kernel32 = ctypes.windll.kernel32
@@ -98,22 +87,44 @@ def print_help():
     print()
     print(f"  {Colors.WHITE}search <term>{Colors.RESET}        🔍 Search knowledge base")
     print(f"                          Example: kb search 'react hydration'")
+    print(f"                          Ranked:  kb search --ranked -k 5 'react hydration'")
+    print(f"                          Typos:   kb search --fuzzy 'authentcation'")
+    print(f"                          Meaning: kb search --semantic 'login keeps redirecting'")
+    print(f"                          Any of:  kb search -e oauth -e jwt -e session")
+    print(f"                          Stream:  kb search --limit 5 --json-lines oauth")
     print()
     print(f"  {Colors.WHITE}add{Colors.RESET}                  ➕ Add new entry (interactive)")
     print(f"                          Example: kb add")
+    print(f"                          Bulk: kb add --from-jsonl entries.jsonl")
     print()
-    print(f"  {Colors.WHITE}index{Colors.RESET}                📇 Update INDEX.md")
-    print(f"                          Example: kb index")
+    print(f"  {Colors.WHITE}index [--jobs N]{Colors.RESET}     📇 Update INDEX.md (incremental, writes only on change)")
+    print(f"                          Options: --full (rebuild), --watch [--interval S], --semantic (vectors)")
+    print(f"                          Example: kb index --jobs 8")
     print()
-    print(f"  {Colors.WHITE}stats{Colors.RESET}                📊 Show statistics")
+    print(f"  {Colors.WHITE}stats [--jobs N]{Colors.RESET}     📊 Show statistics")
+    print(f"                          Options: --verify (recount stored totals, rebuild on drift)")
     print(f"                          Example: kb stats")
+    print(f"                          Snapshot: kb stats --snapshot kb-snapshot.kbsnap")
     print()
     print(f"  {Colors.WHITE}list [category]{Colors.RESET}      📋 List all entries (optional: by category)")
+    print(f"                          Options: --sort name|modified|date|priority|title,")
+    print(f"                                   --page-size N [--page P | --cursor C], --refresh")
     print(f"                          Example: kb list bugs")
+    print(f"                          Paged:   kb list --sort date --page-size 20")
     print()
     print(f"  {Colors.WHITE}recent [n]{Colors.RESET}           📅 Show recent entries (default: 10)")
     print(f"                          Example: kb recent 5")
     print()
+    print(f"  {Colors.WHITE}export [file]{Colors.RESET}        📦 Pack all entries into one compressed snapshot")
+    print(f"                          Example: kb export backup.kbsnap")
+    print()
+    print(f"  {Colors.WHITE}import [file]{Colors.RESET}        📦 Restore a snapshot (idempotent, --overwrite, --dry-run)")
+    print(f"                          Example: kb import backup.kbsnap")
+    print()
+    print(f"  {Colors.WHITE}serve{Colors.RESET}                🛰️  Keep a warm index in memory (Unix socket)")
+    print(f"                          search/list/recent/stats use it automatically")
+    print(f"                          Example: kb serve --interval 2 | kb serve --stop")
+    print()
     print(f"  {Colors.MAGENTA}{Colors.BOLD}compound <action>{Colors.RESET}    🧠 Compound mode with Neo4j integration")
     print(f"                          Example: kb compound search 'oauth'")
     print()
@@ -125,6 +136,8 @@ def print_help():
     print(f"  compound sync           - Full sync to Neo4j brain")
     print(f"  compound query <term>   - Intelligent Neo4j query")
     print(f"  compound stats          - Show compound system health")
+    print(f"  compound ... --timings  - Show per-phase latency")
+    print(f"  compound search <term> --timeout S - Wait at most S seconds for Neo4j")
     print()
     print(f"{Colors.YELLOW}{Colors.BOLD}Examples:{Colors.RESET}")
     print(f"  kb search oauth")
@@ -144,6 +157,149 @@ def print_help():
     print()
 
 
+def parse_stats_args(argv: list) -> argparse.Namespace:
+    """Parse `kb stats` options"""
+    parser = argparse.ArgumentParser(prog='kb stats', add_help=False)
+    parser.add_argument('value', nargs='?')
+    parser.add_argument('-j', '--jobs', type=int, default=1)
+    parser.add_argument('--snapshot', help='Read metadata from a kb export snapshot')
+    parser.add_argument('--verify', action='store_true',
+                        help='Recount the aggregate store and rebuild it if it drifted')
+    return parser.parse_args(argv)
+
+
+def run_help(args: list):
+    """kb help"""
+    print_help()
+
+
+def run_search(args: list):
+    """kb search"""
+    from kb_search import search_kb, parse_search_args, search_terms
+    from kb_daemon import forward
+    
+    search_args = parse_search_args(args)
+    terms = search_terms(search_args)
+    if not terms:
+        print(f"{Colors.RED}❌ Search term required!{Colors.RESET}")
+        print(f"{Colors.YELLOW}Usage: kb search [--ranked|--fuzzy|--semantic] [-k N] [-n N] [--json-lines] [-e term]... 'term'{Colors.RESET}")
+        sys.exit(1)
+    if not forward(['search'] + args):
+        search_kb(terms, ranked=search_args.ranked, top_k=search_args.top,
+                  jobs=search_args.jobs, limit=search_args.limit,
+                  json_lines=search_args.json_lines, fuzzy=search_args.fuzzy,
+                  semantic=search_args.semantic)
+
+
+def run_add(args: list):
+    """kb add"""
+    from kb_add import add_entry, add_from_jsonl, parse_add_args
+    
+    add_args = parse_add_args(args)
+    if add_args.from_jsonl:
+        add_from_jsonl(add_args.from_jsonl)
+    else:
+        add_entry()
+
+
+def run_index(args: list):
+    """kb index"""
+    from kb_index import update_index, watch_index, parse_index_args
+    
+    index_args = parse_index_args(args)
+    if index_args.watch:
+        watch_index(jobs=index_args.jobs, interval=index_args.interval,
+                    debounce=index_args.debounce)
+    else:
+        update_index(jobs=index_args.jobs, full=index_args.full,
+                     semantic=index_args.semantic)
+
+
+def run_stats(args: list):
+    """kb stats"""
+    from kb_daemon import forward
+    from kb_stats import show_stats
+    
+    stats_args = parse_stats_args(args)
+    if stats_args.snapshot:
+        from kb_snapshot import load_snapshot
+        show_stats(cache=load_snapshot(stats_args.snapshot), verify=stats_args.verify)
+    elif not forward(['stats'] + args):
+        show_stats(jobs=stats_args.jobs, verify=stats_args.verify)
+
+
+def listing_handler(command: str):
+    """kb list / kb recent"""
+    def run(args: list):
+        from kb_daemon import forward
+        from kb_list import list_command, parse_list_args
+        
+        list_args = parse_list_args(command, args)
+        if list_args.snapshot:
+            from kb_snapshot import load_snapshot
+            list_command(command, list_args, cache=load_snapshot(list_args.snapshot))
+        elif not forward([command] + args):
+            list_command(command, list_args)
+    return run
+
+
+def run_export(args: list):
+    """kb export"""
+    from kb_snapshot import export_command
+    export_command(args)
+
+
+def run_import(args: list):
+    """kb import"""
+    from kb_snapshot import import_command
+    import_command(args)
+
+
+def run_serve(args: list):
+    """kb serve"""
+    from kb_daemon import serve_command
+    serve_command(args)
+
+
+def run_compound(args: list):
+    """kb compound"""
+    if not args:
+        print(f"{Colors.RED}❌ Compound action required!{Colors.RESET}")
+        print(f"{Colors.YELLOW}Usage: kb compound [search|add|sync|query|stats]{Colors.RESET}")
+        sys.exit(1)
+    
+    from kb_compound import compound_operation, parse_compound_args
+    
+    compound_args = parse_compound_args(args)
+    if compound_args.action in ['search', 'query'] and not compound_args.terms:
+        print(f"{Colors.RED}❌ Search/Query term required!{Colors.RESET}")
+        sys.exit(1)
+    
+    search_term = ' '.join(compound_args.terms) if compound_args.terms else None
+    compound_operation(compound_args.action, search_term, timings=compound_args.timings,
+                       timeouts={'graph': compound_args.timeout})
+
+
+# Subcommand registry: command -> handler(args). Handlers import their KB
+# modules on first call, so `kb help` loads none and `kb search` only the
+# search modules.
+COMMANDS = {
+    'help': run_help,
+    '-h': run_help,
+    '--help': run_help,
+    'search': run_search,
+    'add': run_add,
+    'index': run_index,
+    'stats': run_stats,
+    'list': listing_handler('list'),
+    'recent': listing_handler('recent'),
+    'export': run_export,
+    'import': run_import,
+    'serve': run_serve,
+    'compound': run_compound,
+}
+
+
 def main():
     """Main CLI entry point"""
     Colors.enable_windows_colors()
@@ -154,67 +310,30 @@ def main():
         add_help=False
     )
     parser.add_argument('command', nargs='?', default='help')
-    parser.add_argument('args', nargs='*')
+    parser.add_argument('args', nargs=argparse.REMAINDER)
     
     args = parser.parse_args()
     command = args.command.lower()
-    command_args = args.args
+    
+    handler = COMMANDS.get(command)
+    if handler is None:
+        print(f"{Colors.RED}❌ Unknown command: {command}{Colors.RESET}")
+        print()
+        print_help()
+        sys.exit(1)
     
     try:
-        # Execute command
-        if command == 'help' or command == '-h' or command == '--help':
-            print_help()
-        
-        elif command == 'search':
-            if not command_args:
-                print(f"{Colors.RED}❌ Search term required!{Colors.RESET}")
-                print(f"{Colors.YELLOW}Usage: kb search 'term'{Colors.RESET}")
-                sys.exit(1)
-            search_term = ' '.join(command_args)
-            search_kb(search_term)
-        
-        elif command == 'add':
-            add_entry()
-        
-        elif command == 'index':
-            update_index()
-        
-        elif command == 'stats':
-            show_stats()
-        
-        elif command == 'list':
-            category = command_args[0] if command_args else None
-            list_entries(category)
-        
-        elif command == 'recent':
-            count = int(command_args[0]) if command_args else 10
-            list_entries(recent=count)
-        
-        elif command == 'compound':
-            if not command_args:
-                print(f"{Colors.RED}❌ Compound action required!{Colors.RESET}")
-                print(f"{Colors.YELLOW}Usage: kb compound [search|add|sync|query|stats]{Colors.RESET}")
-                sys.exit(1)
-            
-            action = command_args[0].lower()
-            action_args = command_args[1:] if len(command_args) > 1 else []
-            
-            if action in ['search', 'query'] and not action_args:
-                print(f"{Colors.RED}❌ Search/Query term required!{Colors.RESET}")
-                sys.exit(1)
-            
-            search_term = ' '.join(action_args) if action_args else None
-            compound_operation(action, search_term)
-        
-        else:
-            print(f"{Colors.RED}❌ Unknown command: {command}{Colors.RESET}")
-            print()
-            print_help()
-            sys.exit(1)
+        handler(args.args)
     
     except KeyboardInterrupt:
         print(f"\n{Colors.YELLOW}⚠️  Operation cancelled by user{Colors.RESET}")
         sys.exit(0)
+    except ImportError as e:
+        if not (e.name or '').startswith('kb_'):
+            raise
+        print(f"Error: Could not import KB modules: {e}")
+        print(f"Make sure all required files are in {LIB_DIR}")
+        sys.exit(1)
     except Exception as e:
         print(f"{Colors.RED}❌ Error: {e}{Colors.RESET}")
         import traceback
@@ -4,14 +4,293 @@ Cross-platform entry creation
 """
 
 import os
+import re
+import sys
+import json
+import argparse
 import subprocess
 from pathlib import Path
 from datetime import datetime
+from typing import Dict, List, Optional
 from kb_common import (
-    KBConfig, Colors, print_header, print_success, print_error, print_info
+    KBConfig, Colors, load_json, write_json_atomic, scan_changed_dirs,
+    print_header, print_success, print_error, print_info, print_warning
 )
 
 
+CATEGORIES = ('bug', 'feature', 'architecture', 'security', 'performance', 'platform')
+PRIORITIES = ('critical', 'high', 'medium', 'low')
+
+DATE_PATTERN = re.compile(r'\d{4}-\d{2}-\d{2}')  # used with fullmatch
+
+# Characters that would end a double-quoted frontmatter value or its line
+UNSAFE_SCALAR = re.compile(r'["\\\x00-\x1f\x7f]')
+
+# KB-<date>-<id>-<slug>.md
+ENTRY_ID_PATTERN = re.compile(r'^KB-(\d{4}-\d{2}-\d{2})-(\d+)-')
+
+# Tags go into an inline [a, b] list and a '#tag' line
+TAG_PATTERN = re.compile(r'\w[\w.+#/-]*(?: [\w.+#/-]+)*')
+
+# JSON types accepted for each `kb add --from-jsonl` field
+JSONL_FIELD_TYPES = {
+    'title': (str,),
+    'category': (str,),
+    'priority': (str,),
+    'date': (str,),
+    'tags': (list, str),
+    'attempts': (int,),
+    'time_saved': (str,),
+    'body': (str, type(None)),
+}
+JSON_TYPE_NAMES = {str: 'string', list: 'array', int: 'number', type(None): 'null'}
+
+# Sections of a new entry, filled in by hand after `kb add`
+ENTRY_BODY_TEMPLATE = """## Problem
+
+[Describe the problem clearly]
+
+## What Didn't Work
+
+[Document failed attempts - this is valuable learning!]
+
+1. **Attempt 1:**
+   - What was tried
+   - Why it failed
+
+## Root Cause
+
+[What actually caused the problem]
+
+## Solution
+
+[Step-by-step solution that worked]
+
+### Implementation
+
+```
+[Code or configuration that solved it]
+```
+
+## Prevention
+
+[How to avoid this in the future]
+
+## Related Patterns
+
+[Links to similar issues or patterns]
+
+---
+
+## Skills Required
+
+- **Skill 1** - Description
+- **Skill 2** - Description
+
+## Technologies Used
+
+- Technology 1
+- Technology 2"""
+
+
+class EntryIdAllocator:
+    """
+    Per-day KB ID allocation, O(1) and safe under concurrent writers
+    
+    Each ID is claimed by atomically creating a reservation file
+    (.agent/knowledge-base/.cache/ids/<date>/<id>) with O_CREAT | O_EXCL,
+    so two writers can never get the same ID and no lock is held. The
+    per-day counter (.cache/ids/<date>.json) only says where to start
+    trying: a stale or lost counter costs a few retries, never a
+    collision. A day without a counter is seeded once from the highest
+    ID already on disk for that date.
+    
+    Entries can also arrive without a reservation (`git pull`, or a copy
+    by hand). Before its first allocation the allocator lists the KB
+    directories whose mtime changed since it last looked
+    (.cache/ids/dirs.json, see scan_changed_dirs) and moves counters past
+    any IDs found there; unchanged directories cost one stat().
+    `kb import` reserves the IDs it writes (see reserve()).
+    
+    With autosave=False the counters are written by save() only, which
+    bulk adds call once at the end instead of once per entry.
+    """
+    
+    def __init__(self, config: KBConfig, autosave: bool = True):
+        self.root_dir = config.root_dir
+        self.kb_path = config.get_kb_path()
+        self.cache_dir = config.get_cache_dir()
+        self.ids_dir = self.cache_dir / "ids"
+        self.autosave = autosave
+        self.next_ids: Dict[str, int] = {}
+        self.dirty = set()
+        self.caught_up = False
+    
+    def _counter_path(self, date_str: str) -> Path:
+        return self.ids_dir / f"{date_str}.json"
+    
+    def _seed(self, date_str: str) -> int:
+        """Highest ID used on disk for a date, plus one"""
+        used = [0]
+        for path in self.kb_path.rglob(f"KB-{date_str}-*.md"):
+            match = ENTRY_ID_PATTERN.match(path.name)
+            if match and match.group(1) == date_str:
+                used.append(int(match.group(2)))
+        return max(used) + 1
+    
+    def _counter(self, date_str: str) -> Optional[int]:
+        """Next ID from this allocator or the persisted counter (None if the day has none)"""
+        if date_str in self.next_ids:
+            return self.next_ids[date_str]
+        counter = load_json(self._counter_path(date_str))
+        if isinstance(counter, dict) and isinstance(counter.get('next'), int):
+            return max(1, counter['next'])
+        return None
+    
+    def _start(self, date_str: str) -> int:
+        """First ID worth trying for a date"""
+        counter = self._counter(date_str)
+        return self._seed(date_str) if counter is None else counter
+    
+    def _bump(self, date_str: str, entry_id: int):
+        """Move a day's counter past an ID known to be taken"""
+        counter = self._counter(date_str)
+        if counter is not None and counter <= entry_id:
+            self.next_ids[date_str] = entry_id + 1
+            self.dirty.add(date_str)
+    
+    def catch_up(self):
+        """Move counters past IDs that appeared on disk without a reservation"""
+        if self.caught_up:
+            return
+        self.caught_up = True
+        state_path = self.ids_dir / "dirs.json"
+        dirs = load_json(state_path, {})
+        if not isinstance(dirs, dict):
+            dirs = {}
+        
+        def key(path: Path) -> str:
+            return path.relative_to(self.root_dir).as_posix()
+        
+        files, changed = scan_changed_dirs(self.kb_path, dirs, key, skip=self.cache_dir)
+        highest: Dict[str, int] = {}
+        for path in files:
+            match = ENTRY_ID_PATTERN.match(path.name)
+            if match:
+                date_str, entry_id = match.group(1), int(match.group(2))
+                highest[date_str] = max(highest.get(date_str, 0), entry_id)
+        # Days without a counter are seeded from the whole tree anyway
+        for date_str, entry_id in highest.items():
+            self._bump(date_str, entry_id)
+        if changed:
+            write_json_atomic(state_path, dirs)
+    
+    def reserve(self, date_str: str, entry_id: int):
+        """Mark an ID written by something other than allocate() as taken"""
+        day_dir = self.ids_dir / date_str
+        day_dir.mkdir(parents=True, exist_ok=True)
+        try:
+            os.close(os.open(day_dir / str(entry_id), os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+        except FileExistsError:
+            pass
+        self._bump(date_str, entry_id)
+        if self.autosave:
+            self.save()
+    
+    def allocate(self, date_str: str) -> int:
+        """Claim the next free ID for a date"""
+        self.catch_up()
+        day_dir = self.ids_dir / date_str
+        day_dir.mkdir(parents=True, exist_ok=True)
+        
+        entry_id = self._start(date_str)
+        while True:
+            try:
+                fd = os.open(day_dir / str(entry_id), os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except FileExistsError:
+                entry_id += 1
+                continue
+            os.close(fd)
+            break
+        
+        self.next_ids[date_str] = entry_id + 1
+        self.dirty.add(date_str)
+        if self.autosave:
+            self.save()
+        return entry_id
+    
+    def save(self):
+        """Persist the counters of days allocated from since the last save"""
+        for date_str in sorted(self.dirty):
+            write_json_atomic(self._counter_path(date_str), {'next': self.next_ids[date_str]})
+        self.dirty.clear()
+
+
+def slugify(title: str) -> str:
+    """Filename slug for an entry title"""
+    title_slug = title.lower().replace(' ', '-')[:50]
+    return ''.join(c for c in title_slug if c.isalnum() or c == '-')
+
+
+def get_entry_folder(kb_path: Path, category: str, priority: str) -> Path:
+    """Folder an entry belongs in, based on category and priority"""
+    if category == 'bug':
+        return kb_path / 'bugs' / priority
+    elif category == 'feature':
+        return kb_path / 'features'
+    return kb_path / category
+
+
+def render_entry(title: str, category: str, priority: str, date_str: str,
+                 tags_list: List[str], attempts: str = "1", time_saved: str = "1 hour",
+                 body: Optional[str] = None) -> str:
+    """Markdown for a new entry (body defaults to the section template)"""
+    return f"""---
+title: "{title}"
+category: {category}
+priority: {priority}
+sprint: sprint-current
+date: {date_str}
+tags: [{', '.join(tags_list)}]
+related_files: []
+attempts: {attempts}
+time_saved: "{time_saved}"
+---
+
+# {title}
+
+**Date:** {date_str}  
+**Category:** {category}  
+**Priority:** {priority}  
+**Prepared By:** @DEV
+
+---
+
+{body.strip() if body else ENTRY_BODY_TEMPLATE}
+
+---
+
+#{'#'.join(tags_list)}
+"""
+
+
+def create_entry(config: KBConfig, allocator: EntryIdAllocator, title: str,
+                 category: str, priority: str, date_str: str, tags_list: List[str],
+                 **fields) -> Path:
+    """Allocate an ID and write a new entry file; returns its path"""
+    entry_id = allocator.allocate(date_str)
+    filename = f"KB-{date_str}-{entry_id:03d}-{slugify(title)}.md"
+    
+    folder = get_entry_folder(config.get_kb_path(), category, priority)
+    folder.mkdir(parents=True, exist_ok=True)
+    file_path = folder / filename
+    
+    # 'x': the ID is reserved, so an existing file here is a real conflict
+    with open(file_path, 'x', encoding='utf-8') as f:
+        f.write(render_entry(title, category, priority, date_str, tags_list, **fields))
+    return file_path
+
+
 def add_entry():
     """Add new KB entry interactively"""
     config = KBConfig()
@@ -73,106 +352,13 @@ def add_entry():
     attempts = input(f"{Colors.WHITE}Attempts to solve (default: 1): {Colors.RESET}").strip() or "1"
     time_saved = input(f"{Colors.WHITE}Time saved (e.g., '2 hours'): {Colors.RESET}").strip() or "1 hour"
     
-    # Generate filename
+    # Allocate ID and write file
     date_str = datetime.now().strftime('%Y-%m-%d')
-    title_slug = title.lower().replace(' ', '-')[:50]
-    title_slug = ''.join(c for c in title_slug if c.isalnum() or c == '-')
-    
-    # Find next ID for today
-    kb_path = config.get_kb_path()
-    existing = list(kb_path.rglob(f"KB-{date_str}-*.md"))
-    next_id = len(existing) + 1
-    
-    filename = f"KB-{date_str}-{next_id:03d}-{title_slug}.md"
-    
-    # Determine folder based on category and priority
-    if category == 'bug':
-        folder = kb_path / 'bugs' / priority
-    elif category == 'feature':
-        folder = kb_path / 'features'
-    else:
-        folder = kb_path / category
-    
-    folder.mkdir(parents=True, exist_ok=True)
-    file_path = folder / filename
-    
-    # Create entry content
     tags_list = [t.strip() for t in tags.split(',') if t.strip()]
-    
-    content = f"""---
-title: "{title}"
-category: {category}
-priority: {priority}
-sprint: sprint-current
-date: {date_str}
-tags: [{', '.join(tags_list)}]
-related_files: []
-attempts: {attempts}
-time_saved: "{time_saved}"
----
-
-# {title}
-
-**Date:** {date_str}  
-**Category:** {category}  
-**Priority:** {priority}  
-**Prepared By:** @DEV
-
----
-
-## Problem
-
-[Describe the problem clearly]
-
-## What Didn't Work
-
-[Document failed attempts - this is valuable learning!]
-
-1. **Attempt 1:**
-   - What was tried
-   - Why it failed
-
-## Root Cause
-
-[What actually caused the problem]
-
-## Solution
-
-[Step-by-step solution that worked]
-
-### Implementation
-
-```
-[Code or configuration that solved it]
-```
-
-## Prevention
-
-[How to avoid this in the future]
-
-## Related Patterns
-
-[Links to similar issues or patterns]
-
----
-
-## Skills Required
-
-- **Skill 1** - Description
-- **Skill 2** - Description
-
-## Technologies Used
-
-- Technology 1
-- Technology 2
-
----
-
-#{'#'.join(tags_list)}
-"""
-    
-    # Write file
-    file_path.write_text(content, encoding='utf-8')
+    file_path = create_entry(
+        config, EntryIdAllocator(config), title, category, priority, date_str, tags_list,
+        attempts=attempts, time_saved=time_saved
+    )
     
     print()
     print_success("Entry Created Successfully!")
@@ -201,3 +387,115 @@ time_saved: "{time_saved}"
                     continue
     except:
         print_info(f"Please edit the file manually: {file_path}")
+
+
+def parse_jsonl_record(record: Dict, today: str) -> Dict:
+    """
+    Validate one `kb add --from-jsonl` record.
+    
+    Required: title. Optional: category, priority, date (YYYY-MM-DD,
+    default today), tags (list or comma-separated), attempts (number),
+    time_saved, body (replaces the section template). Raises ValueError
+    if invalid, including fields of the wrong JSON type (see
+    JSONL_FIELD_TYPES) and single-line fields that could break out of
+    the frontmatter (line breaks, quotes, control characters).
+    """
+    if not isinstance(record, dict):
+        raise ValueError("expected a JSON object")
+    for field, types in JSONL_FIELD_TYPES.items():
+        value = record.get(field)
+        if field in record and (not isinstance(value, types) or isinstance(value, bool)):
+            names = ' or '.join(JSON_TYPE_NAMES[t] for t in types)
+            raise ValueError(f"'{field}' must be a {names}, not {json.dumps(value)}")
+    if isinstance(record.get('tags'), list) and not all(isinstance(t, str) for t in record['tags']):
+        raise ValueError("'tags' must contain only strings")
+    title = record.get('title', '').strip()
+    if not title:
+        raise ValueError("title is required")
+    time_saved = record.get('time_saved', '1 hour').strip()
+    for field, value in (('title', title), ('time_saved', time_saved)):
+        if UNSAFE_SCALAR.search(value):
+            raise ValueError(f"'{field}' must be one line without quotes or backslashes, "
+                             f"not {json.dumps(value)}")
+    attempts = record.get('attempts', 1)
+    if attempts < 0:
+        raise ValueError(f"'attempts' must not be negative, not {attempts}")
+    
+    category = record.get('category', 'feature')
+    if category not in CATEGORIES:
+        raise ValueError(f"unknown category '{category}'")
+    priority = record.get('priority', 'medium')
+    if priority not in PRIORITIES:
+        raise ValueError(f"unknown priority '{priority}'")
+    date_str = record.get('date', today)
+    if not DATE_PATTERN.fullmatch(date_str):
+        raise ValueError(f"invalid date {json.dumps(date_str)}")
+    
+    tags = record.get('tags', [])
+    if isinstance(tags, str):
+        tags = tags.split(',')
+    tags = [tag.strip() for tag in tags if tag.strip()]
+    for tag in tags:
+        if not TAG_PATTERN.fullmatch(tag):
+            raise ValueError(f"invalid tag {json.dumps(tag)} (letters, digits, spaces and . + # / - only)")
+    return {
+        'title': title,
+        'category': category,
+        'priority': priority,
+        'date_str': date_str,
+        'tags_list': tags,
+        'attempts': str(attempts),
+        'time_saved': time_saved,
+        'body': record.get('body'),
+    }
+
+
+def add_from_jsonl(source: str) -> List[Path]:
+    """
+    Create one entry per line of a JSON Lines file ('-' for stdin).
+    
+    Entries are written in a single pass with one allocator, so each
+    costs one reservation and one file write; the day counters are saved
+    once at the end. Invalid lines are reported and skipped. Returns the
+    created paths.
+    """
+    config = KBConfig()
+    Colors.enable_windows()
+    
+    print_header("📝 Knowledge Base - Bulk Add", f"From {source}")
+    
+    allocator = EntryIdAllocator(config, autosave=False)
+    today = datetime.now().strftime('%Y-%m-%d')
+    created = []
+    skipped = 0
+    
+    stream = sys.stdin if source == '-' else open(source, encoding='utf-8')
+    try:
+        for line_no, line in enumerate(stream, 1):
+            if not line.strip():
+                continue
+            try:
+                fields = parse_jsonl_record(json.loads(line), today)
+            except ValueError as e:
+                print_warning(f"Line {line_no}: {e}")
+                skipped += 1
+                continue
+            created.append(create_entry(config, allocator, **fields))
+    finally:
+        allocator.save()
+        if stream is not sys.stdin:
+            stream.close()
+    
+    print_success(f"Created {len(created)} entries" + (f" ({skipped} skipped)" if skipped else ""))
+    if created:
+        print_info(f"Run {Colors.MAGENTA}kb index{Colors.RESET} to update INDEX.md")
+    print()
+    return created
+
+
+def parse_add_args(argv: List[str]) -> argparse.Namespace:
+    """Parse `kb add` arguments"""
+    parser = argparse.ArgumentParser(prog='kb add', add_help=False)
+    parser.add_argument('--from-jsonl', metavar='FILE',
+                        help="Create entries from a JSON Lines file ('-' for stdin)")
+    return parser.parse_args(argv)
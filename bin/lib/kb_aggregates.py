@@ -0,0 +1,249 @@
+"""
+KB Aggregates Module
+Persisted group-by counts and totals, updated incrementally from the manifest
+"""
+
+import bisect
+import heapq
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+from kb_common import KBConfig, load_json, write_json_atomic
+
+
+AGGREGATES_VERSION = 2
+
+# facts(key, metadata) -> (buckets, amounts), or None to leave an entry out.
+# buckets: table name -> bucket (None = not counted in that table)
+# amounts: total name -> number
+Facts = Tuple[Dict[str, Optional[str]], Dict[str, float]]
+FactsFunction = Callable[[str, Optional[Dict]], Optional[Facts]]
+
+# Totals are rounded so adding and subtracting floats cannot drift
+TOTAL_PRECISION = 9
+
+# Most recently modified entries kept in the store (see AggregateStore.recent)
+RECENT_KEPT = 20
+
+
+def as_bucket(value) -> str:
+    """Bucket name for a frontmatter value"""
+    return value if isinstance(value, str) else str(value)
+
+
+class AggregateStore:
+    """
+    Histograms and totals kept up to date from a manifest cache
+
+    A consumer describes each entry with a facts function (see Facts).
+    The store keeps the bucket counts of every table, the totals, and the
+    facts of each entry so a changed or removed entry can be subtracted
+    again. sync() replays the keys the manifest journaled since the
+    generation the store last saw, so it costs O(changed entries) and
+    queries cost O(number of buckets). It falls back to diffing every
+    entry by head hash when the journal cannot tell (another manifest,
+    a trimmed journal, or a cache without one such as a Snapshot).
+
+    Persisted in .agent/knowledge-base/.cache/<name>.json (in memory only
+    if name is None) with the consumer's schema id. A different schema,
+    or tables that fail check(), rebuild the store from the manifest
+    without reading any files.
+    """
+
+    def __init__(self, config: KBConfig, name: Optional[str], facts: FactsFunction,
+                 schema: str):
+        self.path = config.get_cache_dir() / f"{name}.json" if name else None
+        self.facts = facts
+        self.schema = schema
+        self.clear()
+        self.load()
+
+    def clear(self):
+        """Forget all entries"""
+        self.entries: Dict[str, List] = {}           # key -> [hash, buckets, amounts] (None if left out)
+        self.tables: Dict[str, Dict[str, int]] = {}  # table -> bucket -> count
+        self.totals: Dict[str, float] = {}
+        self.count = 0
+        self.recent: List[List] = []                 # [-mtime, key] of the newest counted entries
+        self.manifest: Optional[List] = None         # [id, generation] last synced against
+
+    def load(self) -> bool:
+        """Load the store from disk; an invalid store is discarded"""
+        if self.path is None:
+            return False
+        data = load_json(self.path)
+        if not data or data.get('version') != AGGREGATES_VERSION or data.get('schema') != self.schema:
+            return False
+        self.entries = data.get('entries', {})
+        self.tables = data.get('tables', {})
+        self.totals = data.get('totals', {})
+        self.count = data.get('count', 0)
+        self.recent = data.get('recent', [])
+        self.manifest = data.get('manifest')
+        if not self.check():
+            self.clear()
+            return False
+        return True
+
+    def save(self):
+        """Persist the store to disk"""
+        if self.path is None:
+            return
+        write_json_atomic(self.path, {
+            'version': AGGREGATES_VERSION,
+            'schema': self.schema,
+            'count': self.count,
+            'tables': self.tables,
+            'totals': self.totals,
+            'recent': self.recent,
+            'manifest': self.manifest,
+            'entries': self.entries,
+        })
+
+    def check(self) -> bool:
+        """Cheap consistency check, O(number of buckets)"""
+        if self.count < 0 or self.count > len(self.entries) or len(self.recent) > self.count:
+            return False
+        for counts in self.tables.values():
+            if any(count <= 0 for count in counts.values()) or sum(counts.values()) > self.count:
+                return False
+        return True
+
+    def verify(self) -> bool:
+        """Full consistency check: recount every table from the stored facts"""
+        stored = (self.count, self.tables, self.totals)
+        self.count, self.tables, self.totals = 0, {}, {}
+        for _, buckets, amounts in self.entries.values():
+            if buckets is not None:
+                self._apply(buckets, amounts, 1)
+        recounted = (self.count, self.tables, self.totals)
+        self.count, self.tables, self.totals = stored
+        return recounted == stored
+
+    def _apply(self, buckets: Dict[str, str], amounts: Dict[str, float], sign: int):
+        self.count += sign
+        for table, bucket in buckets.items():
+            counts = self.tables.setdefault(table, {})
+            count = counts.get(bucket, 0) + sign
+            if count:
+                counts[bucket] = count
+            else:
+                counts.pop(bucket, None)
+        for name, amount in amounts.items():
+            self.totals[name] = round(self.totals.get(name, 0) + sign * amount, TOTAL_PRECISION)
+
+    def _add(self, key: str, record: Dict):
+        facts = self.facts(key, record['metadata'])
+        if facts is None:
+            self.entries[key] = [record['hash'], None, None]
+            return
+        buckets = {table: bucket for table, bucket in facts[0].items() if bucket is not None}
+        amounts = dict(facts[1])
+        self.entries[key] = [record['hash'], buckets, amounts]
+        self._apply(buckets, amounts, 1)
+
+    def _remove(self, key: str):
+        _, buckets, amounts = self.entries.pop(key)
+        if buckets is not None:
+            self._apply(buckets, amounts, -1)
+
+    def _note_recent(self, key: str, mtime: Optional[int]):
+        """
+        Move an entry in the recent list (mtime None: it is gone or not counted).
+
+        The list always holds the exact newest len(recent) counted entries;
+        an entry older than its last item is only added while the list
+        still holds every counted entry.
+        """
+        for i, (_, recent_key) in enumerate(self.recent):
+            if recent_key == key:
+                del self.recent[i]
+                break
+        if mtime is None:
+            return
+        item = [-mtime, key]
+        if self.recent and item > self.recent[-1] and len(self.recent) < self.count - 1:
+            return
+        bisect.insort(self.recent, item)
+        del self.recent[RECENT_KEPT:]
+
+    def _refill_recent(self, cache):
+        """Recompute the recent list from the manifest, O(entries)"""
+        self.recent = heapq.nsmallest(RECENT_KEPT, (
+            [-cache.files[key]['mtime'], key]
+            for key, entry in self.entries.items() if entry[1] is not None))
+
+    def _sync_key(self, key: str, record: Optional[Dict], delta: Dict[str, List[str]]):
+        entry = self.entries.get(key)
+        if record is None:
+            if entry:
+                self._remove(key)
+                self._note_recent(key, None)
+                delta['removed'].append(key)
+            return
+        if not entry or entry[0] != record['hash']:
+            if entry:
+                self._remove(key)
+            self._add(key, record)
+            delta['changed' if entry else 'added'].append(key)
+        counted = self.entries[key][1] is not None
+        self._note_recent(key, record['mtime'] if counted else None)
+
+    def sync(self, cache, under: Optional[Path] = None) -> Dict[str, List[str]]:
+        """
+        Apply the manifest's add/modify/delete delta.
+
+        `cache` is a KBCache (or anything with .files and .key()); `under`
+        limits the store to entries in a directory. Returns the delta as
+        {'added': [...], 'changed': [...], 'removed': [...]} (entry keys);
+        the store is saved only if it changed.
+        """
+        delta = {'added': [], 'changed': [], 'removed': []}
+        prefix = cache.key(under).rstrip('/') + '/' if under is not None else ''
+        manifest = None
+        keys = None
+        if hasattr(cache, 'changes_since'):
+            manifest = [cache.id, cache.generation]
+            if self.manifest and self.manifest[0] == cache.id:
+                keys = cache.changes_since(self.manifest[1])
+
+        if keys is None:
+            keys = [k for k in self.entries if k not in cache.files] + list(cache.files)
+        for key in keys:
+            if key.startswith(prefix):
+                self._sync_key(key, cache.files.get(key), delta)
+
+        if len(self.recent) < min(RECENT_KEPT // 2, self.count):
+            self._refill_recent(cache)
+        if any(delta.values()) or manifest != self.manifest:
+            self.manifest = manifest
+            self.save()
+        return delta
+
+    def rebuild(self, cache, under: Optional[Path] = None):
+        """Recompute the store from the manifest"""
+        self.clear()
+        self.sync(cache, under)
+        self.save()
+
+    def table(self, name: str) -> Dict[str, int]:
+        """Bucket counts of a table"""
+        return dict(self.tables.get(name, {}))
+
+    def total(self, name: str) -> float:
+        """Sum of an amount over all entries"""
+        return self.totals.get(name, 0)
+
+    def newest(self, count: int) -> List[str]:
+        """Keys of the most recently modified counted entries, newest first (count <= RECENT_KEPT // 2)"""
+        return [key for _, key in self.recent[:count]]
+
+
+def load_aggregates(config: KBConfig, cache, name: Optional[str], facts: FactsFunction,
+                    schema: str, under: Optional[Path] = None,
+                    verify: bool = False) -> AggregateStore:
+    """Open a store and bring it up to date; with `verify`, rebuild it if it drifted"""
+    store = AggregateStore(config, name, facts, schema)
+    store.sync(cache, under)
+    if verify and not store.verify():
+        store.rebuild(cache, under)
+    return store
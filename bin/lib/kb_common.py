@@ -5,19 +5,26 @@ Cross-platform helper functions
 
 import os
 import re
+import json
+import time
+import bisect
+import fnmatch
+import hashlib
 import platform
+import threading
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
 
 
 class KBConfig:
-    """KB configuration"""
-    def __init__(self):
-        self.root_dir = self._find_project_root()
+    """KB configuration (root_dir: project root, found from the cwd if not given)"""
+    def __init__(self, root_dir: Optional[Path] = None):
+        self.root_dir = Path(root_dir) if root_dir else self._find_project_root()
         self.kb_path = self.root_dir / ".agent" / "knowledge-base"
         self.docs_path = self.root_dir / "docs"
         self.index_path = self.kb_path / "INDEX.md"
+        self.cache_dir = self.kb_path / ".cache"
         self.platform = platform.system()
     
     def _find_project_root(self) -> Path:
@@ -60,6 +67,10 @@ class KBConfig:
         """Get INDEX.md path"""
         return self.index_path
     
+    def get_cache_dir(self) -> Path:
+        """Get directory for generated caches and indexes"""
+        return self.cache_dir
+    
     def is_windows(self) -> bool:
         """Check if running on Windows"""
         return self.platform == 'Windows'
@@ -99,29 +110,125 @@ class Colors:
                 pass
 
 
+FRONTMATTER_DELIMITER = '---'
+FRONTMATTER_CLOSE_PATTERN = re.compile(r'\n---[^\S\n]*$', re.MULTILINE)
+FRONTMATTER_CLOSE_BYTES = re.compile(rb'\n---[^\S\n]*\n')
+
+# Initial prefix read by metadata-only commands (grows if frontmatter is open)
+HEAD_BYTES = 4096
+
+
+def _parse_value(value: str):
+    """Unquote a frontmatter value, expanding inline [a, b] arrays"""
+    value = value.strip().strip('"\'')
+    if value.startswith('[') and value.endswith(']'):
+        items = (item.strip().strip('"\'') for item in value[1:-1].split(','))
+        return [item for item in items if item]
+    return value
+
+
+def parse_frontmatter_lines(lines: Iterable[str]) -> Tuple[Optional[Dict], int]:
+    """
+    Parse YAML frontmatter from an iterable of lines in a single pass.
+    
+    Consumes lines only up to the closing `---`, so the body is never read.
+    Supports the flat subset of YAML used by KB entries: `key: value`,
+    quoted values, inline `[a, b]` arrays and block `- item` lists.
+    
+    Returns (metadata, consumed) where consumed is the number of characters
+    up to and including the closing delimiter line. metadata is None when
+    the file has no closed frontmatter block.
+    """
+    lines = iter(lines)
+    first = next(lines, '')
+    if first.rstrip() != FRONTMATTER_DELIMITER:
+        return None, 0
+    
+    consumed = len(first)
+    metadata = {}
+    list_key = None
+    for line in lines:
+        consumed += len(line)
+        stripped = line.strip()
+        if line.rstrip() == FRONTMATTER_DELIMITER:
+            return metadata, consumed
+        
+        # Block list item under a key with an empty value
+        if list_key and (stripped.startswith('- ') or stripped == '-'):
+            items = metadata[list_key]
+            if not isinstance(items, list):
+                items = metadata[list_key] = []
+            item = _parse_value(stripped[1:])
+            if item:
+                items.append(item)
+            continue
+        
+        # Strict fast path: key: value
+        key, sep, value = line.partition(':')
+        if not sep:
+            continue
+        key = key.strip()
+        value = _parse_value(value)
+        metadata[key] = value
+        list_key = key if value == '' else None
+    
+    return None, consumed
+
+
+def _frontmatter_head(content: str) -> List[str]:
+    """Lines of the frontmatter block, located with a compiled regex (C speed)"""
+    if not content.startswith(FRONTMATTER_DELIMITER):
+        return []
+    closing = FRONTMATTER_CLOSE_PATTERN.search(content, len(FRONTMATTER_DELIMITER))
+    if not closing:
+        return []
+    end = content.find('\n', closing.end()) + 1 or len(content)
+    return content[:end].splitlines(True)
+
+
 def parse_frontmatter(content: str) -> Dict:
     """Parse YAML frontmatter from markdown"""
-    metadata = {}
+    metadata, _ = parse_frontmatter_lines(_frontmatter_head(content))
+    return metadata or {}
+
+
+def split_frontmatter(content: str) -> Tuple[Optional[Dict], str]:
+    """Split markdown into (frontmatter, body); frontmatter is None if absent"""
+    metadata, consumed = parse_frontmatter_lines(_frontmatter_head(content))
+    if metadata is None:
+        return None, content
+    return metadata, content[consumed:]
+
+
+def read_head(file_path: Path, size: int = HEAD_BYTES) -> bytes:
+    """
+    Read a bounded prefix of a file for metadata-only commands.
     
-    # Extract frontmatter
-    frontmatter_match = re.search(r'^---\s*\n(.*?)\n---\s*\n', content, re.DOTALL)
-    if frontmatter_match:
-        frontmatter = frontmatter_match.group(1)
-        
-        # Parse simple YAML
-        for line in frontmatter.split('\n'):
-            if ':' in line:
-                key, value = line.split(':', 1)
-                key = key.strip()
-                value = value.strip().strip('"\'')
-                
-                # Handle arrays
-                if value.startswith('[') and value.endswith(']'):
-                    value = [v.strip().strip('"\'') for v in value[1:-1].split(',')]
-                
-                metadata[key] = value
-    
-    return metadata
+    Reads the first `size` bytes, doubling the read only while the
+    frontmatter block is still open. Unless the whole file was read, the
+    prefix is cut at the last newline so no line or UTF-8 sequence is split.
+    
+    Raises OSError like Path.read_bytes.
+    """
+    with open(file_path, 'rb') as f:
+        head = f.read(size)
+        eof = len(head) < size
+        while not eof and head.startswith(b'---') and not FRONTMATTER_CLOSE_BYTES.search(head):
+            chunk = f.read(len(head))
+            eof = len(chunk) < len(head)
+            head += chunk
+    if eof:
+        return head
+    return head[:head.rfind(b'\n') + 1]
+
+
+def read_frontmatter(file_path: Path) -> Dict:
+    """
+    Read only the frontmatter of a file (see read_head), never the body.
+    
+    Raises OSError / UnicodeDecodeError like Path.read_text.
+    """
+    return parse_frontmatter(read_head(file_path).decode('utf-8'))
 
 
 def get_kb_entries(kb_path: Path, pattern: str = "KB-*.md") -> List[Path]:
@@ -149,9 +256,512 @@ def get_all_kb_entries(paths: List[Path]) -> List[Path]:
     return entries
 
 
-def format_time_ago(file_path: Path) -> str:
+# Directories modified this recently (ns) are rescanned next time: a file
+# added within the same timestamp tick would not change the mtime again
+RACY_WINDOW_NS = 2 * 10**9
+
+
+def scan_changed_dirs(top: Path, dirs: Dict[str, List], key: Callable[[Path], str],
+                      pattern: str = "KB-*.md", skip: Optional[Path] = None
+                      ) -> Tuple[List[Path], List[str]]:
+    """
+    Walk a tree by directory mtime, listing only directories that changed.
+    
+    `dirs` (dir key -> [mtime_ns, [subdir names]], from the previous scan)
+    is updated in place. Unchanged directories cost one stat() and are
+    descended from the stored subdirectory names; `skip` is never entered.
+    Returns the files matching `pattern` in changed directories and the
+    keys of changed or removed directories.
+    """
+    files: List[Path] = []
+    changed: List[str] = []
+    seen = set()
+    now = time.time_ns()
+    stack = [top]
+    while stack:
+        directory = stack.pop()
+        dir_key = key(directory)
+        try:
+            mtime = directory.stat().st_mtime_ns
+        except OSError:
+            continue
+        seen.add(dir_key)
+        known = dirs.get(dir_key)
+        if known and known[0] == mtime:
+            stack.extend(directory / name for name in known[1])
+            continue
+        
+        subdirs = []
+        try:
+            with os.scandir(directory) as it:
+                for entry in it:
+                    if entry.is_dir():
+                        if Path(entry.path) != skip:
+                            subdirs.append(entry.name)
+                    elif fnmatch.fnmatch(entry.name, pattern):
+                        files.append(Path(entry.path))
+        except OSError:
+            continue
+        changed.append(dir_key)
+        dirs[dir_key] = [mtime if now - mtime > RACY_WINDOW_NS else 0, sorted(subdirs)]
+        stack.extend(directory / name for name in subdirs)
+    
+    for dir_key in [k for k in dirs if k not in seen]:
+        del dirs[dir_key]
+        changed.append(dir_key)
+    return files, changed
+
+
+def load_json(path: Path, default=None):
+    """Load JSON file, returning default if missing or unreadable"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return default
+
+
+def write_json_atomic(path: Path, data) -> None:
+    """Write JSON file atomically (temp file + rename)"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+    os.replace(tmp_path, path)
+
+
+# INDEX.md "Last Updated" line, ignored when deciding whether to rewrite it
+LAST_UPDATED_PATTERN = re.compile(r'^\*\*Last Updated:\*\*.*$', re.MULTILINE)
+
+
+def write_text_if_changed(path: Path, content: str, ignore: Optional[re.Pattern] = None) -> bool:
+    """
+    Write a text file only if its content would change.
+    
+    Text matched by `ignore` (e.g. a timestamp) is left out of the
+    comparison. Returns True if the file was written.
+    """
+    try:
+        existing = path.read_text(encoding='utf-8')
+    except (OSError, UnicodeDecodeError):
+        existing = None
+    if existing is not None:
+        normalize = (lambda text: ignore.sub('', text)) if ignore else (lambda text: text)
+        if normalize(existing) == normalize(content):
+            return False
+    path.write_text(content, encoding='utf-8')
+    return True
+
+
+SECTION_PATTERN = re.compile(r'(^##?\s+.+$)', re.MULTILINE)
+
+
+def chunk_markdown(content: str, min_length: int = 100) -> List[Tuple[str, str]]:
+    """
+    Split markdown into (header, text) sections at '#' and '##' headers.
+
+    Text before the first header gets an empty header; sections whose
+    text is not longer than `min_length` characters are dropped.
+    """
+    chunks = []
+    header, text = "", ""
+    for section in SECTION_PATTERN.split(content):
+        if SECTION_PATTERN.match(section):
+            if text and len(text) > min_length:
+                chunks.append((header, text))
+            header, text = section.strip(), ""
+        else:
+            text += section
+    if text and len(text) > min_length:
+        chunks.append((header, text))
+    return chunks
+
+
+# Minimum number of files before scan work is fanned out to pools
+PARALLEL_MIN_FILES = 32
+
+HEADING_PATTERN = re.compile(r'^#\s+(.+)$', re.MULTILINE)
+
+
+def resolve_jobs(jobs: Optional[int]) -> int:
+    """Resolve a --jobs value (0 or None = one per CPU)"""
+    if not jobs:
+        return os.cpu_count() or 1
+    return max(1, jobs)
+
+
+def _read_file(path: Path) -> Optional[Tuple[bytes, str]]:
+    """Read a file and hash its content (thread pool worker)"""
+    try:
+        data = path.read_bytes()
+    except OSError:
+        return None
+    return data, hashlib.sha1(data).hexdigest()
+
+
+def _read_head(path: Path) -> Optional[Tuple[bytes, str]]:
+    """Read a file's bounded prefix and hash it (thread pool worker)"""
+    try:
+        data = read_head(path)
+    except OSError:
+        return None
+    return data, hashlib.sha1(data).hexdigest()
+
+
+def _parse_entry(data: bytes, parser=None) -> Dict:
+    """Parse frontmatter and first heading from raw bytes (process pool worker)"""
+    try:
+        content = data.decode('utf-8')
+    except UnicodeDecodeError:
+        return {'metadata': None, 'heading': None}
+    heading = HEADING_PATTERN.search(content)
+    return {
+        'metadata': (parser or parse_frontmatter)(content),
+        'heading': heading.group(1).strip() if heading else None,
+    }
+
+
+def read_files(paths: List[Path], jobs: int = 1,
+               head_only: bool = False) -> List[Optional[Tuple[bytes, str]]]:
+    """
+    Read and hash files, fanning I/O out over a thread pool.
+    
+    With head_only, only the bounded prefix from read_head() is read.
+    Returns (data, sha1) per path in input order, None for unreadable files.
+    """
+    reader = _read_head if head_only else _read_file
+    jobs = resolve_jobs(jobs)
+    if jobs > 1 and len(paths) >= PARALLEL_MIN_FILES:
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=jobs) as pool:
+            return list(pool.map(reader, paths))
+    return [reader(path) for path in paths]
+
+
+def parse_contents(contents: List[bytes], jobs: int = 1, parser=None) -> List[Dict]:
+    """
+    Parse raw file contents, fanning CPU work out over a process pool.
+    
+    Returns {'metadata', 'heading'} per item in input order. Falls back to
+    the serial path if a process pool cannot be started.
+    """
+    jobs = resolve_jobs(jobs)
+    if jobs > 1 and len(contents) >= PARALLEL_MIN_FILES:
+        # Imported on demand: concurrent.futures.process (multiprocessing)
+        # is the largest part of kb_common's import time
+        from concurrent.futures import ProcessPoolExecutor
+        from concurrent.futures.process import BrokenProcessPool
+        chunksize = max(1, len(contents) // (jobs * 4))
+        try:
+            with ProcessPoolExecutor(max_workers=jobs) as pool:
+                return list(pool.map(_parse_entry, contents, [parser] * len(contents),
+                                     chunksize=chunksize))
+        except (OSError, NotImplementedError, BrokenProcessPool):
+            pass
+    return [_parse_entry(data, parser) for data in contents]
+
+
+def scan_files(paths: List[Path], jobs: int = 1, parser=None,
+               head_only: bool = False) -> List[Optional[Dict]]:
+    """
+    Read, hash and parse files with the parallel scanner.
+    
+    With head_only, only each file's bounded prefix is read and hashed
+    (enough for frontmatter and a leading heading).
+    Returns {'hash', 'metadata', 'heading'} per path in input order (None for
+    unreadable files). Output is identical to the serial path (jobs=1).
+    """
+    raw = read_files(paths, jobs, head_only)
+    parsed = iter(parse_contents([item[0] for item in raw if item], jobs, parser))
+    results = []
+    for item in raw:
+        if item is None:
+            results.append(None)
+        else:
+            entry = next(parsed)
+            entry['hash'] = item[1]
+            results.append(entry)
+    return results
+
+
+MANIFEST_VERSION = 4
+
+# Changed keys kept in the manifest journal (see KBCache.changes_since)
+JOURNAL_LIMIT = 4096
+
+
+class KBCache:
+    """
+    Manifest cache of parsed KB entries shared by all kb_* commands
+
+    Stores (size, mtime, head hash, frontmatter, first heading) per file in
+    .agent/knowledge-base/.cache/manifest.json. Unchanged files cost a
+    single stat(); changed files have only their head (see read_head)
+    re-read, and are re-parsed only when the head hash differs.
+    
+    `name` selects another manifest file, for callers that track a
+    different set of files (see load_documents_cache).
+    
+    Every refresh that changes the manifest bumps `generation` and journals
+    the keys it touched, so derived stores (see kb_aggregates) can catch up
+    from the keys alone. `id` tells manifests apart when one is recreated.
+    """
+    
+    def __init__(self, config: KBConfig, name: str = "manifest"):
+        self.root_dir = config.root_dir
+        self.path = config.get_cache_dir() / f"{name}.json"
+        self.files: Dict[str, Dict] = {}
+        self.id = os.urandom(8).hex()
+        self.generation = 0
+        self.journal: List[List] = []  # [generation, key], oldest first
+        self.journal_from = 0          # journal holds every change after this generation
+        self.load()
+    
+    def load(self) -> bool:
+        """Load manifest from disk"""
+        data = load_json(self.path)
+        if not data or data.get('version') != MANIFEST_VERSION:
+            return False
+        self.files = data.get('files', {})
+        self.id = data.get('id', self.id)
+        self.generation = data.get('generation', 0)
+        self.journal = data.get('journal', [])
+        self.journal_from = data.get('journal_from', 0)
+        return True
+    
+    def save(self):
+        """Persist manifest to disk"""
+        write_json_atomic(self.path, {
+            'version': MANIFEST_VERSION,
+            'id': self.id,
+            'generation': self.generation,
+            'journal_from': self.journal_from,
+            'journal': self.journal,
+            'files': self.files,
+        })
+    
+    @staticmethod
+    def signature(config: KBConfig, name: str = "manifest") -> Optional[List[int]]:
+        """
+        [mtime_ns, size] of a stored manifest, without loading it.
+        
+        None if it is missing or was written too recently to tell a later
+        write in the same timestamp tick apart (see RACY_WINDOW_NS).
+        """
+        try:
+            stat = (config.get_cache_dir() / f"{name}.json").stat()
+        except OSError:
+            return None
+        if time.time_ns() - stat.st_mtime_ns <= RACY_WINDOW_NS:
+            return None
+        return [stat.st_mtime_ns, stat.st_size]
+    
+    def key(self, file_path: Path) -> str:
+        """Manifest key for a file (path relative to project root)"""
+        try:
+            return file_path.relative_to(self.root_dir).as_posix()
+        except ValueError:
+            return file_path.as_posix()
+    
+    def refresh(self, paths: List[Path], jobs: int = 1,
+                within: Optional[Iterable[str]] = None) -> Dict[str, List[Path]]:
+        """
+        Update the manifest so it describes exactly the given files.
+        
+        Changed files are read and parsed with scan workers when jobs > 1.
+        With `within` (directory keys), only files directly in those
+        directories are updated or removed; the rest are left untouched.
+        Returns the delta as {'added': [...], 'changed': [...], 'removed': [...],
+        'touched': [...]} (touched: new mtime, same content).
+        """
+        delta = {'added': [], 'changed': [], 'removed': [], 'touched': []}
+        current = {self.key(path): path for path in paths}
+        scope = set(within) if within is not None else None
+        dirty = False
+        
+        for key in [k for k in self.files if k not in current
+                    and (scope is None or k.rpartition('/')[0] in scope)]:
+            del self.files[key]
+            delta['removed'].append(self.root_dir / key)
+            dirty = True
+        
+        stale = []
+        for key, path in current.items():
+            try:
+                stat = path.stat()
+            except OSError:
+                if self.files.pop(key, None) is not None:
+                    delta['removed'].append(path)
+                    dirty = True
+                continue
+            
+            record = self.files.get(key)
+            if record and record['size'] == stat.st_size and record['mtime'] == stat.st_mtime_ns:
+                continue
+            stale.append((key, path, stat, record))
+        
+        # Read + hash stale heads, then parse only those whose head changed
+        to_parse = []
+        heads = read_files([s[1] for s in stale], jobs, head_only=True)
+        for (key, path, stat, record), item in zip(stale, heads):
+            if item is None:
+                continue
+            data, content_hash = item
+            if record and record['hash'] == content_hash:
+                # Touched but unchanged - keep parsed metadata
+                record['size'], record['mtime'] = stat.st_size, stat.st_mtime_ns
+                delta['touched'].append(path)
+            else:
+                to_parse.append((key, path, stat, record, data, content_hash))
+            dirty = True
+        
+        parsed = parse_contents([t[4] for t in to_parse], jobs)
+        for (key, path, stat, record, _, content_hash), entry in zip(to_parse, parsed):
+            delta['changed' if record else 'added'].append(path)
+            self.files[key] = {
+                'size': stat.st_size,
+                'mtime': stat.st_mtime_ns,
+                'hash': content_hash,
+                'metadata': entry['metadata'],
+                'heading': entry['heading'],
+            }
+        
+        if dirty:
+            self._record(delta)
+            self.save()
+        return delta
+    
+    def _record(self, delta: Dict[str, List[Path]]):
+        """Journal the keys of a refresh delta under a new generation"""
+        self.generation += 1
+        for paths in delta.values():
+            self.journal.extend([self.generation, self.key(path)] for path in paths)
+        if len(self.journal) > JOURNAL_LIMIT:
+            # Drop whole generations so the journal stays complete after journal_from
+            cut = len(self.journal) - JOURNAL_LIMIT
+            self.journal_from = self.journal[cut - 1][0]
+            while cut < len(self.journal) and self.journal[cut][0] <= self.journal_from:
+                cut += 1
+            del self.journal[:cut]
+    
+    def changes_since(self, generation: int) -> Optional[List[str]]:
+        """
+        Keys changed after `generation` (oldest first, without repeats).
+        
+        None if the journal no longer reaches back that far, or the
+        generation is from the future; the caller must diff instead.
+        """
+        if generation < self.journal_from or generation > self.generation:
+            return None
+        start = bisect.bisect_left(self.journal, [generation + 1])
+        return list(dict.fromkeys(key for _, key in self.journal[start:]))
+    
+    def get(self, file_path: Path) -> Optional[Dict]:
+        """Get manifest record for a file"""
+        return self.files.get(self.key(file_path))
+    
+    def get_metadata(self, file_path: Path) -> Dict:
+        """Get a copy of the cached frontmatter for a file"""
+        record = self.get(file_path)
+        if not record or record['metadata'] is None:
+            return {}
+        return dict(record['metadata'])
+    
+    def entries(self, under: Optional[Path] = None) -> List[Tuple[Path, Dict]]:
+        """List readable (path, metadata) pairs, optionally limited to a directory"""
+        result = []
+        for key in sorted(self.files):
+            record = self.files[key]
+            if record['metadata'] is None:
+                continue
+            path = self.root_dir / key
+            if under is not None and under not in path.parents:
+                continue
+            result.append((path, dict(record['metadata'])))
+        return result
+    
+    def get_mtime(self, file_path: Path) -> float:
+        """Get cached modification time in seconds"""
+        record = self.get(file_path)
+        if record:
+            return record['mtime'] / 1e9
+        return file_path.stat().st_mtime
+
+
+def load_kb_cache(config: KBConfig, jobs: int = 1) -> KBCache:
+    """Load the manifest cache and refresh it against KB + docs"""
+    cache = KBCache(config)
+    cache.refresh(get_all_kb_entries(config.get_all_kb_paths()), jobs=jobs)
+    return cache
+
+
+def get_kb_documents(kb_path: Path) -> List[Path]:
+    """Every markdown file in the KB except INDEX.md and README.md"""
+    return [path for path in kb_path.rglob("*.md") if path.name not in ('INDEX.md', 'README.md')]
+
+
+def load_documents_cache(config: KBConfig, jobs: int = 1) -> KBCache:
+    """
+    Load a manifest over every markdown file in the KB.
+    
+    This is the wider set the tools/ scripts report on (guides included,
+    docs/ excluded); it is kept apart from the entry manifest.
+    """
+    cache = KBCache(config, name="manifest-documents")
+    cache.refresh(get_kb_documents(config.get_kb_path()), jobs=jobs)
+    return cache
+
+
+def stat_snapshot(paths: Iterable[Path]) -> Dict[str, Tuple[int, int]]:
+    """(size, mtime_ns) per file; files that vanish mid-walk are left out"""
+    snapshot = {}
+    for path in paths:
+        try:
+            stat = path.stat()
+        except OSError:
+            continue
+        snapshot[str(path)] = (stat.st_size, stat.st_mtime_ns)
+    return snapshot
+
+
+def watch_files(list_paths: Callable[[], List[Path]],
+                on_change: Callable[[Dict[str, List[Path]]], None],
+                interval: float = 1.0, debounce: float = 0.5,
+                stop: Optional[threading.Event] = None):
+    """
+    Poll files and call on_change(delta) once a burst of changes settles.
+    
+    Every `interval` seconds the files from list_paths() are stat()ed.
+    After a change, polling continues every `debounce` seconds until two
+    snapshots agree, so an editor saving several files triggers one call.
+    The delta is {'changed': [...], 'removed': [...]}, where 'changed'
+    includes added files. Runs until `stop` is set (or KeyboardInterrupt).
+    """
+    stop = stop or threading.Event()
+    last = stat_snapshot(list_paths())
+    while not stop.wait(interval):
+        current = stat_snapshot(list_paths())
+        if current == last:
+            continue
+        while not stop.wait(debounce):
+            settled = stat_snapshot(list_paths())
+            if settled == current:
+                break
+            current = settled
+        if stop.is_set():
+            return
+        on_change({
+            'changed': [Path(key) for key, value in current.items() if last.get(key) != value],
+            'removed': [Path(key) for key in last if key not in current],
+        })
+        last = current
+
+
+def format_time_ago(file_path: Path, mtime: Optional[float] = None) -> str:
     """Format time ago string"""
-    mtime = datetime.fromtimestamp(file_path.stat().st_mtime)
+    if mtime is None:
+        mtime = file_path.stat().st_mtime
+    mtime = datetime.fromtimestamp(mtime)
     now = datetime.now()
     delta = now - mtime
     
@@ -5,19 +5,326 @@ Cross-platform Neo4j integration
 
 import os
 import sys
-import subprocess
+import time
+import argparse
+import threading
+from contextlib import contextmanager
 from pathlib import Path
+from typing import Callable, Dict, List, Optional
+# Subcommand modules (kb_search, kb_add, kb_index, kb_stats) are imported
+# by the actions that use them, so `kb compound stats` never loads search.
 from kb_common import (
-    KBConfig, Colors, print_header, print_success, print_warning, print_error, print_separator
+    KBConfig, Colors, print_header, print_success, print_warning, print_error, print_separator,
+    get_priority_icon
 )
-from kb_search import search_kb
-from kb_add import add_entry
-from kb_index import update_index
-from kb_stats import show_stats
 
 
-def compound_operation(action: str, search_term: str = None):
-    """Execute compound operation"""
+# Seconds each backend of `kb compound search` may take before its
+# results are dropped (None = wait)
+BACKEND_TIMEOUTS = {'files': 30.0, 'graph': 5.0}
+
+# Results fetched per backend before merging
+COMPOUND_TOP_K = 20
+
+# Seconds close() waits for a timed-out Neo4j worker before closing the
+# driver under it
+CLOSE_GRACE = 0.5
+
+# Reciprocal rank fusion constant (standard value from the RRF paper)
+RRF_K = 60
+
+
+class PhaseTimer:
+    """
+    Wall-clock time per named phase of a compound operation
+    
+    Phases may nest or overlap (the fan-out search runs its backends
+    concurrently), so the total is the elapsed time, not their sum.
+    """
+    
+    def __init__(self):
+        self.phases: Dict[str, float] = {}
+        self.start = time.perf_counter()
+    
+    @contextmanager
+    def phase(self, name: str):
+        """Time a block, adding to the phase's total"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0.0) + time.perf_counter() - start
+    
+    def report(self, neo4j_calls: int = 0):
+        """Print per-phase latency, and what one subprocess per call would repeat"""
+        print()
+        print(f"{Colors.CYAN}⏱️  Timings{Colors.RESET}")
+        for name, seconds in self.phases.items():
+            print(f"   {name:<22} {seconds * 1000:8.1f} ms")
+        print(f"   {'Total':<22} {(time.perf_counter() - self.start) * 1000:8.1f} ms")
+        
+        if neo4j_calls:
+            # A subprocess per call repeats interpreter startup, import and connect
+            setup = self.phases.get('Neo4j import', 0.0) + self.phases.get('Neo4j connect', 0.0)
+            saved = setup * (neo4j_calls - 1) * 1000
+            print(f"   {Colors.GRAY}{neo4j_calls} Neo4j call(s) shared one import and driver: "
+                  f"~{saved:.0f} ms saved, plus {neo4j_calls} interpreter startup(s){Colors.RESET}")
+
+
+class Neo4jTools:
+    """
+    In-process access to the tools/neo4j skill scripts
+    
+    The modules are imported on first use and one driver (with its
+    connection pool) is shared by every Neo4j phase of an operation,
+    instead of a new interpreter, import and connection per call.
+    
+    Workers abandoned by a fan-out timeout may still be connecting when
+    the operation ends: the driver is published and closed under one
+    lock, and once closed, a driver a worker finishes creating is closed
+    by that worker instead of being kept.
+    """
+    
+    def __init__(self, config: KBConfig, timer: Optional[PhaseTimer] = None):
+        self.config = config
+        self.tools_dir = config.root_dir / "tools" / "neo4j"
+        self.timer = timer or PhaseTimer()
+        self.modules = None
+        self.driver = None
+        self.error: Optional[Exception] = None  # first setup failure, not retried
+        self.calls = 0
+        self.lock = threading.Lock()
+        self.closed = False
+        self.workers: List[threading.Thread] = []  # timed-out backends still running
+    
+    def available(self) -> bool:
+        """Check if Neo4j tools are available"""
+        return (self.tools_dir / "sync_skills_to_neo4j.py").exists()
+    
+    def load(self):
+        """Import the sync and query modules (ImportError if neo4j/dotenv are missing)"""
+        if self.modules is None:
+            with self.timer.phase('Neo4j import'):
+                if str(self.tools_dir) not in sys.path:
+                    sys.path.insert(0, str(self.tools_dir))
+                import sync_skills_to_neo4j
+                import query_skills_neo4j
+            self.modules = (sync_skills_to_neo4j, query_skills_neo4j)
+        return self.modules
+    
+    def connect(self):
+        """Open the shared driver from the .env credentials"""
+        with self.lock:
+            if self.closed:
+                raise RuntimeError("Neo4j tools already closed")
+            if self.driver is not None:
+                return self.driver
+        # Connect outside the lock so close() never waits on a hung connection
+        sync_module, _ = self.load()
+        uri = os.getenv('NEO4J_URI')
+        username = os.getenv('NEO4J_USERNAME')
+        password = os.getenv('NEO4J_PASSWORD')
+        if not all([uri, username, password]):
+            raise RuntimeError("Neo4j credentials not found in .env file "
+                               "(NEO4J_URI, NEO4J_USERNAME, NEO4J_PASSWORD)")
+        with self.timer.phase('Neo4j connect'):
+            driver = sync_module.GraphDatabase.driver(uri, auth=(username, password))
+            try:
+                driver.verify_connectivity()
+            except Exception:
+                driver.close()
+                raise
+        with self.lock:
+            if self.closed or self.driver is not None:
+                driver.close()  # closed meanwhile, or another worker won
+                if self.closed:
+                    raise RuntimeError("Neo4j tools already closed")
+            else:
+                self.driver = driver
+            return self.driver
+    
+    def database(self) -> str:
+        """Database name from the environment"""
+        return os.getenv('NEO4J_DATABASE', 'neo4j')
+    
+    def query(self):
+        """Neo4jSkillQuery on the shared driver"""
+        _, query_module = self.load()
+        return query_module.Neo4jSkillQuery(database=self.database(), driver=self.connect())
+    
+    def sync(self):
+        """Neo4jSkillSync on the shared driver"""
+        sync_module, _ = self.load()
+        return sync_module.Neo4jSkillSync(database=self.database(), driver=self.connect())
+    
+    def run(self, phase: str, action: Callable) -> bool:
+        """
+        Run `action(tools)` as a timed phase.
+        
+        Failures (missing driver package, credentials, connection) are
+        reported and return False so the operation continues in file mode.
+        """
+        try:
+            if self.error is not None:
+                raise self.error
+            try:
+                self.load()
+                self.connect()
+            except Exception as e:
+                self.error = e
+                raise
+            self.calls += 1
+            with self.timer.phase(phase):
+                action(self)
+            return True
+        except Exception as e:
+            print_warning("Neo4j operation had issues (continuing in file mode)")
+            print(f"{Colors.GRAY}{e}{Colors.RESET}")
+            return False
+    
+    def print_skills(self, skills: List[Dict], title: str):
+        """Print query results the way query_skills_neo4j.py does"""
+        _, query_module = self.load()
+        query_module.print_skills(skills, title)
+    
+    def close(self, grace: float = CLOSE_GRACE):
+        """Close the shared driver, after waiting up to `grace` seconds for workers"""
+        deadline = time.perf_counter() + grace
+        for worker in self.workers:
+            worker.join(max(0.0, deadline - time.perf_counter()))
+        with self.lock:
+            self.closed = True
+            if self.driver is not None:
+                self.driver.close()
+                self.driver = None
+
+
+class BackendResult:
+    """Outcome of one backend in a fan-out: 'ok', 'error' or 'timeout'"""
+    
+    def __init__(self, name: str):
+        self.name = name
+        self.status = 'timeout'
+        self.value = None
+        self.error: Optional[Exception] = None
+        self.seconds = 0.0
+        self.thread: Optional[threading.Thread] = None  # still running after a timeout
+
+
+def fan_out(backends: Dict[str, Callable], timeouts: Dict[str, Optional[float]]
+            ) -> Dict[str, BackendResult]:
+    """
+    Run backends concurrently, waiting for each at most its timeout.
+    
+    Every backend gets a daemon thread, so one that hangs (e.g. a Neo4j
+    connection) is abandoned at its deadline without holding up the
+    others or interpreter exit. Wall time is max(backend), not the sum.
+    """
+    results = {name: BackendResult(name) for name in backends}
+    threads = {}
+    start = time.perf_counter()
+    
+    def run(name: str, backend: Callable):
+        result = BackendResult(name)
+        try:
+            result.value = backend()
+            result.status = 'ok'
+        except Exception as e:
+            result.status, result.error = 'error', e
+        result.seconds = time.perf_counter() - start
+        results[name] = result
+    
+    for name, backend in backends.items():
+        threads[name] = threading.Thread(target=run, args=(name, backend), daemon=True,
+                                         name=f"kb-compound-{name}")
+        threads[name].start()
+    
+    for name, thread in threads.items():
+        timeout = timeouts.get(name)
+        remaining = None if timeout is None else max(0.0, start + timeout - time.perf_counter())
+        thread.join(remaining)
+        if thread.is_alive():
+            results[name].seconds = time.perf_counter() - start
+            results[name].thread = thread
+    return results
+
+
+def merge_results(file_results: List[Dict], graph_results: List[Dict],
+                  root: Optional[Path] = None) -> List[Dict]:
+    """
+    Merge file and graph hits into one ranked list.
+    
+    KB-* entries are deduplicated by KB id (the file stem, which is also
+    the KBEntry id in Neo4j); other documents by their path relative to
+    `root`, as stems like README repeat across directories. Hits are
+    scored with reciprocal rank fusion, so an entry both backends rank
+    highly comes first.
+    """
+    merged: Dict[str, Dict] = {}
+    
+    def key_of(path: Path) -> str:
+        if path.stem.startswith('KB-'):
+            return path.stem
+        if root is not None:
+            try:
+                return path.relative_to(root).as_posix()
+            except ValueError:
+                pass
+        return path.as_posix()
+    
+    def hit(entry_id: str) -> Dict:
+        return merged.setdefault(entry_id, {
+            'id': entry_id, 'title': entry_id, 'path': None, 'category': 'unknown',
+            'priority': 'unknown', 'skills': [], 'context': [], 'sources': [], 'score': 0.0,
+        })
+    
+    for rank, result in enumerate(file_results, 1):
+        entry = hit(key_of(result['path']))
+        entry.update(title=result['title'], path=result['path'], category=result['category'],
+                     priority=result['priority'], context=result['context'])
+        entry['sources'].append('files')
+        entry['score'] += 1.0 / (RRF_K + rank)
+    
+    for rank, result in enumerate(graph_results, 1):
+        entry_id = result.get('id') or ''
+        file_path = result.get('file_path')
+        if file_path and not entry_id.startswith('KB-'):
+            entry_id = key_of(Path(file_path))
+        if not entry_id:
+            continue
+        entry = hit(entry_id)
+        if entry['path'] is None:
+            entry['title'] = result.get('title') or entry_id
+            entry['category'] = result.get('category') or 'unknown'
+        entry['skills'] = result.get('skills') or []
+        entry['sources'].append('graph')
+        entry['score'] += 1.0 / (RRF_K + rank)
+    
+    return sorted(merged.values(), key=lambda entry: (-entry['score'], entry['id']))
+
+
+def parse_compound_args(argv: List[str]) -> argparse.Namespace:
+    """Parse `kb compound <action> [term...]` arguments"""
+    parser = argparse.ArgumentParser(prog='kb compound', add_help=False)
+    parser.add_argument('--timings', action='store_true', help='Show per-phase latency')
+    parser.add_argument('--timeout', type=float, default=BACKEND_TIMEOUTS['graph'],
+                        help='Seconds to wait for Neo4j in compound search '
+                             f"(default: {BACKEND_TIMEOUTS['graph']:g})")
+    parser.add_argument('action')
+    parser.add_argument('terms', nargs='*')
+    args = parser.parse_intermixed_args(argv)
+    args.action = args.action.lower()
+    return args
+
+
+def compound_operation(action: str, search_term: str = None, timings: bool = False,
+                       timeouts: Optional[Dict[str, Optional[float]]] = None):
+    """
+    Execute compound operation
+    
+    timings: print per-phase latency; timeouts: per-backend seconds for
+    compound search (see BACKEND_TIMEOUTS).
+    """
     config = KBConfig()
     Colors.enable_windows()
     
@@ -26,108 +333,154 @@ def compound_operation(action: str, search_term: str = None):
         "Integrated with Neo4j Brain"
     )
     
-    if action == 'search':
-        compound_search(config, search_term)
-    elif action == 'add':
-        compound_add(config)
-    elif action == 'sync':
-        compound_sync(config)
-    elif action == 'query':
-        compound_query(config, search_term)
-    elif action == 'stats':
-        compound_stats(config)
-    else:
-        print_error(f"Unknown compound action: {action}")
+    neo4j = Neo4jTools(config)
+    try:
+        if action == 'search':
+            compound_search(config, search_term, neo4j, timeouts)
+        elif action == 'add':
+            compound_add(config, neo4j)
+        elif action == 'sync':
+            compound_sync(config, neo4j)
+        elif action == 'query':
+            compound_query(config, search_term, neo4j)
+        elif action == 'stats':
+            compound_stats(config, neo4j)
+        else:
+            print_error(f"Unknown compound action: {action}")
+            return
+    finally:
+        neo4j.close()
+    
+    if timings:
+        neo4j.timer.report(neo4j.calls)
 
 
-def check_neo4j_available(config: KBConfig) -> bool:
-    """Check if Neo4j tools are available"""
-    neo4j_sync = config.root_dir / "tools" / "neo4j" / "sync_skills_to_neo4j.py"
-    return neo4j_sync.exists()
+def search_skills(term: str) -> Callable:
+    """Neo4j phase: search skills by keyword"""
+    def action(neo4j: Neo4jTools):
+        neo4j.print_skills(neo4j.query().search_skills(term), f"Search Results for '{term}'")
+    return action
 
 
-def run_neo4j_script(config: KBConfig, script_name: str, args: list = None) -> bool:
-    """Run Neo4j Python script"""
-    script_path = config.root_dir / "tools" / "neo4j" / script_name
-    
-    if not script_path.exists():
-        return False
-    
-    try:
-        cmd = [sys.executable, str(script_path)]
-        if args:
-            cmd.extend(args)
-        
-        result = subprocess.run(cmd, capture_output=True, text=True)
-        
-        if result.returncode == 0:
-            print(result.stdout)
-            return True
-        else:
-            print_warning("Neo4j operation had issues (continuing in file mode)")
-            if result.stderr:
-                print(f"{Colors.GRAY}{result.stderr}{Colors.RESET}")
-            return False
-    except Exception as e:
-        print_warning(f"Could not connect to Neo4j: {e}")
-        return False
+def related_skills(skill: str) -> Callable:
+    """Neo4j phase: skills related to a skill"""
+    def action(neo4j: Neo4jTools):
+        neo4j.print_skills(neo4j.query().get_related_skills(skill), f"Skills Related to '{skill}'")
+    return action
+
+
+def all_skills(neo4j: Neo4jTools):
+    """Neo4j phase: list all skills"""
+    neo4j.print_skills(neo4j.query().get_all_skills(), "All Skills in Knowledge Base")
 
 
-def compound_search(config: KBConfig, search_term: str):
-    """Compound search: Neo4j + File system"""
+def sync_all(neo4j: Neo4jTools):
+    """Neo4j phase: sync KB + docs entries"""
+    sync_module, _ = neo4j.load()
+    sync_module.run_sync(neo4j.sync(), neo4j.config.get_kb_path(), neo4j.config.get_docs_path())
+
+
+def compound_search(config: KBConfig, search_term: str, neo4j: Neo4jTools,
+                    timeouts: Optional[Dict[str, Optional[float]]] = None):
+    """Compound search: file system and Neo4j queried concurrently, merged"""
+    from kb_search import search_ranked
+    
+    timeouts = dict(BACKEND_TIMEOUTS, **(timeouts or {}))
     print(f"{Colors.CYAN}🔍 Compound Search: '{search_term}'{Colors.RESET}")
     print()
     
-    # Phase 1: Neo4j Brain Search
-    print(f"{Colors.MAGENTA}━━━ Phase 1: Neo4j Brain Search ━━━{Colors.RESET}")
-    
-    if check_neo4j_available(config):
-        neo4j_success = run_neo4j_script(
-            config,
-            'query_skills_neo4j.py',
-            ['--search', search_term]
-        )
-        
-        if neo4j_success:
-            print_success("Neo4j query successful!")
+    def search_files():
+        return search_ranked(config, search_term, COMPOUND_TOP_K, emit=lambda result, rank: None)
+    
+    def search_graph():
+        neo4j.load()
+        neo4j.connect()
+        neo4j.calls += 1
+        return neo4j.query().search_entries(search_term, limit=COMPOUND_TOP_K)
+    
+    backends = {'files': search_files}
+    if neo4j.available():
+        backends['graph'] = search_graph
+    
+    print(f"{Colors.MAGENTA}━━━ Searching File System + Neo4j Brain ━━━{Colors.RESET}")
+    with neo4j.timer.phase('Fan-out search'):
+        results = fan_out(backends, timeouts)
+    if 'graph' in results and results['graph'].thread is not None:
+        neo4j.workers.append(results['graph'].thread)
+    
+    for name, label in (('files', 'File system'), ('graph', 'Neo4j brain')):
+        result = results.get(name)
+        if result is None:
+            print_warning(f"{label}: tools not found, skipped")
+        elif result.status == 'ok':
+            print_success(f"{label}: {len(result.value)} results in {result.seconds * 1000:.0f} ms")
+        elif result.status == 'timeout':
+            print_warning(f"{label}: no answer within {timeouts[name]:g}s, skipped")
         else:
-            print_warning("Neo4j not available, using file search only")
-    else:
-        print_warning("Neo4j tools not found, using file search only")
-    
+            print_warning(f"{label}: unavailable ({result.error})")
     print()
     
-    # Phase 2: File System Search
-    print(f"{Colors.MAGENTA}━━━ Phase 2: File System Search ━━━{Colors.RESET}")
-    search_kb(search_term)
+    merged = merge_results(
+        results['files'].value if results['files'].status == 'ok' else [],
+        results['graph'].value if 'graph' in results and results['graph'].status == 'ok' else [],
+        root=config.root_dir
+    )
+    
+    if not merged:
+        print_warning(f"No results found for '{search_term}'")
+    for rank, entry in enumerate(merged, 1):
+        print_merged_result(config, entry, rank)
     
     print()
     print_separator('━', 60, Colors.MAGENTA)
     print(f"{Colors.GREEN}{Colors.BOLD}💡 Compound Search Complete!{Colors.RESET}")
-    print(f"   Searched: Neo4j Brain + File System")
+    print(f"   Searched: Neo4j Brain + File System ({len(merged)} merged results)")
     print_separator('━', 60, Colors.MAGENTA)
 
 
-def compound_add(config: KBConfig):
+def print_merged_result(config: KBConfig, entry: Dict, rank: int):
+    """Print one merged compound search result"""
+    sources = ' + '.join(entry['sources'])
+    print(f"{Colors.GREEN}#{rank} {entry['title']}{Colors.RESET} "
+          f"{Colors.GRAY}({sources}, rrf {entry['score']:.4f}){Colors.RESET}")
+    if entry['path'] is not None:
+        icon = get_priority_icon(entry['priority'])
+        print(f"   {icon} File: {entry['path'].relative_to(config.root_dir)}")
+        print(f"   Category: {entry['category']} | Priority: {entry['priority']}")
+    else:
+        print(f"   ID: {entry['id']} | Category: {entry['category']}")
+    if entry['skills']:
+        print(f"   {Colors.CYAN}Skills:{Colors.RESET} {', '.join(entry['skills'][:5])}")
+    for ctx in entry['context'][:2]:
+        print(f"     {ctx[:80]}...")
+    print()
+
+
+def compound_add(config: KBConfig, neo4j: Neo4jTools):
     """Compound add: Create + Index + Sync"""
+    from kb_add import add_entry
+    from kb_index import update_index
+    
     print(f"{Colors.CYAN}➕ Adding New Knowledge Entry{Colors.RESET}")
     print()
     
     # Phase 1: Create Entry
     print(f"{Colors.MAGENTA}━━━ Phase 1: Create Entry ━━━{Colors.RESET}")
-    add_entry()
+    with neo4j.timer.phase('Create entry'):
+        add_entry()
     print()
     
     # Phase 2: Update Index
     print(f"{Colors.MAGENTA}━━━ Phase 2: Update Index ━━━{Colors.RESET}")
-    update_index()
+    with neo4j.timer.phase('Update index'):
+        update_index()
     print()
     
     # Phase 3: Sync to Neo4j
     print(f"{Colors.MAGENTA}━━━ Phase 3: Sync to Neo4j Brain ━━━{Colors.RESET}")
     
-    if check_neo4j_available(config):
-        synced = run_neo4j_script(config, 'sync_skills_to_neo4j.py')
+    if neo4j.available():
+        synced = neo4j.run('Neo4j sync', sync_all)
         
         if synced:
             print_success("Synced to Neo4j successfully!")
@@ -142,20 +495,24 @@ def compound_add(config: KBConfig):
     print(f"   Entry created, indexed, and synced to brain")
     print_separator('━', 60, Colors.MAGENTA)
     
-    if check_neo4j_available(config):
+    if neo4j.available():
         print()
         print(f"{Colors.CYAN}🧠 Your knowledge is now in the Neo4j Brain!{Colors.RESET}")
         print(f"   It can be queried with relationships and context")
 
 
-def compound_sync(config: KBConfig):
+def compound_sync(config: KBConfig, neo4j: Neo4jTools):
     """Compound sync: Index + Neo4j + Stats"""
+    from kb_index import update_index
+    from kb_stats import show_stats
+    
     print(f"{Colors.CYAN}🔄 Full Compound Sync{Colors.RESET}")
     print()
     
     # Phase 1: Update Index
     print(f"{Colors.MAGENTA}━━━ Phase 1: Update Index ━━━{Colors.RESET}")
-    update_index()
+    with neo4j.timer.phase('Update index'):
+        update_index()
     print()
     
     # Phase 2: Sync to Neo4j (includes docs/)
@@ -163,8 +520,8 @@ def compound_sync(config: KBConfig):
     print(f"   Syncing: .agent/knowledge-base/ + docs/")
     print()
     
-    if check_neo4j_available(config):
-        synced = run_neo4j_script(config, 'sync_skills_to_neo4j.py')
+    if neo4j.available():
+        synced = neo4j.run('Neo4j sync', sync_all)
         
         if synced:
             print_success("Synced to Neo4j successfully!")
@@ -177,7 +534,8 @@ def compound_sync(config: KBConfig):
     
     # Phase 3: Show Stats
     print(f"{Colors.MAGENTA}━━━ Phase 3: Compound Stats ━━━{Colors.RESET}")
-    show_stats()
+    with neo4j.timer.phase('Stats'):
+        show_stats()
     
     print()
     print_separator('━', 60, Colors.MAGENTA)
@@ -186,12 +544,12 @@ def compound_sync(config: KBConfig):
     print_separator('━', 60, Colors.MAGENTA)
 
 
-def compound_query(config: KBConfig, query_term: str):
+def compound_query(config: KBConfig, query_term: str, neo4j: Neo4jTools):
     """Compound query: Intelligent Neo4j queries"""
     print(f"{Colors.CYAN}🧠 Intelligent Query via Neo4j Brain{Colors.RESET}")
     print()
     
-    if not check_neo4j_available(config):
+    if not neo4j.available():
         print_error("Neo4j tools not available")
         print(f"   Install Neo4j tools in tools/neo4j/")
         return
@@ -201,13 +559,13 @@ def compound_query(config: KBConfig, query_term: str):
     
     # Search skills
     print(f"{Colors.MAGENTA}━━━ Searching Skills ━━━{Colors.RESET}")
-    run_neo4j_script(config, 'query_skills_neo4j.py', ['--search', query_term])
+    neo4j.run('Neo4j search', search_skills(query_term))
     
     print()
     
     # Related skills
     print(f"{Colors.MAGENTA}━━━ Related Skills ━━━{Colors.RESET}")
-    run_neo4j_script(config, 'query_skills_neo4j.py', ['--skill', query_term])
+    neo4j.run('Neo4j related', related_skills(query_term))
     
     print()
     print_separator('━', 60, Colors.MAGENTA)
@@ -215,22 +573,25 @@ def compound_query(config: KBConfig, query_term: str):
     print_separator('━', 60, Colors.MAGENTA)
 
 
-def compound_stats(config: KBConfig):
+def compound_stats(config: KBConfig, neo4j: Neo4jTools):
     """Compound stats: File system + Neo4j"""
+    from kb_stats import show_stats
+    
     print(f"{Colors.CYAN}📊 Compound System Health{Colors.RESET}")
     print()
     
     # Phase 1: File System Stats
     print(f"{Colors.MAGENTA}━━━ File System Stats ━━━{Colors.RESET}")
-    show_stats()
+    with neo4j.timer.phase('Stats'):
+        show_stats()
     
     print()
     
     # Phase 2: Neo4j Stats
     print(f"{Colors.MAGENTA}━━━ Neo4j Brain Stats ━━━{Colors.RESET}")
     
-    if check_neo4j_available(config):
-        success = run_neo4j_script(config, 'query_skills_neo4j.py', ['--all-skills'])
+    if neo4j.available():
+        success = neo4j.run('Neo4j all skills', all_skills)
         
         if success:
             print(f"   {Colors.GRAY}(Showing first 20 skills){Colors.RESET}")
@@ -242,7 +603,7 @@ def compound_stats(config: KBConfig):
     print(f"{Colors.GREEN}{Colors.BOLD}💡 Compound System Status{Colors.RESET}")
     print(f"   File System: ✅ Active")
     
-    if check_neo4j_available(config):
+    if neo4j.driver is not None:
         print(f"   Neo4j Brain: ✅ Connected")
     else:
         print(f"   Neo4j Brain: ⚠️  Not Available")
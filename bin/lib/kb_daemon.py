@@ -0,0 +1,368 @@
+"""
+KB Daemon Module
+`kb serve` - warm in-memory index answering search, list and stats
+over a Unix domain socket
+"""
+
+import io
+import os
+import sys
+import json
+import socket
+import argparse
+import hashlib
+import tempfile
+import threading
+import socketserver
+from contextlib import redirect_stderr, redirect_stdout
+from pathlib import Path
+from typing import Dict, List, Optional
+from kb_common import (
+    KBConfig, Colors, scan_changed_dirs,
+    print_header, print_success, print_error, print_info, print_warning
+)
+
+
+PROTOCOL_VERSION = 1
+
+# Commands the daemon answers; everything else runs in-process
+SERVED_COMMANDS = ('search', 'list', 'recent', 'stats')
+
+# Seconds between filesystem polls
+DEFAULT_INTERVAL = 2.0
+
+# Set to bypass a running daemon
+NO_DAEMON_ENV = 'KB_NO_DAEMON'
+
+# Unix socket paths are limited to ~104 bytes on macOS
+MAX_SOCKET_PATH = 100
+
+
+def daemon_supported() -> bool:
+    """Whether this platform has Unix domain sockets"""
+    return hasattr(socket, 'AF_UNIX')
+
+
+def get_socket_path(config: KBConfig) -> Path:
+    """Socket path for a project (in the KB cache, or the temp dir if too long)"""
+    path = config.get_cache_dir() / "kb.sock"
+    if len(str(path)) <= MAX_SOCKET_PATH:
+        return path
+    digest = hashlib.sha1(str(config.root_dir).encode('utf-8')).hexdigest()[:12]
+    return Path(tempfile.gettempdir()) / f"kb-{digest}.sock"
+
+
+class WarmState:
+    """
+    Parsed corpus kept in memory by the daemon.
+
+    refresh() is a stat() walk: only files changed since the last refresh
+    are re-read, so polling it keeps the state current at little cost.
+    The sorted list index is built once and updated from each delta.
+
+    Requests only call catch_up(), which stats the KB directories: an
+    added, removed or renamed file is seen at once, an edit in place on
+    the next poll.
+    """
+
+    def __init__(self, config: KBConfig, jobs: int = 1):
+        # Imported here: clients only need forward(), not the engine
+        from kb_engine import KBEngine
+        from kb_list import ListIndex
+        
+        self.config = config
+        self.lock = threading.Lock()
+        self.engine = KBEngine(config, jobs=jobs)
+        self.cache = self.engine.cache
+        self.index = self.engine.index
+        self.list_index = ListIndex(config, name=None)
+        self.list_index.sync(self.cache)
+        self.dirs: Dict[str, Dict[str, List]] = {}  # KB path -> directory snapshot
+        self._changed_dirs()
+
+    def _changed_dirs(self) -> bool:
+        """Whether a KB directory changed since the last check (one stat() per directory)"""
+        changed = False
+        for top in self.config.get_all_kb_paths():
+            dirs = self.dirs.setdefault(str(top), {})
+            if scan_changed_dirs(top, dirs, self.cache.key, "*.md",
+                                 skip=self.config.get_cache_dir())[1]:
+                changed = True
+        return changed
+
+    def _refresh(self) -> Dict[str, List[Path]]:
+        self._changed_dirs()
+        delta = self.engine.refresh()
+        self.list_index.update(self.cache, delta)
+        return delta
+
+    def refresh(self) -> Dict[str, List[Path]]:
+        """Bring the cache and indexes up to date with the filesystem"""
+        with self.lock:
+            return self._refresh()
+
+    def catch_up(self) -> bool:
+        """Refresh only if a KB directory changed since the last refresh"""
+        with self.lock:
+            if not self._changed_dirs():
+                return False
+            self._refresh()
+            return True
+
+    @staticmethod
+    def parse(argv: List[str]) -> argparse.Namespace:
+        """Parse a served command's arguments (argparse errors raise SystemExit)"""
+        # Imported here: these modules import kb_common, not the other way round
+        from kb_search import parse_search_args
+        from kb_list import parse_list_args
+
+        command, args = argv[0], argv[1:]
+        if command == 'search':
+            return parse_search_args(args)
+        if command in ('list', 'recent'):
+            return parse_list_args(command, args)
+        return argparse.Namespace(verify='--verify' in args)
+
+    def run(self, command: str, args: argparse.Namespace):
+        """Run a parsed served command against the warm state, printing to stdout"""
+        from kb_search import search_kb, search_terms
+        from kb_list import list_command
+        from kb_stats import show_stats
+
+        with self.lock:
+            if command == 'search':
+                search_kb(search_terms(args), ranked=args.ranked,
+                          top_k=args.top, limit=args.limit,
+                          json_lines=args.json_lines,
+                          cache=self.cache, index=self.index,
+                          fuzzy=args.fuzzy, semantic=args.semantic,
+                          vectors=self.engine.vectors if args.semantic else None)
+            elif command in ('list', 'recent'):
+                list_command(command, args, index=self.list_index)
+            elif command == 'stats':
+                show_stats(cache=self.cache, verify=args.verify)
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    """
+    One JSON request line in; a JSON header line, then command output, out
+
+    Argument errors are answered in the header ('exit' and 'stderr')
+    before any output; a client that hangs up mid-reply is dropped.
+    Commands run on the state the poller keeps current, after a
+    WarmState.catch_up() directory check.
+    """
+
+    def handle(self):
+        try:
+            request = json.loads(self.rfile.readline().decode('utf-8'))
+        except (ValueError, UnicodeDecodeError):
+            return
+        out = io.TextIOWrapper(self.wfile, encoding='utf-8', newline='\n', write_through=True)
+        try:
+            self._answer(out, request)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # client went away (e.g. `kb search ... | head`)
+        out.detach()
+
+    def _answer(self, out, request: Dict):
+        state: WarmState = self.server.state
+        argv = request.get('argv') or []
+        if request.get('version') != PROTOCOL_VERSION or request.get('root') != str(state.config.root_dir):
+            self._reply(out, ok=False, error='protocol or project mismatch')
+        elif argv == ['ping']:
+            self._reply(out, ok=True, pid=os.getpid())
+        elif argv == ['shutdown']:
+            self._reply(out, ok=True)
+            threading.Thread(target=self.server.shutdown, daemon=True).start()
+        elif argv and argv[0] in SERVED_COMMANDS:
+            stderr = io.StringIO()
+            try:
+                with redirect_stderr(stderr):
+                    args = state.parse(argv)
+            except SystemExit as e:
+                self._reply(out, ok=True, exit=e.code if isinstance(e.code, int) else 2,
+                            stderr=stderr.getvalue())
+                return
+            self._reply(out, ok=True)
+            try:
+                state.catch_up()
+                with redirect_stdout(out):
+                    state.run(argv[0], args)
+            except (BrokenPipeError, ConnectionResetError):
+                raise
+            except (Exception, SystemExit) as e:
+                out.write(f"{Colors.RED}❌ Error: {e}{Colors.RESET}\n")
+        else:
+            self._reply(out, ok=False, error=f"unsupported command: {argv[:1]}")
+
+    @staticmethod
+    def _reply(out, **header):
+        out.write(json.dumps(header) + '\n')
+
+
+class KBDaemonServer(socketserver.UnixStreamServer if daemon_supported() else object):
+    """Single-threaded socket server; requests are answered one at a time"""
+
+    def __init__(self, socket_path: Path, state: WarmState):
+        self.state = state
+        super().__init__(str(socket_path), _Handler)
+
+
+def _poll(state: WarmState, interval: float, stop: threading.Event):
+    """Watch the filesystem by polling, keeping the warm state current"""
+    while not stop.wait(interval):
+        try:
+            state.refresh()
+        except OSError:
+            continue
+
+
+def _request(config: KBConfig, argv: List[str], timeout: Optional[float] = None):
+    """Connect and send a request; returns (socket, reader, header) or None"""
+    if os.environ.get(NO_DAEMON_ENV) or not daemon_supported():
+        return None
+    socket_path = get_socket_path(config)
+    if not socket_path.exists():
+        return None
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(timeout)
+    try:
+        sock.connect(str(socket_path))
+        sock.sendall((json.dumps({
+            'version': PROTOCOL_VERSION,
+            'root': str(config.root_dir),
+            'argv': argv,
+        }) + '\n').encode('utf-8'))
+        reader = sock.makefile('r', encoding='utf-8', newline='\n')
+        header = json.loads(reader.readline() or '{}')
+    except (OSError, ValueError):
+        sock.close()
+        return None
+    if not header.get('ok'):
+        sock.close()
+        return None
+    return sock, reader, header
+
+
+def forward(argv: List[str], config: Optional[KBConfig] = None) -> bool:
+    """
+    Run a command through the daemon if one is serving this project.
+
+    Streams the daemon's output to stdout and returns True, or returns
+    False (without printing anything) so the caller runs it in-process.
+    Argument errors reported by the daemon are printed to stderr and
+    raise SystemExit with its exit code, as argparse would locally.
+    """
+    if not argv or argv[0] not in SERVED_COMMANDS:
+        return False
+    # Bound before the request: a daemon thread in this process (tests)
+    # redirects sys.stdout while it answers
+    stdout = sys.stdout
+    response = _request(config or KBConfig(), argv)
+    if response is None:
+        return False
+    sock, reader, header = response
+    with sock, reader:
+        if 'exit' in header:
+            sys.stderr.write(header.get('stderr', ''))
+            raise SystemExit(header['exit'])
+        for line in reader:
+            stdout.write(line)
+            stdout.flush()
+    return True
+
+
+def daemon_status(config: KBConfig) -> Optional[int]:
+    """PID of the daemon serving this project, or None"""
+    response = _request(config, ['ping'], timeout=2.0)
+    if response is None:
+        return None
+    sock, reader, header = response
+    sock.close()
+    return header.get('pid')
+
+
+def serve(interval: float = DEFAULT_INTERVAL, jobs: int = 1):
+    """Run the daemon in the foreground until interrupted or stopped"""
+    config = KBConfig()
+    Colors.enable_windows()
+
+    if not daemon_supported():
+        print_error("kb serve needs Unix domain sockets, which this platform lacks")
+        sys.exit(1)
+
+    socket_path = get_socket_path(config)
+    if daemon_status(config) is not None:
+        print_warning(f"A daemon is already serving {config.root_dir}")
+        return
+
+    print_header("🛰️  KB Daemon", f"Serving {config.root_dir}")
+    state = WarmState(config, jobs=jobs)
+    print_info(f"Warm: {len(state.cache.files)} files, {len(state.index.postings)} tokens")
+
+    socket_path.parent.mkdir(parents=True, exist_ok=True)
+    if socket_path.exists():
+        socket_path.unlink()  # stale socket from a daemon that died
+    old_umask = os.umask(0o077)
+    try:
+        server = KBDaemonServer(socket_path, state)
+    finally:
+        os.umask(old_umask)
+
+    stop = threading.Event()
+    watcher = threading.Thread(target=_poll, args=(state, interval, stop), daemon=True)
+    watcher.start()
+    print_success(f"Listening on {socket_path} (polling every {interval:g}s, Ctrl+C to stop)")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop.set()
+        server.server_close()
+        if socket_path.exists():
+            socket_path.unlink()
+    print_info("Daemon stopped")
+
+
+def stop_daemon(config: Optional[KBConfig] = None) -> bool:
+    """Ask a running daemon to shut down"""
+    response = _request(config or KBConfig(), ['shutdown'], timeout=2.0)
+    if response is None:
+        return False
+    response[0].close()
+    return True
+
+
+def parse_serve_args(argv: List[str]) -> argparse.Namespace:
+    """Parse `kb serve` arguments"""
+    parser = argparse.ArgumentParser(prog='kb serve', add_help=False)
+    parser.add_argument('--interval', type=float, default=DEFAULT_INTERVAL,
+                        help='Seconds between filesystem polls')
+    parser.add_argument('-j', '--jobs', type=int, default=1,
+                        help='Parallel scan workers for changed files (0 = one per CPU)')
+    parser.add_argument('--status', action='store_true', help='Show whether a daemon is running')
+    parser.add_argument('--stop', action='store_true', help='Stop the running daemon')
+    return parser.parse_args(argv)
+
+
+def serve_command(argv: List[str]):
+    """Entry point for `kb serve [--interval S] [--jobs N] [--status|--stop]`"""
+    args = parse_serve_args(argv)
+    config = KBConfig()
+    
+    if args.status:
+        pid = daemon_status(config)
+        if pid is None:
+            print_info("No daemon running")
+        else:
+            print_success(f"Daemon running (pid {pid}) on {get_socket_path(config)}")
+    elif args.stop:
+        if stop_daemon(config):
+            print_success("Daemon stopping")
+        else:
+            print_info("No daemon running")
+    else:
+        serve(interval=args.interval, jobs=args.jobs)
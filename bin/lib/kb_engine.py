@@ -0,0 +1,283 @@
+"""
+KB Engine Module
+One entry point for loading, caching, indexing and querying the KB
+"""
+
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+from kb_common import (
+    KBConfig, KBCache, get_all_kb_entries, get_kb_documents, split_frontmatter
+)
+from kb_search_index import SearchIndex, tokenize
+from kb_rank import rank
+from kb_scan import Buffer, LiteralMatcher, mapped, scan_lines
+
+
+# Corpus name -> (manifest name, search index name, vector index name, file lister)
+CORPORA: Dict[str, Tuple[str, str, str, Callable[[KBConfig], List[Path]]]] = {
+    # KB-*.md entries plus docs/ (without sprint artifacts): the kb CLI
+    'entries': ("manifest", "search-index", "vector-index",
+                lambda config: get_all_kb_entries(config.get_all_kb_paths())),
+    # Every KB markdown file but INDEX.md / README.md: the tools/ scripts
+    'documents': ("manifest-documents", "search-index-documents", "vector-index-documents",
+                  lambda config: get_kb_documents(config.get_kb_path())),
+}
+
+
+def match_file(entry_path: Path, matcher: LiteralMatcher, metadata: Dict) -> Optional[Dict]:
+    """Match terms in a file (memory-mapped, one pass for all terms)"""
+    # Extract context (first lines with a match)
+    context_lines = scan_lines(entry_path, matcher, limit=3)
+    if not context_lines:
+        return None
+
+    return {
+        'path': entry_path,
+        'title': metadata.get('title', 'Unknown'),
+        'category': metadata.get('category', 'unknown'),
+        'priority': metadata.get('priority', 'unknown'),
+        'context': context_lines
+    }
+
+
+def as_text(value) -> str:
+    """Frontmatter value as searchable text (lists joined with spaces)"""
+    if isinstance(value, list):
+        return ' '.join(str(item) for item in value)
+    return '' if value is None else str(value)
+
+
+class KBEngine:
+    """
+    Loading, caching, indexing and querying of one KB corpus
+
+    The engine owns the corpus file list (see CORPORA), its manifest cache
+    (frontmatter and first heading per file), its inverted search index
+    and its semantic vector index (kb_vector). All are loaded on first use
+    and brought up to date with a stat() walk, so only files changed since
+    the last run are read. Every search, list, report and aggregate in bin/
+    and tools/ goes through an engine, so each optimization of these paths
+    applies to all of them.
+
+    `cache`, `index` and `vectors` may be passed already refreshed (e.g. by
+    `kb serve`) to skip loading; refresh() picks up later filesystem changes.
+    """
+
+    def __init__(self, config: Optional[KBConfig] = None, corpus: str = 'entries',
+                 jobs: int = 1, cache: Optional[KBCache] = None,
+                 index: Optional[SearchIndex] = None, vectors=None):
+        if corpus not in CORPORA:
+            raise ValueError(f"Unknown corpus: {corpus} (expected one of {', '.join(CORPORA)})")
+        self.config = config or KBConfig()
+        self.corpus = corpus
+        self.jobs = jobs
+        self._cache = cache
+        self._index = index
+        self._vectors = vectors
+        self._paths: Optional[List[Path]] = None
+        self.reindexed: List[Path] = []  # files re-scanned by the last index sync
+        self.embedded: List[Path] = []   # files re-embedded by the last vector sync
+
+    def paths(self) -> List[Path]:
+        """Files of the corpus (listed once per refresh)"""
+        if self._paths is None:
+            self._paths = CORPORA[self.corpus][3](self.config)
+        return self._paths
+
+    @property
+    def cache(self) -> KBCache:
+        """Manifest cache, refreshed against the filesystem on first use"""
+        if self._cache is None:
+            self._cache = KBCache(self.config, name=CORPORA[self.corpus][0])
+            self._cache.refresh(self.paths(), jobs=self.jobs)
+        return self._cache
+
+    @property
+    def index(self) -> SearchIndex:
+        """Inverted search index, synced with the filesystem on first use"""
+        if self._index is None:
+            self._index = SearchIndex(self.config, name=CORPORA[self.corpus][1])
+            self.reindexed = self._index.sync(self.paths(), jobs=self.jobs)
+        return self._index
+
+    @property
+    def vectors(self):
+        """Semantic vector index (kb_vector.VectorIndex), synced on first use"""
+        if self._vectors is None:
+            # Imported here: only semantic search loads the vector index (and NumPy)
+            from kb_vector import VectorIndex
+            self._vectors = VectorIndex(self.config, name=CORPORA[self.corpus][2])
+            self.embedded = self._vectors.sync(self.paths(), jobs=self.jobs)
+        return self._vectors
+
+    def refresh(self) -> Dict[str, List[Path]]:
+        """
+        Bring the cache (and the indexes, if loaded) up to date.
+
+        Returns the manifest delta ({'added', 'changed', 'removed'}).
+        """
+        self._paths = None
+        if self._cache is None:
+            self._cache = KBCache(self.config, name=CORPORA[self.corpus][0])
+        delta = self._cache.refresh(self.paths(), jobs=self.jobs)
+        if self._index is not None:
+            self.reindexed = self._index.sync(self.paths(), jobs=self.jobs)
+        if self._vectors is not None:
+            self.embedded = self._vectors.sync(self.paths(), jobs=self.jobs)
+        return delta
+
+    # Metadata queries: answered from the manifest, no file is read
+
+    def entries(self, under: Optional[Path] = None) -> List[Tuple[Path, Dict]]:
+        """Readable (path, frontmatter) pairs sorted by path, optionally under a directory"""
+        return self.cache.entries(under)
+
+    def metadata(self, file_path: Path) -> Dict:
+        """Cached frontmatter of a file ({} if unknown)"""
+        return self.cache.get_metadata(file_path)
+
+    def heading(self, file_path: Path) -> Optional[str]:
+        """Cached first '# ' heading of a file"""
+        record = self.cache.get(file_path)
+        return record.get('heading') if record else None
+
+    def aggregates(self, name: Optional[str], facts: Callable, schema: str,
+                   under: Optional[Path] = None, verify: bool = False):
+        """Persisted aggregate store over the corpus (see kb_aggregates.AggregateStore)"""
+        # Imported here: only the stats and metrics reports need aggregates
+        from kb_aggregates import load_aggregates
+        return load_aggregates(self.config, self.cache, name, facts, schema,
+                               under=under, verify=verify)
+
+    # Full-text queries: narrowed with the index, verified on the files
+
+    def candidates(self, terms: Union[str, Iterable[str]],
+                   under: Optional[Path] = None) -> List[Path]:
+        """
+        Files that may contain any of the terms, sorted by path.
+
+        A superset of the real matches; terms without word characters
+        cannot be answered from the index and select every file.
+        """
+        terms = [terms] if isinstance(terms, str) else list(terms)
+        found = set()
+        for term in terms:
+            hits = self.index.lookup(term)
+            if hits is None:
+                found = {self.cache.root_dir / key for key in self.cache.files}
+                break
+            found.update(path for path, _ in hits)
+        if under is not None:
+            found = {path for path in found if under in path.parents}
+        return sorted(found)
+
+    def search(self, terms: Union[str, Iterable[str]]) -> Iterator[Dict]:
+        """Lazily yield file results (sorted by path) for any of the terms"""
+        terms = [terms] if isinstance(terms, str) else list(terms)
+        matcher = LiteralMatcher(terms)
+        for entry_path in self.candidates(terms):
+            result = match_file(entry_path, matcher, self.metadata(entry_path))
+            if result:
+                yield result
+
+    def rank(self, query: str, top_k: int = 10) -> Iterator[Dict]:
+        """Yield the top-k file results by BM25 score, best first"""
+        matcher = LiteralMatcher(tokenize(query))
+        return self._scored_results(rank(self.index, query, top_k), matcher)
+
+    def fuzzy(self, query: str, top_k: int = 10) -> Iterator[Dict]:
+        """
+        Yield the top-k file results for a query that may be misspelled.
+
+        Each query token also matches indexed tokens within a few edits
+        (see kb_fuzzy); near misses score a little lower than exact hits.
+        """
+        # Imported here: only `kb search --fuzzy` needs edit distances
+        from kb_fuzzy import expand_query, fuzzy_rank
+        expansions = expand_query(self.index, query)
+        matcher = LiteralMatcher(token for variants in expansions.values() for token in variants)
+        return self._scored_results(fuzzy_rank(self.index, expansions, top_k), matcher)
+
+    def corrections(self, query: str) -> Dict[str, str]:
+        """Closest indexed spelling of each query token the index lacks"""
+        from kb_fuzzy import expand_query, corrections
+        return corrections(self.index, expand_query(self.index, query))
+
+    def semantic(self, query: str, top_k: int = 10) -> Iterator[Dict]:
+        """
+        Yield the top-k files by similarity to the query, best first.
+
+        Files are scored by their best chunk in the vector index; the
+        chunk's header and opening text are the result context.
+        """
+        for score, key, chunk in self.vectors.search(query, top_k):
+            entry_path = self.config.root_dir / key
+            metadata = self.metadata(entry_path)
+            yield {
+                'path': entry_path,
+                'title': metadata.get('title', 'Unknown'),
+                'category': metadata.get('category', 'unknown'),
+                'priority': metadata.get('priority', 'unknown'),
+                'context': [line for line in (chunk['header'], chunk['preview']) if line],
+                'score': score,
+            }
+
+    def _scored_results(self, scored: List[Tuple[float, Path]],
+                        matcher: LiteralMatcher) -> Iterator[Dict]:
+        for score, entry_path in scored:
+            metadata = self.metadata(entry_path)
+            result = match_file(entry_path, matcher, metadata) or {
+                'path': entry_path,
+                'title': metadata.get('title', 'Unknown'),
+                'category': metadata.get('category', 'unknown'),
+                'priority': metadata.get('priority', 'unknown'),
+                'context': []
+            }
+            result['score'] = score
+            yield result
+
+    def scan(self, terms: Iterable[str],
+             under: Optional[Path] = None) -> Iterator[Tuple[Path, Buffer]]:
+        """
+        Yield (path, memory-mapped content) for candidate files of the terms.
+
+        The buffer is only valid until the next item is requested; match
+        it with a LiteralMatcher. Unreadable files are skipped.
+        """
+        for entry_path in self.candidates(terms, under):
+            try:
+                with mapped(entry_path) as data:
+                    yield entry_path, data
+            except OSError:
+                continue
+
+    def find(self, query: str, filters: Optional[Dict[str, str]] = None
+             ) -> Iterator[Tuple[Path, Dict, str]]:
+        """
+        Yield (path, frontmatter, body) for entries whose title, tags or body
+        contain `query` (case-insensitive), sorted by path.
+
+        Entries without frontmatter are skipped, and `filters` (field ->
+        value, falsy values ignored) are applied to the cached frontmatter
+        before any file is read. Title and tag matches come from the
+        manifest; only index candidates are read to check the body.
+        """
+        needle = query.lower()
+        filters = {field: value for field, value in (filters or {}).items() if value}
+        body_hits = set(self.candidates(query))
+
+        for entry_path, metadata in self.entries():
+            if not metadata or any(metadata.get(f) != v for f, v in filters.items()):
+                continue
+            in_fields = (needle in as_text(metadata.get('title', '')).lower()
+                         or needle in as_text(metadata.get('tags', [])).lower())
+            if not in_fields and entry_path not in body_hits:
+                continue
+            try:
+                content = entry_path.read_text(encoding='utf-8')
+            except (OSError, UnicodeDecodeError):
+                continue
+            _, body = split_frontmatter(content)
+            body = body.strip()
+            if in_fields or needle in body.lower():
+                yield entry_path, metadata, body
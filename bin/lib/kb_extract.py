@@ -0,0 +1,124 @@
+"""
+KB Extract Module
+Single-pass extraction of technologies, skills and tags from markdown
+"""
+
+import re
+from typing import Dict, Iterable, List, Optional
+
+# Technology dictionary (matched case-insensitively on word boundaries)
+TECHNOLOGIES = (
+    'Neo4j', 'Cypher', 'AuraDB', 'Figma', 'Adobe XD', 'Sketch', 'Framer', 'React', 'Vue',
+    'Angular', 'Python', 'JavaScript', 'TypeScript', 'Java', 'Node.js', 'HTML', 'CSS',
+    'GraphQL', 'REST', 'API', 'SQL', 'NoSQL', 'MongoDB', 'PostgreSQL', 'Redis', 'Docker',
+    'Kubernetes', 'AWS', 'Azure', 'GCP',
+    'Git', 'GitHub', 'GitLab', 'CI/CD', 'Jenkins', 'Webpack', 'Vite', 'Next.js', 'Astro',
+    'Tailwind', 'Bootstrap',
+)
+
+# Skills kept per document, from numbered headers and bold bullets
+MAX_HEADER_SKILLS = 20
+MAX_BULLET_SKILLS = 15
+
+
+def trie_pattern(words: Iterable[str]) -> str:
+    """
+    Regex alternation matching any of `words` (lowercased), factored into a trie.
+
+    Words sharing a prefix share one branch ('git(?:hub|lab)?'), so the
+    regex engine tests each character once per position instead of once
+    per word. Longer words win where both end on a word boundary.
+    """
+    root: Dict = {}
+    for word in words:
+        node = root
+        for char in word.lower():
+            node = node.setdefault(char, {})
+        node[''] = {}
+
+    def branch(node: Dict) -> str:
+        alternatives = []
+        for char in sorted(key for key in node if key):
+            # Collapse single-child chains into one literal
+            literal, child = char, node[char]
+            while len(child) == 1 and '' not in child:
+                (next_char, child), = child.items()
+                literal += next_char
+            alternatives.append(re.escape(literal) + branch(child))
+        if not alternatives:
+            return ''
+        body = '(?:' + '|'.join(alternatives) + ')'
+        return body + '?' if '' in node else body
+
+    return branch(root)
+
+
+def compile_extractor(technologies: Iterable[str] = TECHNOLOGIES) -> 're.Pattern':
+    """
+    One pattern finding skill headers, skill bullets, tags and technologies.
+
+    Headers, bullets and tags consume only their marker ('### 1. ', '- **',
+    '#') and capture their text with a lookahead, so the scan continues
+    inside that text and finds the technologies and tags in it too. A
+    leading class of every possible first character lets the engine
+    skip other positions without trying each branch.
+    """
+    technologies = list(technologies)
+    first = ''.join(sorted({re.escape(tech[0].lower()) for tech in technologies}))
+    return re.compile(
+        r'(?=[-#*' + first + r'])(?:'
+        r'(?P<header>###?\s+\d+\.?\d*\.?\s*)(?=(?P<header_text>.+))'
+        r'|(?P<bullet>[-*]\s+\*\*)(?=(?P<bullet_text>.+?)\*\*)'
+        r'|\#(?=(?P<tag>[\w-]+))'
+        r'|\b(?P<tech>' + trie_pattern(technologies) + r')\b)',
+        re.IGNORECASE
+    )
+
+
+EXTRACT_PATTERN = compile_extractor()
+
+
+def _skill(text: str, strip: str, level: str, source: str) -> Optional[Dict]:
+    """Skill dict for a header or bullet text, or None if too short or long"""
+    name = re.sub(strip, '', text).strip()
+    if 5 < len(name) < 100:
+        return {'name': name, 'level': level, 'source': source}
+    return None
+
+
+def extract(content: str, pattern: 're.Pattern' = EXTRACT_PATTERN) -> Dict[str, List]:
+    """
+    Technologies, skills and tags of a markdown document, in one scan.
+
+    Returns {'technologies': [str], 'skills': [{'name', 'level',
+    'source'}], 'tags': [str]}: technologies as written in the document
+    (distinct), skills from the first MAX_HEADER_SKILLS numbered '##'/'###'
+    headers and MAX_BULLET_SKILLS '- **bold**' bullets, tags from '#tag'.
+    """
+    technologies, tags = set(), set()
+    headers, bullets = [], []
+    # A header or bullet starting inside the previous one's text is not
+    # a new one (matches are consumed, not overlapping)
+    header_end = bullet_end = 0
+    for match in pattern.finditer(content):
+        kind = match.lastgroup
+        if kind == 'tech':
+            technologies.add(match.group('tech'))
+        elif kind == 'tag':
+            tags.add(match.group('tag'))
+        elif kind == 'header_text':
+            if match.start() >= header_end:
+                headers.append(match.group('header_text'))
+                header_end = match.end('header_text')
+        elif kind == 'bullet_text':
+            if match.start() >= bullet_end:
+                bullets.append(match.group('bullet_text'))
+                bullet_end = match.end('bullet_text') + 2
+
+    skills = [_skill(text, r'[#*`]', 'intermediate', 'header') for text in headers[:MAX_HEADER_SKILLS]]
+    skills += [_skill(text, r'[:#]', 'beginner', 'bullet') for text in bullets[:MAX_BULLET_SKILLS]]
+    return {
+        'technologies': list(technologies),
+        'skills': [skill for skill in skills if skill],
+        'tags': list(tags),
+    }
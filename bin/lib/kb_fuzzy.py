@@ -0,0 +1,100 @@
+"""
+KB Fuzzy Module
+Typo-tolerant search: trigram candidates, edit-distance ranking
+"""
+
+from pathlib import Path
+from typing import Dict, List, Tuple
+from kb_search_index import SearchIndex, tokenize, token_trigrams
+from kb_rank import rank_groups
+
+
+def max_edits(term: str) -> int:
+    """Edits tolerated for a query token: none up to 2 chars, 1 up to 5, then 2"""
+    if len(term) <= 2:
+        return 0
+    return 1 if len(term) <= 5 else 2
+
+
+def levenshtein(a: str, b: str, limit: int) -> int:
+    """
+    Edit distance between two strings, bounded by `limit`.
+
+    Stops as soon as every alignment needs more than `limit` edits and
+    returns limit + 1 in that case.
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(previous[j] + 1,            # deletion
+                               current[j - 1] + 1,         # insertion
+                               previous[j - 1] + (char_a != char_b)))
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return min(previous[-1], limit + 1)
+
+
+def expand(index: SearchIndex, term: str) -> Dict[str, int]:
+    """
+    Indexed tokens within max_edits(term) of a query token -> edit distance.
+
+    Candidates come from the trigram index: one edit changes at most
+    three padded trigrams, so a token within k edits shares at least
+    len(grams) - 3k of them. Only those are checked with levenshtein().
+    """
+    limit = max_edits(term)
+    if limit == 0:
+        return {term: 0} if term in index.postings else {}
+
+    grams = token_trigrams(term)
+    min_shared = max(1, len(grams) - 3 * limit)
+    found = {}
+    for token, shared in index.shared_trigrams(grams).items():
+        if shared < min_shared or abs(len(token) - len(term)) > limit:
+            continue
+        distance = levenshtein(term, token, limit)
+        if distance <= limit:
+            found[token] = distance
+    return found
+
+
+def similarity(term: str, distance: int) -> float:
+    """Score multiplier for a variant `distance` edits away from a query token"""
+    return 1.0 - distance / (len(term) + 1)
+
+
+def expand_query(index: SearchIndex, query: str) -> Dict[str, Dict[str, int]]:
+    """Each distinct query token -> its indexed variants and their distances"""
+    return {term: expand(index, term) for term in dict.fromkeys(tokenize(query))}
+
+
+def corrections(index: SearchIndex, expansions: Dict[str, Dict[str, int]]) -> Dict[str, str]:
+    """
+    Best replacement for each query token missing from the index.
+
+    The closest variant wins; ties go to the token found in more files.
+    """
+    fixed = {}
+    for term, variants in expansions.items():
+        if term in index.postings or not variants:
+            continue
+        fixed[term] = min(variants, key=lambda token: (
+            variants[token], -len(index.postings.get(token, {})), token))
+    return fixed
+
+
+def fuzzy_rank(index: SearchIndex, expansions: Dict[str, Dict[str, int]],
+               k: int = 10) -> List[Tuple[float, Path]]:
+    """
+    Top-k files by BM25 over the expanded query, best first.
+
+    A variant's score is scaled by similarity(), so exact matches rank
+    above near misses of the same term.
+    """
+    groups = [{token: similarity(term, distance) for token, distance in variants.items()}
+              for term, variants in expansions.items() if variants]
+    return rank_groups(index, groups, k)
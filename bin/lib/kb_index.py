@@ -3,69 +3,250 @@ KB Index Module
 Cross-platform INDEX.md generation
 """
 
+import argparse
+from bisect import insort
 from pathlib import Path
 from datetime import datetime
-from collections import defaultdict
+from typing import Dict, List
 from kb_common import (
-    KBConfig, Colors, parse_frontmatter, get_kb_entries, get_all_kb_entries,
-    print_header, print_success, get_priority_icon, get_category_icon
+    KBConfig, Colors, KBCache, get_all_kb_entries,
+    load_json, write_json_atomic, write_text_if_changed, watch_files,
+    LAST_UPDATED_PATTERN, print_header, print_success, print_info,
+    get_priority_icon, get_category_icon
 )
+from kb_engine import KBEngine
 
 
-def update_index():
-    """Update INDEX.md"""
-    config = KBConfig()
-    Colors.enable_windows()
+MODEL_VERSION = 1
+
+# Frontmatter fields INDEX.md groups entries by
+GROUP_FIELDS = ('category', 'priority', 'date')
+
+
+class IndexModel:
+    """
+    Grouped model behind INDEX.md
     
-    print_header("📇 Updating Knowledge Base Index", "Scanning KB + docs directories...")
+    Persists the frontmatter of every entry and, per group field, the
+    sorted entry keys of each group in .agent/knowledge-base/.cache/
+    index-model.json. sync() diffs the model against the manifest cache
+    by head hash, so only added, changed and removed entries are regrouped,
+    even when another command refreshed the manifest in between.
+    """
     
-    all_paths = config.get_all_kb_paths()
-    entries = get_all_kb_entries(all_paths)
+    def __init__(self, config: KBConfig):
+        self.root_dir = config.root_dir
+        self.path = config.get_cache_dir() / "index-model.json"
+        self.clear()
+        self.load()
     
-    # Parse all entries
-    parsed_entries = []
-    for entry_path in entries:
-        try:
-            content = entry_path.read_text(encoding='utf-8')
-            metadata = parse_frontmatter(content)
-            
-            if metadata:
-                metadata['path'] = entry_path
-                metadata['filename'] = entry_path.name
-                parsed_entries.append(metadata)
-        except Exception as e:
-            continue
-    
-    # Group entries
-    by_category = defaultdict(list)
-    by_priority = defaultdict(list)
-    by_date = defaultdict(list)
-    
-    for entry in parsed_entries:
-        category = entry.get('category', 'unknown')
-        priority = entry.get('priority', 'unknown')
-        date = entry.get('date', 'unknown')
+    def clear(self):
+        """Forget all entries"""
+        self.entries: Dict[str, Dict] = {}                    # key -> {'hash', 'metadata'}
+        self.groups: Dict[str, Dict[str, List[str]]] = {
+            field: {} for field in GROUP_FIELDS
+        }                                                     # field -> value -> [key, ...]
+    
+    def load(self) -> bool:
+        """Load model from disk"""
+        data = load_json(self.path)
+        if not data or data.get('version') != MODEL_VERSION:
+            return False
+        self.entries = data.get('entries', {})
+        self.groups = data.get('groups', self.groups)
+        return True
+    
+    def save(self):
+        """Persist model to disk"""
+        write_json_atomic(self.path, {
+            'version': MODEL_VERSION,
+            'entries': self.entries,
+            'groups': self.groups,
+        })
+    
+    @staticmethod
+    def group_value(metadata: Dict, field: str) -> str:
+        """Group an entry falls into for a field"""
+        value = metadata.get(field, 'unknown')
+        return value if isinstance(value, str) else str(value)
+    
+    def _add(self, key: str, record: Dict):
+        self.entries[key] = {'hash': record['hash'], 'metadata': record['metadata']}
+        for field in GROUP_FIELDS:
+            value = self.group_value(record['metadata'], field)
+            insort(self.groups[field].setdefault(value, []), key)
+    
+    def _remove(self, key: str):
+        metadata = self.entries.pop(key)['metadata']
+        for field in GROUP_FIELDS:
+            value = self.group_value(metadata, field)
+            keys = self.groups[field].get(value, [])
+            if key in keys:
+                keys.remove(key)
+            if not keys:
+                self.groups[field].pop(value, None)
+    
+    def sync(self, cache: KBCache) -> Dict[str, List[str]]:
+        """
+        Apply the manifest's add/modify/delete delta to the model.
         
-        by_category[category].append(entry)
-        by_priority[priority].append(entry)
-        by_date[date].append(entry)
+        Returns the delta as {'added': [...], 'changed': [...], 'removed': [...]}
+        (entry keys); the model is saved only if it changed.
+        """
+        delta = {'added': [], 'changed': [], 'removed': []}
+        current = {
+            key: record for key, record in cache.files.items()
+            if record['metadata']
+        }
+        
+        for key in [k for k in self.entries if k not in current]:
+            self._remove(key)
+            delta['removed'].append(key)
+        
+        for key, record in current.items():
+            entry = self.entries.get(key)
+            if entry and entry['hash'] == record['hash']:
+                continue
+            if entry:
+                self._remove(key)
+            self._add(key, record)
+            delta['changed' if entry else 'added'].append(key)
+        
+        if any(delta.values()):
+            self.save()
+        return delta
+    
+    def entry(self, key: str) -> Dict:
+        """Frontmatter of an entry plus its path and filename"""
+        metadata = dict(self.entries[key]['metadata'])
+        metadata['path'] = self.root_dir / key
+        metadata['filename'] = metadata['path'].name
+        return metadata
+    
+    def grouped(self, field: str) -> Dict[str, List[Dict]]:
+        """Entries grouped by a field"""
+        return {
+            value: [self.entry(key) for key in keys]
+            for value, keys in self.groups[field].items()
+        }
     
-    # Generate INDEX.md
-    index_content = generate_index_content(parsed_entries, by_category, by_priority, by_date)
+    def render(self) -> str:
+        """INDEX.md content for the current model"""
+        entries = [self.entry(key) for key in sorted(self.entries)]
+        return generate_index_content(
+            entries, self.grouped('category'), self.grouped('priority'), self.grouped('date')
+        )
+
+
+def refresh_index(config: KBConfig, jobs: int = 1, full: bool = False,
+                  semantic: bool = False) -> Dict:
+    """
+    Bring the index model, INDEX.md and the search index up to date.
+    
+    INDEX.md is rewritten only if the rendered content changed (the Last
+    Updated timestamp alone does not count). With `full` the model is
+    rebuilt from scratch; with `semantic` the vector index is refreshed
+    too. Returns a report with the model, its delta, whether INDEX.md was
+    written, the search index files re-scanned and (with `semantic`) the
+    vector index size and files re-embedded.
+    """
+    # Parsed entries come from the manifest cache (re-parses changed files only)
+    engine = KBEngine(config, jobs=jobs)
     
-    # Write INDEX.md
-    index_path = config.get_index_path()
-    index_path.write_text(index_content, encoding='utf-8')
+    model = IndexModel(config)
+    if full:
+        model.clear()
+    delta = model.sync(engine.cache)
+    
+    written = write_text_if_changed(config.get_index_path(), model.render(),
+                                    ignore=LAST_UPDATED_PATTERN)
+    
+    # Refresh search index (re-scans only changed files)
+    report = {
+        'model': model,
+        'delta': delta,
+        'written': written,
+        'indexed': len(engine.index.files),
+        'rescanned': engine.reindexed,
+    }
+    if semantic:
+        report['chunks'] = len(engine.vectors)
+        report['embedded'] = engine.embedded
+    return report
+
+
+def format_delta(delta: Dict[str, List]) -> str:
+    """One-line summary of an add/modify/delete delta"""
+    return f"+{len(delta['added'])} ~{len(delta['changed'])} -{len(delta['removed'])}"
+
+
+def update_index(jobs: int = 1, full: bool = False, semantic: bool = False):
+    """Update INDEX.md (jobs: parallel scan workers, 0 = one per CPU)"""
+    config = KBConfig()
+    Colors.enable_windows()
     
-    print_success(f"INDEX.md Updated Successfully!")
+    print_header("📇 Updating Knowledge Base Index", "Scanning KB + docs directories...")
+    
+    report = refresh_index(config, jobs=jobs, full=full, semantic=semantic)
+    model = report['model']
+    
+    if report['written']:
+        print_success(f"INDEX.md Updated Successfully!")
+    else:
+        print_info("INDEX.md already up to date")
     print()
     print(f"{Colors.CYAN}📊 Statistics:{Colors.RESET}")
-    print(f"   Total Entries: {len(parsed_entries)}")
-    print(f"   Categories: {len(by_category)}")
-    print(f"   Priorities: {len(by_priority)}")
+    print(f"   Total Entries: {len(model.entries)}")
+    print(f"   Categories: {len(model.groups['category'])}")
+    print(f"   Priorities: {len(model.groups['priority'])}")
+    print(f"   Changes: {format_delta(report['delta'])}")
+    print(f"   Search Index: {report['indexed']} files, {len(report['rescanned'])} re-indexed")
+    if semantic:
+        print(f"   Vector Index: {report['chunks']} sections, {len(report['embedded'])} files re-embedded")
     print()
 
 
+def watch_index(jobs: int = 1, interval: float = 1.0, debounce: float = 0.5):
+    """Keep INDEX.md current, re-applying deltas whenever KB files change"""
+    config = KBConfig()
+    update_index(jobs=jobs)
+    print_info(f"Watching for changes (polling every {interval:g}s, Ctrl+C to stop)")
+    
+    def on_change(_):
+        report = refresh_index(config, jobs=jobs)
+        stamp = datetime.now().strftime('%H:%M:%S')
+        summary = format_delta(report['delta'])
+        if report['written']:
+            print_success(f"[{stamp}] INDEX.md updated ({summary})")
+        else:
+            print_info(f"[{stamp}] INDEX.md unchanged ({summary})")
+    
+    try:
+        watch_files(lambda: get_all_kb_entries(config.get_all_kb_paths()), on_change,
+                    interval=interval, debounce=debounce)
+    except KeyboardInterrupt:
+        print()
+        print_info("Stopped watching")
+
+
+def parse_index_args(argv: List[str]) -> argparse.Namespace:
+    """Parse `kb index` arguments"""
+    parser = argparse.ArgumentParser(prog='kb index', add_help=False)
+    parser.add_argument('-j', '--jobs', type=int, default=1,
+                        help='Parallel scan workers for changed files (0 = one per CPU)')
+    parser.add_argument('--full', action='store_true',
+                        help='Rebuild the index model from scratch')
+    parser.add_argument('--watch', action='store_true',
+                        help='Keep running and update INDEX.md when entries change')
+    parser.add_argument('--interval', type=float, default=1.0,
+                        help='Seconds between filesystem polls in --watch mode')
+    parser.add_argument('--debounce', type=float, default=0.5,
+                        help='Seconds changes must settle before updating')
+    parser.add_argument('--semantic', action='store_true',
+                        help='Also refresh the vector index used by kb search --semantic')
+    return parser.parse_args(argv)
+
+
 def generate_index_content(entries, by_category, by_priority, by_date):
     """Generate INDEX.md content"""
     content = f"""# Knowledge Base Index
@@ -3,142 +3,534 @@ KB List Module
 Cross-platform entry listing
 """
 
+import sys
+import json
+import base64
+import argparse
+from bisect import bisect_left, bisect_right, insort
 from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
 from kb_common import (
-    KBConfig, Colors, parse_frontmatter, get_kb_entries, format_time_ago,
-    print_header, get_priority_icon, get_category_icon
+    KBConfig, Colors, KBCache, format_time_ago, load_json, scan_changed_dirs,
+    write_json_atomic, print_header, print_error, get_priority_icon, get_category_icon
 )
+from kb_engine import KBEngine
 
 
-def list_entries(category=None, recent=None):
-    """List KB entries"""
+LIST_INDEX_VERSION = 3
+
+# Sort orders for `kb list --sort`; rows are kept ascending, `reverse`
+# orders are read from the end
+SORTS = {
+    'name': True,       # file name, newest ID first (default)
+    'modified': False,  # modification time, newest first (kb recent)
+    'date': True,       # frontmatter date, newest first
+    'priority': True,   # critical first, then newest ID
+    'title': False,     # A-Z
+}
+
+PRIORITY_ORDER = ['critical', 'high', 'medium', 'low']
+
+# Frontmatter fields kept in the index (all a listing prints)
+LISTED_FIELDS = ('title', 'category', 'priority', 'date')
+
+ENTRY_PATTERN = "KB-*.md"
+
+
+def sort_row(sort: str, key: str, record: Dict) -> List:
+    """Sort key of an entry for an order, ending with the entry key"""
+    metadata = record['metadata']
+    name = key.rpartition('/')[2]
+    if sort == 'modified':
+        return [-record['mtime'], key]  # ascending: newest first, ties by path
+    if sort == 'date':
+        return [str(metadata.get('date', '')), name, key]
+    if sort == 'priority':
+        priority = metadata.get('priority', 'unknown')
+        rank = PRIORITY_ORDER.index(priority) if priority in PRIORITY_ORDER else len(PRIORITY_ORDER)
+        return [-rank, name, key]
+    if sort == 'title':
+        return [str(metadata.get('title', 'Unknown')).casefold(), key]
+    return [name, key]
+
+
+def encode_cursor(sort: str, row: List) -> str:
+    """Opaque cursor pointing after a row"""
+    data = json.dumps([sort, row], ensure_ascii=False, separators=(',', ':'))
+    return base64.urlsafe_b64encode(data.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(sort: str, cursor: str) -> List:
+    """Row a cursor points after (ValueError if invalid or for another order)"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        cursor_sort, row = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')).decode('utf-8'))
+    except (ValueError, TypeError, UnicodeError):
+        raise ValueError(f"invalid cursor: {cursor}")
+    if cursor_sort != sort or not isinstance(row, list):
+        raise ValueError(f"cursor belongs to --sort {cursor_sort}, not {sort}")
+    return row
+
+
+class ListIndex:
+    """
+    Sorted metadata index behind `kb list` and `kb recent`
+
+    Keeps the listed frontmatter and mtime of every KB entry plus one
+    ascending row list per sort order, so a page is a bisect and a slice
+    instead of a sort. Persisted in .agent/knowledge-base/.cache/
+    list-index.json (in memory only if name is None) and updated from the
+    manifest by hash and mtime.
+
+    The mtime and subdirectories of every KB directory are stored too:
+    scan() stats only directories, and lists only those whose mtime
+    changed, so adding or deleting entries is picked up without a stat()
+    per file. Edits in place do not touch the directory; they are picked
+    up once any command (`kb search`, `kb index`, `kb serve`...) refreshes
+    the manifest, whose signature is stored, or with `--refresh`, which
+    stats every file. With nothing changed, the manifest is not loaded.
+
+    A long-lived process (`kb serve`) keeps one in-memory index and
+    applies each manifest delta with update().
+    """
+
+    def __init__(self, config: KBConfig, name: Optional[str] = "list-index"):
+        self.root_dir = config.root_dir
+        self.kb_path = config.get_kb_path()
+        self.cache_dir = config.get_cache_dir()
+        self.path = self.cache_dir / f"{name}.json" if name else None
+        self.dirs: Dict[str, List] = {}      # dir key -> [mtime_ns, [subdir names]]
+        self.records: Dict[str, Dict] = {}   # entry key -> {'hash', 'mtime', 'metadata'}
+        self.orders: Dict[str, List[List]] = {sort: [] for sort in SORTS}
+        self.manifest: Optional[List[int]] = None  # KBCache.signature at the last sync
+        self.dirty = False
+        self.load()
+
+    def load(self) -> bool:
+        """Load the index from disk"""
+        if self.path is None:
+            return False
+        data = load_json(self.path)
+        if not data or data.get('version') != LIST_INDEX_VERSION or set(data.get('orders', {})) != set(SORTS):
+            return False
+        self.dirs = data['dirs']
+        self.records = data['records']
+        self.orders = data['orders']
+        self.manifest = data.get('manifest')
+        return True
+
+    def save(self):
+        """Persist the index to disk if it changed"""
+        if self.path is None or not self.dirty:
+            return
+        write_json_atomic(self.path, {
+            'version': LIST_INDEX_VERSION,
+            'dirs': self.dirs,
+            'records': self.records,
+            'orders': self.orders,
+            'manifest': self.manifest,
+        })
+        self.dirty = False
+
+    def key(self, path: Path) -> str:
+        """Index key for a path (relative to project root)"""
+        try:
+            return path.relative_to(self.root_dir).as_posix()
+        except ValueError:
+            return path.as_posix()
+
+    def scan(self) -> Tuple[List[Path], List[str]]:
+        """
+        Find directories changed since the last scan.
+
+        Returns the entry files in changed directories and the keys of
+        changed or removed directories (see KBCache.refresh `within`).
+        """
+        files, changed = scan_changed_dirs(self.kb_path, self.dirs, self.key,
+                                           ENTRY_PATTERN, skip=self.cache_dir)
+        if changed:
+            self.dirty = True
+        return files, changed
+
+    @staticmethod
+    def _listed(record: Dict) -> Dict:
+        """Index record for a manifest record (listed fields only)"""
+        metadata = record['metadata'] or {}  # None: no frontmatter
+        return {
+            'hash': record['hash'],
+            'mtime': record['mtime'],
+            'metadata': {
+                field: metadata[field]
+                for field in LISTED_FIELDS if field in metadata
+            },
+        }
+
+    def _insert(self, key: str, record: Dict):
+        self.records[key] = record
+        for sort, rows in self.orders.items():
+            insort(rows, sort_row(sort, key, record))
+
+    def _delete(self, key: str):
+        record = self.records.pop(key)
+        for sort, rows in self.orders.items():
+            row = sort_row(sort, key, record)
+            i = bisect_left(rows, row)
+            if i < len(rows) and rows[i] == row:
+                del rows[i]
+
+    def sync(self, cache) -> int:
+        """
+        Bring the entries in line with a manifest (KBCache or Snapshot).
+
+        Only entries under the KB directory are listed; ones without
+        frontmatter show as 'Unknown'.
+        Returns the number of entries added, changed or removed.
+        """
+        prefix = self.key(self.kb_path).rstrip('/') + '/'
+        current = {
+            key: record for key, record in cache.files.items()
+            if key.startswith(prefix)
+        }
+        if not self.records:
+            # First build: sort once instead of inserting row by row
+            for key, record in current.items():
+                self.records[key] = self._listed(record)
+            self.orders = {
+                sort: sorted(sort_row(sort, key, record) for key, record in self.records.items())
+                for sort in SORTS
+            }
+            self.dirty = self.dirty or bool(current)
+            return len(current)
+
+        touched = 0
+        for key in [k for k in self.records if k not in current]:
+            self._delete(key)
+            touched += 1
+        for key, record in current.items():
+            known = self.records.get(key)
+            if known and known['hash'] == record['hash'] and known['mtime'] == record['mtime']:
+                continue
+            if known:
+                self._delete(key)
+            self._insert(key, self._listed(record))
+            touched += 1
+        if touched:
+            self.dirty = True
+        return touched
+
+    def update(self, cache, delta: Dict[str, List[Path]]) -> int:
+        """
+        Apply a manifest delta (from KBCache.refresh) to the entries.
+
+        Only the paths in the delta are looked at, instead of comparing
+        every entry as sync() does. Returns the number of entries updated.
+        """
+        prefix = self.key(self.kb_path).rstrip('/') + '/'
+        touched = 0
+        for path in [p for paths in delta.values() for p in paths]:
+            key = self.key(path)
+            if not key.startswith(prefix):
+                continue
+            if key in self.records:
+                self._delete(key)
+            record = cache.files.get(key)
+            if record is not None:
+                self._insert(key, self._listed(record))
+            touched += 1
+        if touched:
+            self.dirty = True
+        return touched
+
+    def categories(self) -> List[str]:
+        """Top-level KB directories (known from scans, or holding entries)"""
+        kb_key = self.key(self.kb_path)
+        prefix = kb_key.rstrip('/') + '/'
+        names = set(self.dirs.get(kb_key, [0, []])[1])
+        names.update(
+            key[len(prefix):].split('/', 1)[0]
+            for key in self.records if '/' in key[len(prefix):]
+        )
+        return sorted(name for name in names if not name.startswith('.'))
+
+    def count(self, under: Optional[str] = None) -> int:
+        """Number of entries, optionally under a directory key"""
+        if under is None:
+            return len(self.records)
+        prefix = under.rstrip('/') + '/'
+        return sum(1 for key in self.records if key.startswith(prefix))
+
+    def rows(self, sort: str, after: Optional[List] = None) -> Iterator[List]:
+        """Rows of an order from the start, or from just after a cursor row"""
+        rows = self.orders[sort]
+        if SORTS[sort]:
+            end = bisect_left(rows, after) if after is not None else len(rows)
+            for i in range(end - 1, -1, -1):
+                yield rows[i]
+        else:
+            start = bisect_right(rows, after) if after is not None else 0
+            for i in range(start, len(rows)):
+                yield rows[i]
+
+    def page(self, sort: str = 'name', size: Optional[int] = None, page: int = 1,
+             cursor: Optional[str] = None, under: Optional[str] = None
+             ) -> Tuple[List[Tuple[Path, Dict, float]], Optional[str]]:
+        """
+        One page of (path, frontmatter, mtime in seconds) rows.
+
+        `cursor` (from a previous page) continues right after the last row
+        shown, so pages stay stable while entries are added or removed;
+        otherwise `page` counts from 1. `size` None returns everything.
+        Returns the rows and the cursor of the next page (None at the end).
+        """
+        after = decode_cursor(sort, cursor) if cursor else None
+        skip = 0 if cursor or size is None else (max(page, 1) - 1) * size
+        prefix = under.rstrip('/') + '/' if under is not None else None
+
+        result = []
+        last = None
+        for row in self.rows(sort, after):
+            key = row[-1]
+            if prefix is not None and not key.startswith(prefix):
+                continue
+            if skip:
+                skip -= 1
+                continue
+            if size is not None and len(result) == size:
+                return result, encode_cursor(sort, last)
+            record = self.records[key]
+            result.append((self.root_dir / key, dict(record['metadata']), record['mtime'] / 1e9))
+            last = row
+        return result, None
+
+
+def load_list_index(config: KBConfig, cache=None, jobs: int = 1,
+                    refresh: bool = False) -> ListIndex:
+    """
+    Load the list index and bring it up to date.
+
+    With a passed cache (a Snapshot, or any manifest) an in-memory index
+    is built from it. Otherwise only changed directories are rescanned,
+    and the manifest is loaded only if they or its signature changed;
+    `refresh` re-stats every file.
+    """
+    if cache is not None:
+        index = ListIndex(config, name=None)
+        index.sync(cache)
+        return index
+
+    index = ListIndex(config)
+    if refresh:
+        cache = KBEngine(config, jobs=jobs).cache
+        index.scan()
+    else:
+        files, changed = index.scan()
+        if not changed and index.manifest is not None and index.manifest == KBCache.signature(config):
+            return index
+        cache = KBCache(config)
+        if changed:
+            cache.refresh(files, jobs=jobs, within=changed)
+    index.sync(cache)
+    signature = KBCache.signature(config)
+    if signature != index.manifest:
+        index.manifest = signature
+        index.dirty = True
+    index.save()
+    return index
+
+
+def list_entries(category=None, recent=None, cache: Optional[KBCache] = None,
+                 sort: Optional[str] = None, page: int = 1, page_size: Optional[int] = None,
+                 cursor: Optional[str] = None, refresh: bool = False, jobs: int = 1,
+                 index: Optional[ListIndex] = None):
+    """
+    List KB entries.
+
+    sort: one of SORTS (default 'name'; 'modified' for recent). With
+    page_size, one page is printed with a cursor for the next one.
+    cache: a kb_snapshot.Snapshot to list an exported snapshot (or any
+    already refreshed manifest). index: a ListIndex kept current by the
+    caller (`kb serve`), used as is.
+    """
     config = KBConfig()
     Colors.enable_windows()
-    
+
+    sort = sort or ('modified' if recent else 'name')
+    if cursor:
+        try:
+            decode_cursor(sort, cursor)
+        except ValueError as e:
+            print_error(str(e))
+            sys.exit(1)
+
+    if index is None:
+        index = load_list_index(config, cache=cache, jobs=jobs, refresh=refresh)
+    view = {'sort': sort, 'page': page, 'cursor': cursor}
+    page_size = page_size if page_size and page_size > 0 else None
+
     if recent:
-        list_recent_entries(config, recent)
+        list_recent_entries(config, recent, index, **view)
     elif category:
-        list_by_category(config, category)
+        list_by_category(config, category, index, page_size=page_size, **view)
     else:
-        list_all_entries(config)
+        list_all_entries(config, index, page_size=page_size, **view)
 
 
-def list_all_entries(config: KBConfig):
+def print_next_page(shown: int, total: int, next_cursor: Optional[str], command: str):
+    """Footer of a paginated listing"""
+    print(f"{Colors.GRAY}Showing {shown} of {total} entries{Colors.RESET}")
+    if next_cursor:
+        print(f"{Colors.CYAN}Next page:{Colors.RESET} {Colors.MAGENTA}{command} --cursor {next_cursor}{Colors.RESET}")
+    print()
+
+
+def list_all_entries(config: KBConfig, index: ListIndex, sort: str = 'name',
+                     page_size: Optional[int] = None, page: int = 1,
+                     cursor: Optional[str] = None):
     """List all entries"""
     print_header("📋 Listing All Entries", "All knowledge base entries")
-    
-    kb_path = config.get_kb_path()
-    entries = get_kb_entries(kb_path)
-    
-    if not entries:
+
+    total = index.count()
+    if not total:
         print(f"{Colors.YELLOW}No entries found.{Colors.RESET}")
         return
-    
-    print(f"{Colors.GREEN}Found {len(entries)} entries:{Colors.RESET}")
+
+    print(f"{Colors.GREEN}Found {total} entries:{Colors.RESET}")
     print()
-    
-    # Sort by date (newest first)
-    sorted_entries = sorted(entries, key=lambda x: x.name, reverse=True)
-    
-    for entry_path in sorted_entries:
+
+    # Rows come pre-sorted from the index (default: newest ID first)
+    entries, next_cursor = index.page(sort, page_size, page, cursor)
+
+    for entry_path, metadata, _ in entries:
         try:
-            content = entry_path.read_text(encoding='utf-8')
-            metadata = parse_frontmatter(content)
-            
             title = metadata.get('title', 'Unknown')
             priority = metadata.get('priority', 'unknown')
             category = metadata.get('category', 'unknown')
-            
+
             priority_icon = get_priority_icon(priority)
             category_icon = get_category_icon(category)
-            
+
             rel_path = entry_path.relative_to(config.root_dir)
-            
+
             print(f"  {priority_icon} {category_icon} {Colors.WHITE}{title}{Colors.RESET}")
             print(f"     {Colors.GRAY}{rel_path}{Colors.RESET}")
             print()
         except:
             continue
 
+    if page_size:
+        print_next_page(len(entries), total, next_cursor,
+                        f"kb list --sort {sort} --page-size {page_size}")
+
 
-def list_by_category(config: KBConfig, category: str):
+def list_by_category(config: KBConfig, category: str, index: ListIndex, sort: str = 'name',
+                     page_size: Optional[int] = None, page: int = 1,
+                     cursor: Optional[str] = None):
     """List entries by category"""
     print_header(f"📋 Listing Entries in Category: {category}", f"Filtered by {category}")
-    
+
     kb_path = config.get_kb_path()
-    category_path = kb_path / category
-    
-    if not category_path.exists():
-        # Try common category paths
-        for cat_dir in ['bugs', 'features', 'architecture', 'security', 'performance', 'platform-specific']:
+    kb_key = index.key(kb_path)
+    available = index.categories()
+    category_dir = category.strip('/')
+
+    if not index.count(f"{kb_key}/{category_dir}") and not (kb_path / category_dir).is_dir():
+        # Try category directories by partial name (e.g. "bug" -> bugs)
+        for cat_dir in available:
             if category.lower() in cat_dir:
-                category_path = kb_path / cat_dir
+                category_dir = cat_dir
                 break
-    
-    if not category_path.exists():
+
+    under = f"{kb_key}/{category_dir}"
+    total = index.count(under)
+
+    if not total:
+        if (kb_path / category_dir).is_dir():
+            print(f"{Colors.YELLOW}No entries found in category: {category}{Colors.RESET}")
+            return
         print(f"{Colors.YELLOW}Category not found: {category}{Colors.RESET}")
         print()
         print(f"{Colors.CYAN}Available categories:{Colors.RESET}")
-        for cat_dir in kb_path.iterdir():
-            if cat_dir.is_dir() and not cat_dir.name.startswith('.'):
-                print(f"  - {cat_dir.name}")
-        return
-    
-    entries = list(category_path.rglob('KB-*.md'))
-    
-    if not entries:
-        print(f"{Colors.YELLOW}No entries found in category: {category}{Colors.RESET}")
+        for cat_dir in available:
+            print(f"  - {cat_dir}")
         return
-    
-    print(f"{Colors.GREEN}Found {len(entries)} entries:{Colors.RESET}")
+
+    print(f"{Colors.GREEN}Found {total} entries:{Colors.RESET}")
     print()
-    
-    for entry_path in sorted(entries, key=lambda x: x.name, reverse=True):
+
+    entries, next_cursor = index.page(sort, page_size, page, cursor, under=under)
+
+    for entry_path, metadata, _ in entries:
         try:
-            content = entry_path.read_text(encoding='utf-8')
-            metadata = parse_frontmatter(content)
-            
             title = metadata.get('title', 'Unknown')
             priority = metadata.get('priority', 'unknown')
-            
+
             priority_icon = get_priority_icon(priority)
             rel_path = entry_path.relative_to(config.root_dir)
-            
+
             print(f"  {priority_icon} {Colors.WHITE}{title}{Colors.RESET}")
             print(f"     {Colors.GRAY}{rel_path}{Colors.RESET}")
             print()
         except:
             continue
 
+    if page_size:
+        print_next_page(len(entries), total, next_cursor,
+                        f"kb list {category_dir} --sort {sort} --page-size {page_size}")
+
 
-def list_recent_entries(config: KBConfig, count: int):
+def list_recent_entries(config: KBConfig, count: int, index: ListIndex, sort: str = 'modified',
+                        page: int = 1, cursor: Optional[str] = None):
     """List recent entries"""
     print_header(f"📅 Recent {count} Entries", "Most recently modified")
-    
-    kb_path = config.get_kb_path()
-    entries = get_kb_entries(kb_path)
-    
-    if not entries:
+
+    if not index.count():
         print(f"{Colors.YELLOW}No entries found.{Colors.RESET}")
         return
-    
-    # Sort by modification time
-    sorted_entries = sorted(entries, key=lambda x: x.stat().st_mtime, reverse=True)[:count]
-    
-    for entry_path in sorted_entries:
+
+    # Newest first straight from the index: no sort, no stat()
+    entries, next_cursor = index.page(sort, count, page, cursor)
+
+    for entry_path, metadata, mtime in entries:
         try:
-            content = entry_path.read_text(encoding='utf-8')
-            metadata = parse_frontmatter(content)
-            
             title = metadata.get('title', 'Unknown')
             category = metadata.get('category', 'unknown')
             priority = metadata.get('priority', 'unknown')
-            
-            time_ago = format_time_ago(entry_path)
+
+            time_ago = format_time_ago(entry_path, mtime)
             category_icon = get_category_icon(category)
-            
+
             print(f"  {category_icon} {Colors.WHITE}{title}{Colors.RESET}")
             print(f"     Category: {category} | {Colors.GRAY}{time_ago}{Colors.RESET}")
             print()
         except:
             continue
+
+    if page > 1 or cursor:
+        print_next_page(len(entries), index.count(), next_cursor, f"kb recent {count} --sort {sort}")
+
+
+def parse_list_args(command: str, argv: List[str]) -> argparse.Namespace:
+    """Parse `kb list` / `kb recent` arguments"""
+    parser = argparse.ArgumentParser(prog=f'kb {command}', add_help=False)
+    parser.add_argument('value', nargs='?')
+    parser.add_argument('-j', '--jobs', type=int, default=1)
+    parser.add_argument('--snapshot', help='Read metadata from a kb export snapshot')
+    parser.add_argument('--sort', choices=sorted(SORTS), default=None,
+                        help="Order (default: name for list, modified for recent)")
+    parser.add_argument('--page', type=int, default=1, help='Page number, from 1')
+    parser.add_argument('--page-size', type=int, default=None, help='Entries per page')
+    parser.add_argument('--cursor', help='Continue after the previous page (stable while entries change)')
+    parser.add_argument('--refresh', action='store_true',
+                        help='Re-stat every entry first (picks up edits made in place)')
+    return parser.parse_args(argv)
+
+
+def list_command(command: str, args: argparse.Namespace, cache: Optional[KBCache] = None,
+                 index: Optional[ListIndex] = None):
+    """Run a parsed `kb list` / `kb recent` (cache, index: see list_entries)"""
+    view = dict(sort=args.sort, page=args.page, cursor=args.cursor,
+                refresh=args.refresh, jobs=args.jobs, index=index)
+    if command == 'recent':
+        list_entries(recent=int(args.value) if args.value else 10, cache=cache, **view)
+    else:
+        list_entries(args.value, cache=cache, page_size=args.page_size, **view)
@@ -0,0 +1,115 @@
+"""
+KB Rank Module
+BM25 relevance ranking over title, tags and body
+"""
+
+import heapq
+import math
+from pathlib import Path
+from typing import Dict, List, Tuple
+from kb_search_index import SearchIndex, tokenize
+
+
+# Field weights: a title hit counts three times a body hit
+FIELD_WEIGHTS = {
+    'title': 3.0,
+    'tags': 2.0,
+    'body': 1.0,
+}
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+# Position of each field's length in SearchIndex.files records
+FIELD_LENGTH_SLOT = {
+    'body': 2,
+    'title': 3,
+    'tags': 4,
+}
+
+
+def _field_postings(index: SearchIndex, field: str, token: str) -> Dict[str, int]:
+    """Get {file: term frequency} for a token in a field"""
+    if field == 'body':
+        return {key: len(lines) for key, lines in index.postings.get(token, {}).items()}
+    return index.field_postings[field].get(token, {})
+
+
+def rank(index: SearchIndex, query: str, k: int = 10,
+         weights: Dict[str, float] = None) -> List[Tuple[float, Path]]:
+    """
+    Score files against a query with BM25F and return the top-k.
+
+    Only files containing at least one query token are scored, and a
+    bounded min-heap of size k keeps the best results, so the full
+    result set is never materialized or sorted.
+
+    Returns (score, path) pairs, best first.
+    """
+    query_tokens = list(dict.fromkeys(tokenize(query)))
+    return rank_groups(index, [{token: 1.0} for token in query_tokens], k, weights)
+
+
+def rank_groups(index: SearchIndex, groups: List[Dict[str, float]], k: int = 10,
+                weights: Dict[str, float] = None) -> List[Tuple[float, Path]]:
+    """
+    Score files against groups of alternative tokens with BM25F.
+
+    Each group stands for one query term and maps the indexed tokens
+    that may replace it (e.g. spelling variants) to a multiplier. A file
+    scores the sum over groups of its best alternative's BM25 term
+    score times that multiplier. rank() uses one single-token group per
+    query token.
+
+    Returns the top-k (score, path) pairs, best first.
+    """
+    weights = weights or FIELD_WEIGHTS
+    total_docs = len(index.files)
+    if not groups or not total_docs or k <= 0:
+        return []
+
+    # Average field lengths for length normalization
+    avg_length = {}
+    for field, slot in FIELD_LENGTH_SLOT.items():
+        total = sum(record[slot] for record in index.files.values())
+        avg_length[field] = (total / total_docs) or 1.0
+
+    # Best multiplied BM25 term score per file, per group
+    group_scores: List[Dict[str, float]] = []
+    for group in groups:
+        best: Dict[str, float] = {}
+        for token, multiplier in group.items():
+            # Weighted, length-normalized term frequency per file
+            combined: Dict[str, float] = {}
+            for field, weight in weights.items():
+                slot = FIELD_LENGTH_SLOT[field]
+                for key, tf in _field_postings(index, field, token).items():
+                    length = index.files[key][slot]
+                    norm = 1 - B + B * (length / avg_length[field])
+                    combined[key] = combined.get(key, 0.0) + weight * tf / norm
+            if not combined:
+                continue
+            doc_freq = len(combined)
+            idf = math.log(1 + (total_docs - doc_freq + 0.5) / (doc_freq + 0.5))
+            for key, tf in combined.items():
+                score = multiplier * idf * tf * (K1 + 1) / (tf + K1)
+                if score > best.get(key, 0.0):
+                    best[key] = score
+        if best:
+            group_scores.append(best)
+
+    candidates = set()
+    for best in group_scores:
+        candidates.update(best)
+
+    heap: List[Tuple[float, str]] = []
+    for key in candidates:
+        score = sum(best.get(key, 0.0) for best in group_scores)
+        if len(heap) < k:
+            heapq.heappush(heap, (score, key))
+        elif (score, key) > heap[0]:
+            heapq.heapreplace(heap, (score, key))
+
+    return [(score, index.root_dir / key)
+            for score, key in sorted(heap, reverse=True)]
@@ -0,0 +1,133 @@
+"""
+KB Scan Module
+Memory-mapped, multi-term literal matching for full-text scans
+"""
+
+import mmap
+import re
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Set, Union
+
+
+Buffer = Union[bytes, mmap.mmap, str]
+
+
+@contextmanager
+def mapped(file_path: Path) -> Iterator[Buffer]:
+    """
+    Memory-map a file read-only.
+
+    Yields b'' for empty files (which cannot be mapped).
+    Raises OSError like Path.read_bytes.
+    """
+    with open(file_path, 'rb') as f:
+        try:
+            view = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            yield b''
+            return
+        try:
+            yield view
+        finally:
+            view.close()
+
+
+class LiteralMatcher:
+    """
+    Case-insensitive matcher for several literal terms at once.
+
+    All terms are compiled into one alternation (longest first), so a file
+    is scanned in a single pass by the C regex engine no matter how many
+    terms there are, Aho-Corasick style. ASCII terms are matched directly
+    on bytes (mmap); if any term is non-ASCII the buffer is decoded first
+    so case folding stays correct.
+    """
+
+    def __init__(self, terms: Iterable[str]):
+        self.terms: List[str] = list(dict.fromkeys(t for t in terms if t))
+        self.binary = all(term.isascii() for term in self.terms)
+        ordered = sorted(self.terms, key=len, reverse=True)
+        if self.binary:
+            alternatives = [re.escape(term.encode('ascii')) for term in ordered]
+            self.pattern = re.compile(b'|'.join(alternatives), re.IGNORECASE)
+            # Lookahead finds a match at every offset, including overlaps
+            self.overlapping = re.compile(b'(?=(' + b'|'.join(alternatives) + b'))', re.IGNORECASE)
+            self.newline = b'\n'
+        else:
+            alternatives = [re.escape(term) for term in ordered]
+            self.pattern = re.compile('|'.join(alternatives), re.IGNORECASE)
+            self.overlapping = re.compile('(?=(' + '|'.join(alternatives) + '))', re.IGNORECASE)
+            self.newline = '\n'
+        self._folded = {term.lower(): term for term in self.terms}
+
+    def prepare(self, data: Buffer) -> Buffer:
+        """Return the buffer to match against (decoded only for non-ASCII terms)"""
+        if self.binary or isinstance(data, str):
+            return data
+        return bytes(data).decode('utf-8', errors='replace')
+
+    def find_lines(self, data: Buffer, limit: int = 3) -> List[str]:
+        """
+        Return up to `limit` stripped lines containing any term.
+
+        Stops at the limit, and only matching lines are decoded.
+        """
+        if not self.terms:
+            return []
+        data = self.prepare(data)
+        lines = []
+        pos = 0
+        while len(lines) < limit:
+            match = self.pattern.search(data, pos)
+            if not match:
+                break
+            start = data.rfind(self.newline, 0, match.start()) + 1
+            end = data.find(self.newline, match.end())
+            if end < 0:
+                end = len(data)
+            line = data[start:end]
+            if not isinstance(line, str):
+                line = line.decode('utf-8', errors='replace')
+            lines.append(line.strip())
+            pos = end + 1
+        return lines
+
+    def find_terms(self, data: Buffer) -> Set[str]:
+        """Return the set of terms that occur in the buffer (one pass)"""
+        if not self.terms:
+            return set()
+        data = self.prepare(data)
+        found: Set[str] = set()
+        seen = set()
+        for match in self.overlapping.finditer(data):
+            text = match.group(1).lower()
+            if isinstance(text, bytes):
+                text = text.decode('ascii')
+            if text in seen:
+                continue
+            seen.add(text)
+            # A shorter term starting at the same offset is a prefix of
+            # the (longest-first) match, so check substrings of each hit
+            found.update(term for folded, term in self._folded.items() if folded in text)
+            if len(found) == len(self.terms):
+                break
+        return found
+
+
+def scan_lines(file_path: Path, matcher: LiteralMatcher, limit: int = 3) -> Optional[List[str]]:
+    """Matching context lines of a file, or None if it cannot be read"""
+    try:
+        with mapped(file_path) as data:
+            return matcher.find_lines(data, limit)
+    except OSError:
+        return None
+
+
+def scan_terms(file_path: Path, matcher: LiteralMatcher) -> Optional[Set[str]]:
+    """Terms found in a file, or None if it cannot be read"""
+    try:
+        with mapped(file_path) as data:
+            return matcher.find_terms(data)
+    except OSError:
+        return None
@@ -4,41 +4,129 @@ Cross-platform search functionality
 """
 
 import re
+import json
+import argparse
 from pathlib import Path
-from typing import List, Dict
+from typing import Callable, Iterator, List, Dict, Optional, Union
 from kb_common import (
-    KBConfig, Colors, parse_frontmatter, get_kb_entries, get_all_kb_entries,
+    KBConfig, Colors, KBCache,
     print_header, print_success, print_warning, get_priority_icon
 )
+from kb_search_index import SearchIndex
+from kb_engine import KBEngine
 
 
-def search_kb(search_term: str):
-    """Search knowledge base"""
+def parse_search_args(argv: List[str]) -> argparse.Namespace:
+    """Parse `kb search` arguments"""
+    parser = argparse.ArgumentParser(prog='kb search', add_help=False)
+    parser.add_argument('--ranked', action='store_true',
+                        help='Rank results with BM25 over title, tags and body')
+    parser.add_argument('--fuzzy', action='store_true',
+                        help='Ranked search that tolerates typos (edit distance)')
+    parser.add_argument('--semantic', action='store_true',
+                        help='Rank sections by similarity to the query (local vector index)')
+    parser.add_argument('-k', '--top', type=int, default=10,
+                        help='Number of ranked, fuzzy or semantic results to show (default: 10)')
+    parser.add_argument('-j', '--jobs', type=int, default=1,
+                        help='Parallel scan workers for changed files (0 = one per CPU)')
+    parser.add_argument('-e', '--term', action='append', default=[], dest='extra_terms',
+                        help='Additional term to match (repeatable; any term matches)')
+    parser.add_argument('-n', '--limit', type=int, default=None,
+                        help='Stop after N file results')
+    parser.add_argument('--json-lines', action='store_true',
+                        help='Print one JSON object per result (for piping)')
+    parser.add_argument('terms', nargs='*')
+    return parser.parse_args(argv)
+
+
+def search_terms(args: argparse.Namespace) -> List[str]:
+    """Terms for a parsed `kb search`: the positional phrase plus each -e term"""
+    phrase = [' '.join(args.terms)] if args.terms else []
+    return phrase + args.extra_terms
+
+
+def as_terms(search_term: Union[str, List[str]]) -> List[str]:
+    """Normalize a single term or a list of terms"""
+    return [search_term] if isinstance(search_term, str) else list(search_term)
+
+
+def search_kb(search_term: Union[str, List[str]], ranked: bool = False,
+              top_k: int = 10, jobs: int = 1, limit: Optional[int] = None,
+              json_lines: bool = False, cache: Optional[KBCache] = None,
+              index: Optional[SearchIndex] = None, fuzzy: bool = False,
+              semantic: bool = False, vectors=None):
+    """
+    Search knowledge base for one term or any of several terms.
+    
+    Results are printed as they are found; with `limit` the scan stops
+    once that many file results have been printed. With `json_lines`
+    only one JSON object per file result is printed. `fuzzy` ranks like
+    `ranked` but also matches misspelled terms; `semantic` ranks by
+    vector similarity instead. `cache`, `index` and `vectors` may be
+    passed already refreshed (e.g. by `kb serve`) to skip loading.
+    """
+    warm = {'cache': cache, 'index': index}
     config = KBConfig()
-    Colors.enable_windows()
+    terms = as_terms(search_term)
+    if (ranked or fuzzy or semantic) and limit:
+        top_k = min(top_k, limit)
     
-    print_header(
-        f"🔍 Searching Knowledge Base for: '{search_term}'",
-        "File System Search"
-    )
+    if json_lines:
+        emit = lambda result, rank=None: print_json_result(config, result, rank)
+        if semantic:
+            search_semantic(config, ' '.join(terms), top_k, jobs=jobs, emit=emit,
+                            cache=cache, vectors=vectors)
+        elif fuzzy:
+            search_fuzzy(config, ' '.join(terms), top_k, jobs=jobs, emit=emit, **warm)
+        elif ranked:
+            search_ranked(config, ' '.join(terms), top_k, jobs=jobs, emit=emit, **warm)
+        else:
+            search_files(config, terms, jobs=jobs, limit=limit, emit=emit, **warm)
+        return
     
-    # Search INDEX.md first
-    results_from_index = search_index(config, search_term)
+    Colors.enable_windows()
+    label = "' | '".join(terms)
     
-    # Search all KB files
-    results_from_files = search_files(config, search_term)
+    if semantic:
+        mode = f"Semantic Search (top {top_k})"
+    elif fuzzy:
+        mode = f"Fuzzy Search (top {top_k})"
+    elif ranked:
+        mode = f"BM25 Ranked Search (top {top_k})"
+    else:
+        mode = "File System Search"
+    print_header(f"🔍 Searching Knowledge Base for: '{label}'", mode)
+    
+    if semantic:
+        results_from_index = []
+        results_from_files = search_semantic(config, ' '.join(terms), top_k, jobs=jobs,
+                                             cache=cache, vectors=vectors)
+    elif fuzzy:
+        results_from_index = []
+        results_from_files = search_fuzzy(config, ' '.join(terms), top_k, jobs=jobs, **warm)
+    elif ranked:
+        results_from_index = []
+        results_from_files = search_ranked(config, ' '.join(terms), top_k, jobs=jobs, **warm)
+    else:
+        # Search INDEX.md first
+        results_from_index = search_index(config, terms, limit=min(5, limit or 5))
+        
+        # Search all KB files
+        results_from_files = search_files(config, terms, jobs=jobs, limit=limit, **warm)
     
     # Display results
     total_results = len(results_from_index) + len(results_from_files)
     
     if total_results == 0:
-        print_warning(f"No results found for '{search_term}'")
+        print_warning(f"No results found for '{label}'")
         print()
         print(f"{Colors.CYAN}💡 Tips:{Colors.RESET}")
         print(f"   - Try different keywords")
         print(f"   - Use broader search terms")
         print(f"   - Check spelling")
-        print(f"   - Try compound search: {Colors.MAGENTA}kb compound search '{search_term}'{Colors.RESET}")
+        if not fuzzy:
+            print(f"   - Try fuzzy search: {Colors.MAGENTA}kb search --fuzzy '{label}'{Colors.RESET}")
+        print(f"   - Try compound search: {Colors.MAGENTA}kb compound search '{label}'{Colors.RESET}")
     else:
         print()
         print(f"{Colors.GREEN}📊 Search Results: {total_results} entries found{Colors.RESET}")
@@ -46,76 +134,143 @@ def search_kb(search_term: str):
     print()
 
 
-def search_index(config: KBConfig, search_term: str) -> List[str]:
-    """Search INDEX.md"""
+def search_index(config: KBConfig, search_terms: Union[str, List[str]],
+                 limit: int = 5) -> List[str]:
+    """Search INDEX.md, printing hits as found and stopping after `limit`"""
     if not config.get_index_path().exists():
         return []
+    search_terms = as_terms(search_terms)
     
-    content = config.get_index_path().read_text(encoding='utf-8')
     results = []
     
-    # Search for term in index
-    pattern = re.compile(re.escape(search_term), re.IGNORECASE)
+    # Search for any term in index
+    pattern = re.compile('|'.join(re.escape(t) for t in search_terms), re.IGNORECASE)
     
-    for line in content.split('\n'):
-        if pattern.search(line) and line.strip().startswith('-'):
-            results.append(line.strip())
+    with open(config.get_index_path(), encoding='utf-8') as index_file:
+        for line in index_file:
+            if pattern.search(line) and line.strip().startswith('-'):
+                if not results:
+                    print(f"{Colors.GREEN}✅ Found in INDEX:{Colors.RESET}")
+                results.append(line.strip())
+                print(f"  {line.strip()}", flush=True)
+                if len(results) >= limit:
+                    break
     
     if results:
-        print(f"{Colors.GREEN}✅ Found in INDEX:{Colors.RESET}")
-        for result in results[:5]:  # Show first 5
-            print(f"  {result}")
         print()
     
     return results
 
 
-def search_files(config: KBConfig, search_term: str) -> List[Dict]:
-    """Search all KB files (KB + docs)"""
-    all_paths = config.get_all_kb_paths()
-    entries = get_all_kb_entries(all_paths)
+def search_files(config: KBConfig, search_terms: Union[str, List[str]],
+                 jobs: int = 1, limit: Optional[int] = None,
+                 emit: Optional[Callable] = None, cache: Optional[KBCache] = None,
+                 index: Optional[SearchIndex] = None) -> List[Dict]:
+    """
+    Search all KB files (KB + docs) for any of the terms.
     
+    Each result is passed to `emit` (default: print_file_result) as soon
+    as it is found; the scan stops after `limit` results.
+    """
+    emit = emit or (lambda result: print_file_result(config, result))
     results = []
-    pattern = re.compile(re.escape(search_term), re.IGNORECASE)
-    
-    for entry_path in entries:
-        try:
-            content = entry_path.read_text(encoding='utf-8')
-            
-            # Check if term is in content
-            if pattern.search(content):
-                metadata = parse_frontmatter(content)
-                
-                # Extract context (line with match)
-                context_lines = []
-                for line in content.split('\n'):
-                    if pattern.search(line):
-                        context_lines.append(line.strip())
-                        if len(context_lines) >= 3:
-                            break
-                
-                results.append({
-                    'path': entry_path,
-                    'title': metadata.get('title', 'Unknown'),
-                    'category': metadata.get('category', 'unknown'),
-                    'priority': metadata.get('priority', 'unknown'),
-                    'context': context_lines
-                })
-        except Exception as e:
-            continue
-    
-    # Display file results
-    if results:
-        for i, result in enumerate(results, 1):
-            icon = get_priority_icon(result['priority'])
-            print(f"{Colors.GREEN}✅ Found: {result['title']}{Colors.RESET}")
-            print(f"   {icon} File: {result['path'].relative_to(config.root_dir)}")
-            print(f"   Category: {result['category']} | Priority: {result['priority']}")
-            
-            if result['context']:
-                print(f"   {Colors.CYAN}Context:{Colors.RESET}")
-                for ctx in result['context'][:2]:
-                    print(f"     {ctx[:80]}...")
+    for result in iter_file_results(config, search_terms, jobs=jobs, cache=cache, index=index):
+        emit(result)
+        results.append(result)
+        if limit and len(results) >= limit:
+            break
+    return results
+
+
+def iter_file_results(config: KBConfig, search_terms: Union[str, List[str]],
+                      jobs: int = 1, cache: Optional[KBCache] = None,
+                      index: Optional[SearchIndex] = None) -> Iterator[Dict]:
+    """Lazily yield file results (sorted by path) for any of the terms"""
+    engine = KBEngine(config, jobs=jobs, cache=cache, index=index)
+    return engine.search(as_terms(search_terms))
+
+
+def search_ranked(config: KBConfig, search_term: str, top_k: int = 10,
+                  jobs: int = 1, emit: Optional[Callable] = None,
+                  cache: Optional[KBCache] = None,
+                  index: Optional[SearchIndex] = None) -> List[Dict]:
+    """Search all KB files and return the top-k by BM25 score"""
+    emit = emit or (lambda result, rank: print_file_result(config, result, rank=rank))
+    engine = KBEngine(config, jobs=jobs, cache=cache, index=index)
+    
+    results = []
+    for result in engine.rank(search_term, top_k):
+        results.append(result)
+        emit(result, len(results))
+    
+    return results
+
+
+def search_fuzzy(config: KBConfig, search_term: str, top_k: int = 10,
+                 jobs: int = 1, emit: Optional[Callable] = None,
+                 cache: Optional[KBCache] = None,
+                 index: Optional[SearchIndex] = None) -> List[Dict]:
+    """Search all KB files for possibly misspelled terms and return the top-k"""
+    engine = KBEngine(config, jobs=jobs, cache=cache, index=index)
+    if emit is None:
+        emit = lambda result, rank: print_file_result(config, result, rank=rank)
+        corrections = engine.corrections(search_term)
+        if corrections:
+            fixed = ', '.join(f"{term} → {token}" for term, token in corrections.items())
+            print(f"{Colors.CYAN}🔤 Did you mean: {fixed}{Colors.RESET}")
             print()
     
+    results = []
+    for result in engine.fuzzy(search_term, top_k):
+        results.append(result)
+        emit(result, len(results))
+    
     return results
+
+
+def search_semantic(config: KBConfig, search_term: str, top_k: int = 10,
+                    jobs: int = 1, emit: Optional[Callable] = None,
+                    cache: Optional[KBCache] = None, vectors=None) -> List[Dict]:
+    """Search all KB files by vector similarity and return the top-k"""
+    emit = emit or (lambda result, rank: print_file_result(config, result, rank=rank))
+    engine = KBEngine(config, jobs=jobs, cache=cache, vectors=vectors)
+    
+    results = []
+    for result in engine.semantic(search_term, top_k):
+        results.append(result)
+        emit(result, len(results))
+    
+    return results
+
+
+def print_file_result(config: KBConfig, result: Dict, rank: Optional[int] = None):
+    """Print a single file search result"""
+    icon = get_priority_icon(result['priority'])
+    if rank is None:
+        print(f"{Colors.GREEN}✅ Found: {result['title']}{Colors.RESET}")
+    else:
+        print(f"{Colors.GREEN}#{rank} {result['title']}{Colors.RESET} "
+              f"{Colors.GRAY}(score {result['score']:.2f}){Colors.RESET}")
+    print(f"   {icon} File: {result['path'].relative_to(config.root_dir)}")
+    print(f"   Category: {result['category']} | Priority: {result['priority']}")
+    
+    if result['context']:
+        print(f"   {Colors.CYAN}Context:{Colors.RESET}")
+        for ctx in result['context'][:2]:
+            print(f"     {ctx[:80]}...")
+    print(flush=True)
+
+
+def print_json_result(config: KBConfig, result: Dict, rank: Optional[int] = None):
+    """Print a single file search result as one JSON line"""
+    record = {
+        'path': result['path'].relative_to(config.root_dir).as_posix(),
+        'title': result['title'],
+        'category': result['category'],
+        'priority': result['priority'],
+        'context': result['context'],
+    }
+    if rank is not None:
+        record['rank'] = rank
+        record['score'] = round(result['score'], 4)
+    print(json.dumps(record, ensure_ascii=False), flush=True)
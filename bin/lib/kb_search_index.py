@@ -0,0 +1,365 @@
+"""
+KB Search Index Module
+Persistent inverted index for fast full-text search
+"""
+
+import re
+import zlib
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from kb_common import KBConfig, parse_frontmatter, read_files, load_json, write_json_atomic
+
+
+INDEX_VERSION = 5
+TOKEN_PATTERN = re.compile(r'\w+')
+
+# Posting list files per index (tokens are spread by CRC32)
+POSTING_SHARDS = 64
+
+# Token boundary markers for trigrams (never part of a \w token)
+START, END = '^', '$'
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase word tokens"""
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+def trigrams(text: str) -> List[str]:
+    """Distinct 3-character grams of a string, in order"""
+    return list(dict.fromkeys(text[i:i + 3] for i in range(len(text) - 2)))
+
+
+def token_trigrams(token: str) -> List[str]:
+    """Trigrams of a token padded with boundary markers ("ab" -> ^ab, ab$)"""
+    return trigrams(START + token + END)
+
+
+class ShardedPostings:
+    """
+    Token -> {rel_path: [line, ...]} mapping stored in shard files
+
+    The vocabulary is kept by the owning index; the line lists of each
+    token live in one of POSTING_SHARDS JSON files in `directory`, read
+    the first time one of its tokens is looked up. Only shards that
+    changed are rewritten. With stored=False (a fresh index) nothing is
+    read from disk and every shard is written on save.
+    """
+
+    def __init__(self, directory: Path, tokens: Iterable[str] = (), stored: bool = True):
+        self.directory = directory
+        self.tokens: Set[str] = set(tokens)
+        self.shards: Dict[int, Dict[str, Dict[str, List[int]]]] = {}
+        self.stored = stored
+        self.dirty: Set[int] = set() if stored else set(range(POSTING_SHARDS))
+
+    @staticmethod
+    def shard_of(token: str) -> int:
+        return zlib.crc32(token.encode('utf-8')) % POSTING_SHARDS
+
+    def _path(self, shard: int) -> Path:
+        return self.directory / f"{shard:02x}.json"
+
+    def _shard(self, shard: int) -> Dict[str, Dict[str, List[int]]]:
+        postings = self.shards.get(shard)
+        if postings is None:
+            postings = load_json(self._path(shard), {}) if self.stored else {}
+            self.shards[shard] = postings
+        return postings
+
+    def __contains__(self, token: str) -> bool:
+        return token in self.tokens
+
+    def __iter__(self):
+        return iter(self.tokens)
+
+    def __len__(self) -> int:
+        return len(self.tokens)
+
+    def __getitem__(self, token: str) -> Dict[str, List[int]]:
+        if token not in self.tokens:
+            raise KeyError(token)
+        return self._shard(self.shard_of(token)).get(token, {})
+
+    def get(self, token: str, default=None):
+        return self[token] if token in self.tokens else default
+
+    def extend(self, token: str, key: str, lines: List[int]) -> bool:
+        """Record a file's lines for a token; True if the token is new"""
+        shard = self.shard_of(token)
+        self._shard(shard).setdefault(token, {})[key] = lines
+        self.dirty.add(shard)
+        if token in self.tokens:
+            return False
+        self.tokens.add(token)
+        return True
+
+    def remove(self, tokens_by_key: Dict[str, Iterable[str]]) -> List[str]:
+        """
+        Drop files, given the tokens each was indexed with.
+
+        Only the shards of those tokens are read. Returns the tokens left
+        without files.
+        """
+        empty = []
+        for key, tokens in tokens_by_key.items():
+            for token in tokens:
+                shard = self.shard_of(token)
+                postings = self._shard(shard)
+                files = postings.get(token)
+                if files is None or files.pop(key, None) is None:
+                    continue
+                self.dirty.add(shard)
+                if not files:
+                    del postings[token]
+                    empty.append(token)
+        self.tokens.difference_update(empty)
+        return empty
+
+    def save(self):
+        """Write the shards that changed"""
+        for shard in sorted(self.dirty):
+            write_json_atomic(self._path(shard), self._shard(shard))
+        self.dirty.clear()
+        self.stored = True
+
+
+class SearchIndex:
+    """
+    On-disk inverted index stored in .agent/knowledge-base/.cache/
+
+    Maps each token to the files and line numbers it appears on (one
+    line number per occurrence, so the list length is the term frequency).
+    The line lists are sharded by token (see ShardedPostings), so a search
+    reads only the shards of its terms and an update rewrites only the
+    shards it touched; the main file holds the vocabulary.
+    Frontmatter title and tags are indexed as separate fields for ranking.
+    A trigram index over the vocabulary (padded with ^ and $) finds the
+    tokens containing, starting or ending with a query token, and the
+    tokens similar to a misspelled one (see kb_fuzzy), without walking
+    the whole vocabulary. Files are tracked by (size, mtime) so only
+    files changed since the last build have to be re-scanned, and with
+    the tokens they were indexed with, so dropping a file reads only the
+    shards of its own tokens.
+
+    `name` selects another index file, for a different set of files
+    (see kb_engine.CORPORA).
+    """
+
+    FIELDS = ('title', 'tags')
+
+    def __init__(self, config: KBConfig, name: str = "search-index"):
+        self.root_dir = config.root_dir
+        self.path = config.get_cache_dir() / f"{name}.json"
+        self.postings_dir = config.get_cache_dir() / f"{name}-postings"
+        self.files: Dict[str, List] = {}                # rel_path -> [size, mtime_ns, body_len, title_len, tags_len, tokens]
+        self.postings = ShardedPostings(self.postings_dir, stored=False)  # token -> {rel_path: [line, ...]}
+        self.field_postings: Dict[str, Dict[str, Dict[str, int]]] = {
+            field: {} for field in self.FIELDS
+        }                                                # field -> token -> {rel_path: tf}
+        self.trigrams: Dict[str, List[str]] = {}         # trigram -> [token, ...]
+        self.load()
+
+    def load(self) -> bool:
+        """Load index from disk"""
+        data = load_json(self.path)
+        if not data or data.get('version') != INDEX_VERSION:
+            return False
+        self.files = data.get('files', {})
+        self.postings = ShardedPostings(self.postings_dir, data.get('tokens', []))
+        self.field_postings.update(data.get('field_postings', {}))
+        self.trigrams = data.get('trigrams', {})
+        return True
+
+    def save(self):
+        """Persist index to disk (changed posting shards first, then the main file)"""
+        self.postings.save()
+        write_json_atomic(self.path, {
+            'version': INDEX_VERSION,
+            'files': self.files,
+            'tokens': sorted(self.postings),
+            'field_postings': self.field_postings,
+            'trigrams': self.trigrams,
+        })
+
+    def key(self, file_path: Path) -> str:
+        """Index key for a file (path relative to project root)"""
+        try:
+            return file_path.relative_to(self.root_dir).as_posix()
+        except ValueError:
+            return file_path.as_posix()
+
+    def sync(self, entries: List[Path], jobs: int = 1) -> List[Path]:
+        """
+        Bring the index up to date with the given files.
+
+        Only files that are new or changed since the last build are
+        re-scanned (read with `jobs` threads); deleted files are dropped.
+        Returns the re-scanned files.
+        """
+        current = {self.key(path): path for path in entries}
+        removed = {key for key in self.files if key not in current}
+        changed = []
+
+        for key, path in current.items():
+            try:
+                stat = path.stat()
+            except OSError:
+                removed.add(key)
+                continue
+            signature = [stat.st_size, stat.st_mtime_ns]
+            if self.files.get(key, [])[:2] != signature:
+                changed.append((key, path, signature))
+
+        if not removed and not changed:
+            return []
+
+        self._remove(removed | {key for key, _, _ in changed})
+
+        rescanned = []
+        contents = read_files([path for _, path, _ in changed], jobs)
+        for (key, path, signature), item in zip(changed, contents):
+            if item is None:
+                continue
+            try:
+                content = item[0].decode('utf-8')
+            except UnicodeDecodeError:
+                continue
+            self.files[key] = signature + self._add(key, content)
+            rescanned.append(path)
+
+        self.save()
+        return rescanned
+
+    def _add(self, key: str, content: str) -> List:
+        """Add a file's tokens to the index, returning [body_len, title_len, tags_len, tokens]"""
+        body_len = 0
+        lines_by_token: Dict[str, List[int]] = {}
+        for line_no, line in enumerate(content.split('\n')):
+            for token in tokenize(line):
+                lines_by_token.setdefault(token, []).append(line_no)
+                body_len += 1
+        for token, lines in lines_by_token.items():
+            if self.postings.extend(token, key, lines):
+                for gram in token_trigrams(token):
+                    self.trigrams.setdefault(gram, []).append(token)
+        
+        metadata = parse_frontmatter(content)
+        lengths = [body_len]
+        for field in self.FIELDS:
+            value = metadata.get(field, '')
+            if isinstance(value, list):
+                value = ' '.join(value)
+            tokens = tokenize(value)
+            for token in tokens:
+                postings = self.field_postings[field].setdefault(token, {})
+                postings[key] = postings.get(key, 0) + 1
+            lengths.append(len(tokens))
+        return lengths + [sorted(lines_by_token)]
+
+    def _remove(self, keys: set):
+        """Remove files from the index"""
+        if not keys:
+            return
+        tokens_by_key = {key: self.files.pop(key)[5] for key in keys if key in self.files}
+        for token in self.postings.remove(tokens_by_key):
+            self._drop_trigrams(token)
+        for postings in self.field_postings.values():
+            empty = []
+            for token, files in postings.items():
+                for key in keys & files.keys():
+                    del files[key]
+                if not files:
+                    empty.append(token)
+            for token in empty:
+                del postings[token]
+
+    def _drop_trigrams(self, token: str):
+        """Remove a token that left the vocabulary from the trigram index"""
+        for gram in token_trigrams(token):
+            tokens = self.trigrams.get(gram)
+            if tokens is None:
+                continue
+            tokens.remove(token)
+            if not tokens:
+                del self.trigrams[gram]
+
+    def tokens_with(self, grams: Iterable[str]) -> Optional[Set[str]]:
+        """Tokens containing every gram (None if no grams are given)"""
+        lists = sorted((self.trigrams.get(gram, []) for gram in grams), key=len)
+        if not lists:
+            return None
+        found = set(lists[0])
+        for tokens in lists[1:]:
+            if not found:
+                break
+            found.intersection_update(tokens)
+        return found
+
+    def shared_trigrams(self, grams: Iterable[str]) -> Dict[str, int]:
+        """Number of the given grams each vocabulary token contains"""
+        counts: Dict[str, int] = {}
+        for gram in grams:
+            for token in self.trigrams.get(gram, ()):
+                counts[token] = counts.get(token, 0) + 1
+        return counts
+
+    def _matching_tokens(self, query_token: str, position: str) -> List[str]:
+        """Find indexed tokens a query token can match as part of a substring"""
+        if position == 'middle':
+            return [query_token] if query_token in self.postings else []
+        if position == 'first':
+            found = self.tokens_with(trigrams(query_token + END))
+            return [t for t in found or () if t.endswith(query_token)]
+        if position == 'last':
+            found = self.tokens_with(trigrams(START + query_token))
+            return [t for t in found or () if t.startswith(query_token)]
+        # Substrings shorter than a trigram walk the vocabulary
+        found = self.tokens_with(trigrams(query_token))
+        if found is None:
+            return [t for t in self.postings if query_token in t]
+        return [t for t in found if query_token in t]
+
+    def lookup(self, search_term: str) -> Optional[List[Tuple[Path, List[int]]]]:
+        """
+        Find candidate files and line numbers for a search term.
+
+        Returns (path, line_numbers) pairs sorted by path, or None when the
+        term has no word characters and cannot be answered from the index.
+        Candidates are a superset of real matches; callers verify the lines.
+        """
+        query_tokens = tokenize(search_term)
+        if not query_tokens:
+            return None
+
+        candidates: Optional[Dict[str, set]] = None
+        for i, query_token in enumerate(query_tokens):
+            if len(query_tokens) == 1:
+                position = 'only'
+            elif i == 0:
+                position = 'first'
+            elif i == len(query_tokens) - 1:
+                position = 'last'
+            else:
+                position = 'middle'
+
+            lines_by_file: Dict[str, set] = {}
+            for token in self._matching_tokens(query_token, position):
+                for key, lines in self.postings[token].items():
+                    lines_by_file.setdefault(key, set()).update(lines)
+
+            if candidates is None:
+                candidates = lines_by_file
+            else:
+                candidates = {
+                    key: candidates[key] & lines
+                    for key, lines in lines_by_file.items()
+                    if key in candidates and candidates[key] & lines
+                }
+            if not candidates:
+                return []
+
+        return [
+            (self.root_dir / key, sorted(lines))
+            for key, lines in sorted(candidates.items())
+        ]
@@ -0,0 +1,368 @@
+"""
+KB Snapshot Module
+`kb export` / `kb import` - the whole KB in one compressed snapshot file
+
+Layout:
+    MAGIC
+    body stream     one zlib stream of every file's raw bytes, in entry order
+    metadata        zlib-compressed JSON, columnar (one list per field)
+    footer          offset and length of the metadata section (2 x uint64 LE)
+
+The metadata sits at the end so export is a single streaming pass and
+metadata-only readers (`kb list --snapshot`, `kb stats --snapshot`)
+seek straight to it without touching the bodies.
+"""
+
+import os
+import sys
+import json
+import zlib
+import struct
+import argparse
+import hashlib
+from pathlib import Path, PurePosixPath
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+from kb_common import (
+    KBConfig, Colors, read_files,
+    print_header, print_success, print_error, print_info, print_warning
+)
+from kb_engine import KBEngine
+
+
+SNAPSHOT_MAGIC = b'KBSNAP\x00\x01'
+SNAPSHOT_VERSION = 1
+SNAPSHOT_FOOTER = struct.Struct('<QQ')
+
+DEFAULT_SNAPSHOT = 'kb-snapshot.kbsnap'
+
+# Files read per batch during export (bounds memory, keeps reads parallel)
+EXPORT_BATCH = 256
+
+# Compressed bytes read per step during import
+IMPORT_CHUNK = 1 << 16
+
+# Directories (relative to the project root) export_snapshot() writes keys under
+SNAPSHOT_ROOTS = (('.agent', 'knowledge-base'), ('docs',))
+
+
+def to_columns(rows: List[Optional[Dict]]) -> Dict[str, List]:
+    """Pivot frontmatter rows into one list per key (None where missing)"""
+    keys = sorted({key for row in rows if row for key in row})
+    return {key: [row.get(key) if row else None for row in rows] for key in keys}
+
+
+def from_columns(columns: Dict[str, List], index: int) -> Dict:
+    """Rebuild one frontmatter row from columns"""
+    return {
+        key: values[index]
+        for key, values in columns.items()
+        if values[index] is not None
+    }
+
+
+def is_safe_key(key: str) -> bool:
+    """Whether a snapshot path is one export can produce: a .md file under the KB or docs/"""
+    path = PurePosixPath(key)
+    if not key or path.is_absolute() or '..' in path.parts or ':' in key or '\\' in key:
+        return False
+    return path.suffix == '.md' and any(
+        path.parts[:len(root)] == root and len(path.parts) > len(root) for root in SNAPSHOT_ROOTS)
+
+
+def snapshot_target(config: KBConfig, key: str) -> Optional[Path]:
+    """
+    File a safe key is imported to, or None if it resolves outside the
+    KB or docs/ (e.g. through a symlinked directory).
+    """
+    target = (config.root_dir / key).resolve()
+    for root in SNAPSHOT_ROOTS:
+        base = config.root_dir.joinpath(*root).resolve()
+        if base in target.parents:
+            return target
+    return None
+
+
+def export_snapshot(config: KBConfig, output: Path, jobs: int = 1) -> Dict:
+    """
+    Write every KB + docs entry to a snapshot file.
+
+    Frontmatter comes from the manifest cache; bodies are read in batches
+    and streamed through one compressor. Returns the metadata section.
+    """
+    engine = KBEngine(config, jobs=jobs)
+    cache = engine.cache
+    paths = sorted(engine.paths(), key=cache.key)
+
+    columns = {'path': [], 'hash': [], 'size': [], 'mtime': [], 'frontmatter': []}
+    rows = []
+
+    output.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = output.with_name(f"{output.name}.{os.getpid()}.tmp")
+    compressor = zlib.compressobj(9)
+    with open(tmp_path, 'wb') as f:
+        f.write(SNAPSHOT_MAGIC)
+        for start in range(0, len(paths), EXPORT_BATCH):
+            batch = paths[start:start + EXPORT_BATCH]
+            for path, item in zip(batch, read_files(batch, jobs)):
+                if item is None:
+                    continue
+                data, content_hash = item
+                record = cache.get(path) or {}
+                columns['path'].append(cache.key(path))
+                columns['hash'].append(content_hash)
+                columns['size'].append(len(data))
+                columns['mtime'].append(record.get('mtime', 0))
+                columns['frontmatter'].append(record.get('metadata') is not None)
+                rows.append(record.get('metadata'))
+                f.write(compressor.compress(data))
+        f.write(compressor.flush())
+
+        body_length = f.tell() - len(SNAPSHOT_MAGIC)
+        metadata = {
+            'version': SNAPSHOT_VERSION,
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'count': len(rows),
+            'body_length': body_length,
+            'columns': columns,
+            'metadata': to_columns(rows),
+        }
+        encoded = zlib.compress(json.dumps(metadata, ensure_ascii=False,
+                                           separators=(',', ':')).encode('utf-8'), 9)
+        offset = f.tell()
+        f.write(encoded)
+        f.write(SNAPSHOT_FOOTER.pack(offset, len(encoded)))
+    os.replace(tmp_path, output)
+    return metadata
+
+
+def read_snapshot_metadata(path: Path) -> Dict:
+    """Read only the metadata section of a snapshot (ValueError if invalid)"""
+    with open(path, 'rb') as f:
+        if f.read(len(SNAPSHOT_MAGIC)) != SNAPSHOT_MAGIC:
+            raise ValueError(f"{path} is not a KB snapshot")
+        size = f.seek(0, os.SEEK_END)
+        if size < len(SNAPSHOT_MAGIC) + SNAPSHOT_FOOTER.size:
+            raise ValueError(f"{path}: truncated snapshot")
+        f.seek(size - SNAPSHOT_FOOTER.size)
+        offset, length = SNAPSHOT_FOOTER.unpack(f.read(SNAPSHOT_FOOTER.size))
+        if offset < len(SNAPSHOT_MAGIC) or offset + length > size - SNAPSHOT_FOOTER.size:
+            raise ValueError(f"{path}: truncated snapshot")
+        f.seek(offset)
+        try:
+            metadata = json.loads(zlib.decompress(f.read(length)).decode('utf-8'))
+        except (zlib.error, ValueError):
+            raise ValueError(f"{path}: corrupt metadata section")
+    if metadata.get('version') != SNAPSHOT_VERSION:
+        raise ValueError(f"{path}: unsupported snapshot version {metadata.get('version')}")
+    return metadata
+
+
+def iter_bodies(path: Path, metadata: Dict) -> Iterator[Tuple[int, bytes]]:
+    """
+    Stream (index, raw bytes) for every entry of a snapshot.
+
+    Decompresses chunk by chunk, so memory stays around one entry plus
+    one chunk. Raises ValueError if a body does not match its hash.
+    """
+    sizes = metadata['columns']['size']
+    hashes = metadata['columns']['hash']
+    decompressor = zlib.decompressobj()
+    buffer = bytearray()
+    remaining = metadata['body_length']
+
+    with open(path, 'rb') as f:
+        f.seek(len(SNAPSHOT_MAGIC))
+        for index, size in enumerate(sizes):
+            while len(buffer) < size:
+                if remaining <= 0:
+                    raise ValueError(f"{path}: truncated body stream")
+                chunk = f.read(min(IMPORT_CHUNK, remaining))
+                remaining -= len(chunk)
+                buffer += decompressor.decompress(chunk)
+            data = bytes(buffer[:size])
+            del buffer[:size]
+            if hashlib.sha1(data).hexdigest() != hashes[index]:
+                raise ValueError(f"{path}: checksum mismatch for {metadata['columns']['path'][index]}")
+            yield index, data
+
+
+def import_snapshot(config: KBConfig, source: Path, overwrite: bool = False,
+                    dry_run: bool = False) -> Dict[str, List[str]]:
+    """
+    Restore a snapshot into the project, idempotently.
+
+    Files whose content hash already matches are left alone, so importing
+    twice is a no-op. Files that exist with different content are
+    conflicts and are kept unless `overwrite`. Modification times are
+    restored so `kb recent` keeps its order. The KB IDs of written entries
+    are reserved, so `kb add` never hands them out again. Returns the
+    paths per outcome.
+    """
+    # Imported here: only import writes entries
+    from kb_add import ENTRY_ID_PATTERN, EntryIdAllocator
+
+    metadata = read_snapshot_metadata(source)
+    columns = metadata['columns']
+    result = {'created': [], 'updated': [], 'unchanged': [], 'conflicts': [], 'rejected': []}
+    allocator = EntryIdAllocator(config, autosave=False)
+
+    for index, data in iter_bodies(source, metadata):
+        key = columns['path'][index]
+        target = snapshot_target(config, key) if is_safe_key(key) else None
+        if target is None:
+            result['rejected'].append(key)
+            continue
+
+        try:
+            existing = target.stat().st_size
+        except OSError:
+            existing = None
+
+        if existing is None:
+            outcome = 'created'
+        elif existing == len(data) and hashlib.sha1(target.read_bytes()).hexdigest() == columns['hash'][index]:
+            result['unchanged'].append(key)
+            continue
+        elif overwrite:
+            outcome = 'updated'
+        else:
+            result['conflicts'].append(key)
+            continue
+
+        result[outcome].append(key)
+        if dry_run:
+            continue
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = target.with_name(f"{target.name}.{os.getpid()}.tmp")
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, target)
+        if columns['mtime'][index]:
+            os.utime(target, ns=(columns['mtime'][index], columns['mtime'][index]))
+        match = ENTRY_ID_PATTERN.match(target.name)
+        if match:
+            allocator.reserve(match.group(1), int(match.group(2)))
+
+    allocator.save()
+    return result
+
+
+class Snapshot:
+    """
+    Metadata section of a snapshot, usable where kb_list / kb_stats take
+    a manifest cache (entries(), get_mtime(), and files / key() like
+    KBCache). Bodies are never read.
+    """
+
+    def __init__(self, path: Path, config: KBConfig):
+        self.root_dir = config.root_dir
+        self.metadata = read_snapshot_metadata(path)
+        columns = self.metadata['columns']
+        # Manifest-shaped records (metadata None without frontmatter)
+        self.files: Dict[str, Dict] = {
+            key: {
+                'hash': columns['hash'][index],
+                'mtime': columns['mtime'][index],
+                'metadata': from_columns(self.metadata['metadata'], index)
+                            if columns['frontmatter'][index] else None,
+            }
+            for index, key in enumerate(columns['path'])
+        }
+
+    def key(self, file_path: Path) -> str:
+        """Snapshot key for a file (path relative to project root)"""
+        try:
+            return file_path.relative_to(self.root_dir).as_posix()
+        except ValueError:
+            return file_path.as_posix()
+
+    def entries(self, under: Optional[Path] = None) -> List[Tuple[Path, Dict]]:
+        """List (path, frontmatter) pairs, optionally limited to a directory"""
+        result = []
+        for key, record in self.files.items():
+            if record['metadata'] is None:
+                continue
+            path = self.root_dir / key
+            if under is not None and under not in path.parents:
+                continue
+            result.append((path, record['metadata']))
+        return result
+
+    def get_mtime(self, file_path: Path) -> float:
+        """Modification time recorded at export, in seconds"""
+        record = self.files.get(self.key(file_path))
+        return record['mtime'] / 1e9 if record else 0
+
+
+def load_snapshot(path: str, config: Optional[KBConfig] = None) -> Snapshot:
+    """Open a snapshot's metadata for listing, exiting with an error if invalid"""
+    try:
+        return Snapshot(Path(path), config or KBConfig())
+    except (OSError, ValueError, KeyError) as e:
+        print_error(f"Cannot read snapshot: {e}")
+        sys.exit(1)
+
+
+def format_size(size: int) -> str:
+    """Human-readable byte count"""
+    for unit in ('B', 'KB', 'MB'):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == 'B' else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
+
+
+def export_command(argv: List[str]):
+    """Entry point for `kb export [FILE] [--jobs N]`"""
+    parser = argparse.ArgumentParser(prog='kb export', add_help=False)
+    parser.add_argument('output', nargs='?', default=DEFAULT_SNAPSHOT)
+    parser.add_argument('-j', '--jobs', type=int, default=1,
+                        help='Parallel read workers (0 = one per CPU)')
+    args = parser.parse_args(argv)
+
+    config = KBConfig()
+    Colors.enable_windows()
+    print_header("📦 Exporting Knowledge Base", "KB + docs entries → snapshot")
+
+    output = Path(args.output)
+    metadata = export_snapshot(config, output, jobs=args.jobs)
+    raw = sum(metadata['columns']['size'])
+    print_success(f"Exported {metadata['count']} entries to {output}")
+    print_info(f"{format_size(raw)} → {format_size(output.stat().st_size)}")
+    print()
+
+
+def import_command(argv: List[str]):
+    """Entry point for `kb import FILE [--overwrite] [--dry-run]`"""
+    parser = argparse.ArgumentParser(prog='kb import', add_help=False)
+    parser.add_argument('source', nargs='?', default=DEFAULT_SNAPSHOT)
+    parser.add_argument('--overwrite', action='store_true',
+                        help='Replace files that exist with different content')
+    parser.add_argument('--dry-run', action='store_true',
+                        help='Report what would change without writing')
+    args = parser.parse_args(argv)
+
+    config = KBConfig()
+    Colors.enable_windows()
+    print_header("📦 Importing Knowledge Base", f"From {args.source}" + (" (dry run)" if args.dry_run else ""))
+
+    try:
+        result = import_snapshot(config, Path(args.source), overwrite=args.overwrite,
+                                 dry_run=args.dry_run)
+    except (OSError, ValueError) as e:
+        print_error(f"Import failed: {e}")
+        sys.exit(1)
+
+    for key in result['conflicts']:
+        print_warning(f"Differs locally, kept: {key}")
+    for key in result['rejected']:
+        print_warning(f"Unsafe path, skipped: {key}")
+    print_success(
+        f"Created {len(result['created'])}, updated {len(result['updated'])}, "
+        f"unchanged {len(result['unchanged'])}, conflicts {len(result['conflicts'])}"
+    )
+    if result['conflicts'] and not args.overwrite:
+        print_info("Use --overwrite to replace conflicting files")
+    if result['created'] or result['updated']:
+        print_info(f"Run {Colors.MAGENTA}kb index{Colors.RESET} to update INDEX.md")
+    print()
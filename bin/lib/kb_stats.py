@@ -5,80 +5,88 @@ Cross-platform statistics display
 
 from pathlib import Path
 from datetime import datetime
-from collections import defaultdict
+from typing import Dict, Optional
 from kb_common import (
-    KBConfig, Colors, parse_frontmatter, get_kb_entries, format_time_ago,
+    KBConfig, Colors, KBCache, format_time_ago,
     print_header, get_priority_icon, get_category_icon
 )
+from kb_aggregates import load_aggregates, as_bucket
+from kb_engine import KBEngine
 
 
-def show_stats():
-    """Show KB statistics"""
+# Bump when stats_facts changes, so persisted aggregates are rebuilt
+STATS_SCHEMA = 'kb-stats/1'
+
+
+def stats_facts(key: str, metadata: Optional[Dict]):
+    """Buckets and totals one entry contributes to `kb stats`"""
+    if not metadata:
+        return None
+    
+    date = metadata.get('date', 'unknown')
+    buckets = {
+        'category': as_bucket(metadata.get('category', 'unknown')),
+        'priority': as_bucket(metadata.get('priority', 'unknown')),
+        'month': as_bucket(date)[:7] if date != 'unknown' else None,  # YYYY-MM
+    }
+    
+    amounts = {}
+    try:
+        amounts['attempts'] = int(metadata.get('attempts', '0'))
+    except (TypeError, ValueError):
+        pass
+    
+    time_saved = as_bucket(metadata.get('time_saved', '0'))
+    if 'hour' in time_saved.lower():
+        try:
+            amounts['hours'] = float(time_saved.split()[0])
+        except ValueError:
+            pass
+    
+    return buckets, amounts
+
+
+def show_stats(jobs: int = 1, cache: Optional[KBCache] = None, verify: bool = False):
+    """
+    Show KB statistics (jobs: parallel scan workers, 0 = one per CPU).
+    
+    Histograms and totals come from the persisted aggregate store, which
+    only re-counts entries changed since the last run. With `verify` the
+    store is fully re-checked and rebuilt if it drifted.
+    
+    cache: an already refreshed manifest (e.g. from `kb serve`), or a
+    kb_snapshot.Snapshot to report on an exported snapshot.
+    """
     config = KBConfig()
     Colors.enable_windows()
     
     print_header("📊 Knowledge Base Statistics", "Analyzing entries...")
     
     kb_path = config.get_kb_path()
-    entries = get_kb_entries(kb_path)
+    cache = cache or KBEngine(config, jobs=jobs).cache
     
-    if not entries:
+    # Snapshots get an in-memory store, so the project's store is left alone
+    store = load_aggregates(
+        config, cache, 'aggregates' if isinstance(cache, KBCache) else None,
+        stats_facts, STATS_SCHEMA, under=kb_path, verify=verify
+    )
+    total = store.count
+    
+    if not total:
         print(f"{Colors.YELLOW}No entries found in knowledge base.{Colors.RESET}")
         print()
         print(f"{Colors.CYAN}💡 Add your first entry:{Colors.RESET}")
         print(f"   kb add")
         return
     
-    # Parse entries
-    parsed = []
-    total_attempts = 0
-    total_time_saved = 0
-    
-    by_category = defaultdict(int)
-    by_priority = defaultdict(int)
-    by_month = defaultdict(int)
-    
-    for entry_path in entries:
-        try:
-            content = entry_path.read_text(encoding='utf-8')
-            metadata = parse_frontmatter(content)
-            
-            if metadata:
-                metadata['path'] = entry_path
-                parsed.append(metadata)
-                
-                # Count stats
-                category = metadata.get('category', 'unknown')
-                priority = metadata.get('priority', 'unknown')
-                date = metadata.get('date', 'unknown')
-                
-                by_category[category] += 1
-                by_priority[priority] += 1
-                
-                if date != 'unknown':
-                    month = date[:7]  # YYYY-MM
-                    by_month[month] += 1
-                
-                # Attempts
-                attempts = metadata.get('attempts', '0')
-                try:
-                    total_attempts += int(attempts)
-                except:
-                    pass
-                
-                # Time saved
-                time_saved = metadata.get('time_saved', '0')
-                if 'hour' in time_saved.lower():
-                    try:
-                        hours = float(time_saved.split()[0])
-                        total_time_saved += hours
-                    except:
-                        pass
-        except:
-            continue
+    by_category = store.table('category')
+    by_priority = store.table('priority')
+    by_month = store.table('month')
+    total_attempts = int(store.total('attempts'))
+    total_time_saved = store.total('hours')
     
     # Display stats
-    print(f"{Colors.WHITE}{Colors.BOLD}📚 Total Entries: {len(parsed)}{Colors.RESET}")
+    print(f"{Colors.WHITE}{Colors.BOLD}📚 Total Entries: {total}{Colors.RESET}")
     print()
     
     # By category
@@ -87,7 +95,7 @@ def show_stats():
         max_count = max(by_category.values())
         for category in sorted(by_category.keys()):
             count = by_category[category]
-            percentage = (count / len(parsed)) * 100
+            percentage = (count / total) * 100
             icon = get_category_icon(category)
             bar_length = int((count / max_count) * 30)
             bar = '█' * bar_length
@@ -103,15 +111,15 @@ def show_stats():
         for priority in priority_order:
             if priority in by_priority:
                 count = by_priority[priority]
-                percentage = (count / len(parsed)) * 100
+                percentage = (count / total) * 100
                 icon = get_priority_icon(priority)
                 print(f"   {icon} {priority.ljust(12)} : {count} entries ({percentage:.1f}%)")
         print()
     
     # Compound metrics
     print(f"{Colors.YELLOW}{Colors.BOLD}📈 Compound Learning Metrics:{Colors.RESET}")
-    avg_attempts = total_attempts / len(parsed) if parsed else 0
-    avg_time_saved = total_time_saved / len(parsed) if parsed else 0
+    avg_attempts = total_attempts / total
+    avg_time_saved = total_time_saved / total
     projected_time = total_time_saved * 2  # Assume 2x reuse
     
     print(f"   Total Attempts: {total_attempts}")
@@ -123,12 +131,10 @@ def show_stats():
     
     # Recent activity
     print(f"{Colors.YELLOW}{Colors.BOLD}📅 Recent Activity:{Colors.RESET}")
-    recent = sorted(parsed, key=lambda x: x.get('path').stat().st_mtime, reverse=True)[:5]
-    
-    for entry in recent:
-        title = entry.get('title', 'Unknown')
-        path = entry.get('path')
-        time_ago = format_time_ago(path)
+    for key in store.newest(5):
+        record = cache.files[key]
+        title = record['metadata'].get('title', 'Unknown')
+        time_ago = format_time_ago(config.root_dir / key, record['mtime'] / 1e9)
         
         print(f"   - {title}")
         print(f"     {Colors.GRAY}{time_ago}{Colors.RESET}")
@@ -0,0 +1,378 @@
+"""
+KB Vector Module
+Local semantic search: hashed TF-IDF chunk vectors in an IVF index
+"""
+
+import math
+import os
+import threading
+import zlib
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from kb_common import (
+    KBConfig, chunk_markdown, load_json, read_files, split_frontmatter, write_json_atomic
+)
+from kb_search_index import tokenize
+
+# Optional: without NumPy, queries fall back to an exact sparse scan
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+VECTOR_VERSION = 1
+
+# Hashed feature space (power of two); tokens share buckets beyond this
+DIMENSIONS = 1024
+
+# Below this many chunks a query scores every chunk (one matrix product)
+IVF_MIN_CHUNKS = 256
+
+# Spherical k-means rounds when (re)training IVF centroids
+KMEANS_ITERATIONS = 8
+
+# Share of IVF lists a query scans by default (recall vs. latency)
+PROBE_FRACTION = 0.25
+
+# Retrain centroids once the chunk count drifts this far from training
+RETRAIN_DRIFT = 0.25
+
+# Characters of chunk text kept for display
+PREVIEW_CHARS = 160
+
+
+def features(text: str) -> Dict[int, float]:
+    """
+    Sublinear term frequencies of a text, hashed into DIMENSIONS buckets.
+
+    Tokens are hashed with CRC-32 (stable across processes, unlike
+    hash()); a second hash bit gives each token a sign so colliding
+    tokens cancel out instead of piling up.
+    """
+    counts: Dict[int, int] = {}
+    for token in tokenize(text):
+        digest = zlib.crc32(token.encode('utf-8'))
+        bucket = digest & (DIMENSIONS - 1)
+        counts[bucket] = counts.get(bucket, 0) + (1 if digest & 0x80000000 else -1)
+    return {bucket: math.copysign(1 + math.log(abs(count)), count)
+            for bucket, count in counts.items() if count}
+
+
+def preview(text: str) -> str:
+    """First PREVIEW_CHARS characters of a chunk, whitespace collapsed"""
+    return ' '.join(text.split())[:PREVIEW_CHARS]
+
+
+def assign_lists(matrix, centroids, block: int = 4096):
+    """Nearest centroid (by cosine) of each row, computed in blocks"""
+    return np.concatenate([
+        np.argmax(matrix[start:start + block] @ centroids.T, axis=1)
+        for start in range(0, len(matrix), block)
+    ]) if len(matrix) else np.zeros(0, dtype=np.int64)
+
+
+def train_centroids(matrix, nlist: int, iterations: int = KMEANS_ITERATIONS):
+    """Spherical k-means over unit rows; deterministic (seeded) initialization"""
+    rng = np.random.default_rng(0)
+    centroids = matrix[rng.choice(len(matrix), nlist, replace=False)].copy()
+    for _ in range(iterations):
+        assign = assign_lists(matrix, centroids)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assign, matrix)
+        counts = np.bincount(assign, minlength=nlist)
+        norms = np.linalg.norm(sums, axis=1)
+        filled = (counts > 0) & (norms > 0)
+        # Empty clusters keep their previous centroid
+        centroids[filled] = sums[filled] / norms[filled, None]
+    return centroids
+
+
+class VectorIndex:
+    """
+    Semantic index over header-based chunks of the KB
+
+    Each file is split into '#'/'##' sections (kb_common.chunk_markdown,
+    the same chunks document_sync stores in Neo4j); a chunk is embedded
+    as hashed TF-IDF over its title, header and text. Only sparse term
+    frequencies and document frequencies are persisted, in
+    .agent/knowledge-base/.cache/<name>.json, so files are re-embedded
+    only when they change (tracked by size and mtime, as in SearchIndex).
+
+    With NumPy, queries score unit vectors with batched matrix products.
+    Past IVF_MIN_CHUNKS chunks an IVF index (k-means centroids, one
+    inverted list per centroid) restricts scoring to the lists nearest
+    the query; centroids and list assignments are kept in <name>.npz and
+    retrained only when the corpus drifts. Without NumPy the query is an
+    exact scan of the sparse vectors. No network or service is involved.
+    """
+
+    def __init__(self, config: KBConfig, name: str = "vector-index"):
+        self.root_dir = config.root_dir
+        self.path = config.get_cache_dir() / f"{name}.json"
+        self.lists_path = config.get_cache_dir() / f"{name}.npz"
+        self.files: Dict[str, List[int]] = {}         # rel_path -> [size, mtime_ns]
+        self.chunks: Dict[str, List[List]] = {}       # rel_path -> [[header, preview, buckets, values], ...]
+        self.df: Dict[int, int] = {}                  # bucket -> chunks containing it
+        self.generation = 0                           # bumped on every change
+        self._dense = None
+        self.load()
+
+    def load(self) -> bool:
+        """Load the index from disk"""
+        data = load_json(self.path)
+        if not data or data.get('version') != VECTOR_VERSION or data.get('dimensions') != DIMENSIONS:
+            return False
+        self.files = data.get('files', {})
+        self.chunks = data.get('chunks', {})
+        self.df = {int(bucket): count for bucket, count in data.get('df', {}).items()}
+        self.generation = data.get('generation', 0)
+        return True
+
+    def save(self):
+        """Persist the index to disk"""
+        write_json_atomic(self.path, {
+            'version': VECTOR_VERSION,
+            'dimensions': DIMENSIONS,
+            'generation': self.generation,
+            'files': self.files,
+            'chunks': self.chunks,
+            'df': self.df,
+        })
+
+    def key(self, file_path: Path) -> str:
+        """Index key for a file (path relative to project root)"""
+        try:
+            return file_path.relative_to(self.root_dir).as_posix()
+        except ValueError:
+            return file_path.as_posix()
+
+    def __len__(self) -> int:
+        return sum(len(chunks) for chunks in self.chunks.values())
+
+    def sync(self, entries: List[Path], jobs: int = 1) -> List[Path]:
+        """
+        Bring the index up to date with the given files.
+
+        Only new or changed files are read and embedded (with `jobs`
+        threads); deleted files are dropped. Returns the re-embedded files.
+        """
+        current = {self.key(path): path for path in entries}
+        removed = {key for key in self.files if key not in current}
+        changed = []
+
+        for key, path in current.items():
+            try:
+                stat = path.stat()
+            except OSError:
+                removed.add(key)
+                continue
+            signature = [stat.st_size, stat.st_mtime_ns]
+            if self.files.get(key) != signature:
+                changed.append((key, path, signature))
+
+        if not removed and not changed:
+            return []
+
+        for key in removed | {key for key, _, _ in changed}:
+            self._remove(key)
+
+        embedded = []
+        contents = read_files([path for _, path, _ in changed], jobs)
+        for (key, path, signature), item in zip(changed, contents):
+            if item is None:
+                continue
+            try:
+                content = item[0].decode('utf-8')
+            except UnicodeDecodeError:
+                continue
+            self.files[key] = signature
+            self._add(key, content)
+            embedded.append(path)
+
+        self.generation += 1
+        self.save()
+        return embedded
+
+    def _add(self, key: str, content: str):
+        """Chunk and embed a file"""
+        metadata, body = split_frontmatter(content)
+        title = str((metadata or {}).get('title', ''))
+        chunks = []
+        for header, text in chunk_markdown(body, min_length=0):
+            # A header directly followed by another has nothing to embed
+            if not text.strip():
+                continue
+            vector = features(f"{title}\n{header}\n{text}")
+            buckets = sorted(vector)
+            chunks.append([header.lstrip('#').strip(), preview(text), buckets,
+                           [round(vector[bucket], 4) for bucket in buckets]])
+            for bucket in buckets:
+                self.df[bucket] = self.df.get(bucket, 0) + 1
+        self.chunks[key] = chunks
+
+    def _remove(self, key: str):
+        """Drop a file's chunks"""
+        self.files.pop(key, None)
+        for _, _, buckets, _ in self.chunks.pop(key, []):
+            for bucket in buckets:
+                count = self.df[bucket] - 1
+                if count:
+                    self.df[bucket] = count
+                else:
+                    del self.df[bucket]
+
+    def idf(self, bucket: int, total: int) -> float:
+        """Smoothed inverse document frequency of a bucket"""
+        return math.log((1 + total) / (1 + self.df.get(bucket, 0))) + 1
+
+    def search(self, query: str, k: int = 10,
+               nprobe: Optional[int] = None) -> List[Tuple[float, str, Dict]]:
+        """
+        Files most similar to a query, best first.
+
+        A file scores the cosine similarity of its best chunk. `nprobe`
+        is the number of IVF lists scanned (default: PROBE_FRACTION of them).
+        Returns (score, rel_path, {'header', 'preview'}) triples.
+        """
+        total = len(self)
+        query_vector = features(query)
+        if not total or not query_vector or k <= 0:
+            return []
+        weights = {bucket: value * self.idf(bucket, total)
+                   for bucket, value in query_vector.items()}
+
+        if np is None:
+            scored = self._scan(weights)
+        else:
+            scored = self._probe(weights, nprobe)
+
+        results, seen = [], set()
+        for score, key, chunk_no in scored:
+            if score <= 0 or len(results) >= k:
+                break
+            if key in seen:
+                continue
+            seen.add(key)
+            header, text = self.chunks[key][chunk_no][:2]
+            results.append((score, key, {'header': header, 'preview': text}))
+        return results
+
+    def _scan(self, weights: Dict[int, float]) -> List[Tuple[float, str, int]]:
+        """Exact cosine scores over the sparse vectors (no NumPy)"""
+        total = len(self)
+        query_norm = math.sqrt(sum(w * w for w in weights.values()))
+        scored = []
+        for key, chunks in self.chunks.items():
+            for chunk_no, (_, _, buckets, values) in enumerate(chunks):
+                dot, norm = 0.0, 0.0
+                for bucket, value in zip(buckets, values):
+                    weight = value * self.idf(bucket, total)
+                    norm += weight * weight
+                    if bucket in weights:
+                        dot += weight * weights[bucket]
+                if dot:
+                    scored.append((dot / (math.sqrt(norm) * query_norm), key, chunk_no))
+        scored.sort(key=lambda item: (-item[0], item[1], item[2]))
+        return scored
+
+    def _probe(self, weights: Dict[int, float],
+               nprobe: Optional[int]) -> List[Tuple[float, str, int]]:
+        """Cosine scores of the chunks in the IVF lists nearest the query"""
+        ids, _, centroids, lists, _ = self._dense_state()
+        query = np.zeros(DIMENSIONS, dtype=np.float32)
+        for bucket, weight in weights.items():
+            query[bucket] = weight
+        query /= np.linalg.norm(query)
+
+        if centroids is None:
+            nearest = [0]
+        else:
+            nprobe = nprobe or max(1, int(len(centroids) * PROBE_FRACTION))
+            nearest = np.argsort(-(centroids @ query), kind='stable')[:nprobe]
+        rows = np.concatenate([lists[cluster] for cluster in nearest])
+        scores = np.concatenate([self._list_matrix(cluster) @ query for cluster in nearest])
+        order = np.argsort(-scores, kind='stable')
+        return [(float(scores[i]),) + ids[rows[i]] for i in order]
+
+    def _dense_state(self):
+        """
+        Chunk ids, idf weights, IVF centroids and lists for the current
+        generation, plus the dense blocks of the lists densified so far.
+
+        Lists are densified on first probe (_list_matrix), so a cold
+        process only builds the rows of the lists its query scans; the
+        whole matrix is built only when the IVF assignments are stale.
+        """
+        if self._dense is not None and self._dense[0] == self.generation:
+            return self._dense[1:]
+
+        ids = [(key, chunk_no) for key in sorted(self.chunks)
+               for chunk_no in range(len(self.chunks[key]))]
+        total = len(ids)
+        idf = np.array([self.idf(bucket, total) for bucket in range(DIMENSIONS)], dtype=np.float32)
+
+        if total >= IVF_MIN_CHUNKS:
+            centroids, assign = self._ivf(ids, idf)
+            order = np.argsort(assign, kind='stable')
+            bounds = np.searchsorted(assign[order], np.arange(len(centroids) + 1))
+            lists = [order[bounds[i]:bounds[i + 1]] for i in range(len(centroids))]
+        else:
+            # One list holding every chunk: the query scores them all
+            centroids, lists = None, [np.arange(total)]
+
+        self._dense = (self.generation, ids, idf, centroids, lists, {})
+        return self._dense[1:]
+
+    def _unit_rows(self, ids: List[Tuple[str, int]], idf, rows):
+        """TF-IDF unit vectors of the given chunk rows, as a dense matrix"""
+        matrix = np.zeros((len(rows), DIMENSIONS), dtype=np.float32)
+        for row, index in enumerate(rows):
+            key, chunk_no = ids[index]
+            _, _, buckets, values = self.chunks[key][chunk_no]
+            matrix[row, buckets] = values
+        matrix *= idf
+        norms = np.linalg.norm(matrix, axis=1)
+        matrix[norms > 0] /= norms[norms > 0, None]
+        return matrix
+
+    def _list_matrix(self, cluster: int):
+        """Dense unit vectors of one IVF list, built on first use"""
+        ids, idf, _, lists, blocks = self._dense[1:]
+        if cluster not in blocks:
+            blocks[cluster] = self._unit_rows(ids, idf, lists[cluster])
+        return blocks[cluster]
+
+    def _ivf(self, ids: List[Tuple[str, int]], idf):
+        """
+        Centroids and list assignments, reusing <name>.npz where still valid.
+
+        Only reassigning (after a change) needs every chunk densified.
+        """
+        total = len(ids)
+        stored = None
+        try:
+            with np.load(self.lists_path) as data:
+                stored = {name: data[name] for name in data.files}
+        except (OSError, ValueError, KeyError):
+            pass
+
+        if stored and int(stored['generation']) == self.generation and len(stored['assign']) == total:
+            return stored['centroids'], stored['assign']
+
+        matrix = self._unit_rows(ids, idf, range(total))
+        if stored and abs(total - int(stored['trained'])) <= RETRAIN_DRIFT * int(stored['trained']):
+            centroids, trained = stored['centroids'], int(stored['trained'])
+        else:
+            centroids, trained = train_centroids(matrix, max(1, int(math.sqrt(total)))), total
+        assign = assign_lists(matrix, centroids)
+
+        # Written atomically like write_json_atomic (temp file + rename)
+        path = self.lists_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, generation=self.generation, trained=trained,
+                     centroids=centroids, assign=assign)
+        os.replace(tmp_path, path)
+        return centroids, assign
@@ -0,0 +1,1852 @@
+#!/usr/bin/env python3
+"""
+Tests for bin/lib/ KB CLI modules
+Knowledge base library tests
+"""
+
+import sys
+import time
+import pytest
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+# Add bin/lib directory to path
+LIB_DIR = Path(__file__).parent.parent / "bin" / "lib"
+sys.path.insert(0, str(LIB_DIR))
+
+
+ENTRY_TEMPLATE = """---
+title: "{title}"
+category: {category}
+priority: {priority}
+date: {date}
+tags: [{tags}]
+attempts: 2
+time_saved: "3 hours"
+---
+
+# {title}
+
+## Problem
+
+{body}
+"""
+
+
+def write_entry(kb_dir, name, title, body, category='bug', priority='high',
+                date='2026-01-02', tags='react, ssr'):
+    """Write a KB entry file"""
+    path = kb_dir / name
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(ENTRY_TEMPLATE.format(
+        title=title, category=category, priority=priority,
+        date=date, tags=tags, body=body
+    ), encoding='utf-8')
+    return path
+
+
+@pytest.fixture
+def kb_project(tmp_path, monkeypatch):
+    """Temporary project with an empty knowledge base"""
+    kb_dir = tmp_path / ".agent" / "knowledge-base"
+    kb_dir.mkdir(parents=True)
+    (tmp_path / "docs").mkdir()
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+@pytest.fixture
+def kb_dir(kb_project):
+    """Knowledge base directory of the temporary project"""
+    return kb_project / ".agent" / "knowledge-base"
+
+
+class TestKBCache:
+    """Tests for the shared manifest cache"""
+
+    def test_refresh_reports_delta(self, kb_dir):
+        """refresh() should report added, changed and removed files"""
+        from kb_common import KBConfig, KBCache
+
+        first = write_entry(kb_dir, "KB-2026-01-02-001-a.md", "First", "alpha")
+        second = write_entry(kb_dir, "KB-2026-01-02-002-b.md", "Second", "beta")
+        delta = KBCache(KBConfig()).refresh([first, second])
+        assert delta['added'] == [first, second]
+
+        write_entry(kb_dir, "KB-2026-01-02-001-a.md", "First v2", "alpha")
+        second.unlink()
+        cache = KBCache(KBConfig())
+        delta = cache.refresh([first])
+
+        assert delta == {'added': [], 'changed': [first], 'removed': [second], 'touched': []}
+        assert cache.get_metadata(first)['title'] == "First v2"
+
+    def test_unchanged_files_are_not_read(self, kb_dir):
+        """Unchanged files should only be stat()ed on refresh"""
+        from kb_common import KBConfig, KBCache
+
+        entry = write_entry(kb_dir, "KB-2026-01-02-001-a.md", "First", "alpha")
+        KBCache(KBConfig()).refresh([entry])
+
+        with patch('kb_common.read_head', side_effect=AssertionError("read")):
+            delta = KBCache(KBConfig()).refresh([entry])
+
+        assert delta == {'added': [], 'changed': [], 'removed': [], 'touched': []}
+
+    def test_touched_file_keeps_metadata(self, kb_dir):
+        """A touched but unchanged file should not count as changed"""
+        import os
+        from kb_common import KBConfig, KBCache
+
+        entry = write_entry(kb_dir, "KB-2026-01-02-001-a.md", "First", "alpha")
+        KBCache(KBConfig()).refresh([entry])
+        os.utime(entry, (1, 1))
+
+        delta = KBCache(KBConfig()).refresh([entry])
+        assert delta['changed'] == []
+
+    def test_entries_filters_by_directory(self, kb_dir):
+        """entries(under=...) should only return files in that directory"""
+        from kb_common import KBConfig, load_kb_cache
+
+        write_entry(kb_dir / "bugs", "KB-2026-01-02-001-a.md", "Bug", "alpha")
+        write_entry(kb_dir / "features", "KB-2026-01-02-002-b.md", "Feature", "beta",
+                    category='feature')
+
+        cache = load_kb_cache(KBConfig())
+        entries = cache.entries(under=kb_dir / "bugs")
+
+        assert [m['title'] for _, m in entries] == ["Bug"]
+
+
+class TestSearchIndex:
+    """Tests for the persistent inverted index"""
+
+    def test_lookup_finds_lines(self, kb_dir):
+        """Index lookup should return files and line numbers"""
+        from kb_common import KBConfig
+        from kb_search_index import SearchIndex
+
+        entry = write_entry(kb_dir / "bugs", "KB-2026-01-02-001-a.md",
+                            "Hydration error", "React hydration mismatch on load")
+        write_entry(kb_dir / "bugs", "KB-2026-01-02-002-b.md",
+                    "Token refresh", "OAuth token expired")
+
+        index = SearchIndex(KBConfig())
+        index.sync([entry, kb_dir / "bugs" / "KB-2026-01-02-002-b.md"])
+        candidates = index.lookup("hydration mis")
+
+        assert len(candidates) == 1
+        path, lines = candidates[0]
+        assert path == entry
+        content_lines = entry.read_text(encoding='utf-8').split('\n')
+        assert any('hydration mismatch' in content_lines[n] for n in lines)
+
+    def test_sync_rescans_only_changed_files(self, kb_dir):
+        """Persisted index should only re-scan changed files"""
+        from kb_common import KBConfig
+        from kb_search_index import SearchIndex
+
+        first = write_entry(kb_dir, "KB-2026-01-02-001-a.md", "First", "alpha")
+        second = write_entry(kb_dir, "KB-2026-01-02-002-b.md", "Second", "beta")
+        SearchIndex(KBConfig()).sync([first, second])
+
+        write_entry(kb_dir, "KB-2026-01-02-002-b.md", "Second", "gamma delta")
+        index = SearchIndex(KBConfig())
+        rescanned = index.sync([first, second])
+
+        assert rescanned == [second]
+        assert index.lookup("beta") == []
+        assert [p for p, _ in index.lookup("gamma")] == [second]
+
+    def test_sync_drops_deleted_files(self, kb_dir):
+        """Deleted files should be removed from the index"""
+        from kb_common import KBConfig
+        from kb_search_index import SearchIndex
+
+        entry = write_entry(kb_dir, "KB-2026-01-02-001-a.md", "First", "alpha")
+        index = SearchIndex(KBConfig())
+        index.sync([entry])
+        entry.unlink()
+        index.sync([])
+
+        assert index.lookup("alpha") == []
+        assert index.files == {}
+
+    def test_lookup_reads_only_term_shards(self, kb_dir):
+        """A search should read only its terms' posting shards, and an unchanged sync write nothing"""
+        import kb_search_index
+        from kb_common import KBConfig
+        from kb_search_index import SearchIndex, ShardedPostings
+
+        entry = write_entry(kb_dir, "KB-2026-01-02-001-a.md", "First", "alpha beta gamma delta")
+        SearchIndex(KBConfig()).sync([entry])
+
+        load_json = kb_search_index.load_json
+        read = []
+        with patch.object(kb_search_index, 'load_json',
+                          lambda path, *a: read.append(path) or load_json(path, *a)), \
+                patch.object(kb_search_index, 'write_json_atomic') as write:
+            index = SearchIndex(KBConfig())
+            assert index.sync([entry]) == []
+            assert [p for p, _ in index.lookup("gamma")] == [entry]
+        assert not write.called
+        assert [p.name for p in read[1:]] == [f"{ShardedPostings.shard_of('gamma'):02x}.json"]
+
+    def test_update_reads_only_changed_file_shards(self, kb_dir):
+        """Re-indexing a file should read only the shards of its old and new tokens"""
+        import kb_search_index
+        from kb_common import KBConfig
+        from kb_search_index import SearchIndex, ShardedPostings, tokenize
+
+        first = write_entry(kb_dir, "KB-2026-01-02-001-a.md", "First", "alpha")
+        second = write_entry(kb_dir, "KB-2026-01-02-002-b.md", "Second", "beta")
+        SearchIndex(KBConfig()).sync([first, second])
+        old = tokenize(first.read_text(encoding='utf-8'))
+
+        write_entry(kb_dir, "KB-2026-01-02-001-a.md", "First", "omega")
+        new = tokenize(first.read_text(encoding='utf-8'))
+        load_json = kb_search_index.load_json
+        read = []
+        with patch.object(kb_search_index, 'load_json',
+                          lambda path, *a: read.append(path) or load_json(path, *a)):
+            index = SearchIndex(KBConfig())
+            assert index.sync([first, second]) == [first]
+        expected = {f"{ShardedPostings.shard_of(t):02x}.json" for t in old + new}
+        assert {p.name for p in read[1:]} <= expected
+
+        assert index.lookup("alpha") == []
+        assert [p for p, _ in index.lookup("omega")] == [first]
+        assert [p for p, _ in SearchIndex(KBConfig()).lookup("beta")] == [second]
+
+    def test_search_files_uses_index(self, kb_dir):
+        """search_files should return the same matches as a full scan"""
+        from kb_common import KBConfig
+        from kb_search import search_files
+
+        write_entry(kb_dir, "KB-2026-01-02-001-a.md", "Hydration", "React Hydration mismatch")
+        write_entry(kb_dir, "KB-2026-01-02-002-b.md", "Other", "nothing here")
+
+        with patch('builtins.print'):
+            results = search_files(KBConfig(), "hydration MISMATCH")
+
+        assert [r['title'] for r in results] == ["Hydration"]
+        assert results[0]['context'] == ["React Hydration mismatch"]
+
+
+
+class TestRankedSearch:
+    """Tests for BM25 ranked search"""
+
+    def test_title_match_outranks_body_match(self, kb_dir):
+        """Field weights should favour title hits over body hits"""
+        from kb_common import KBConfig
+        from kb_search_index import SearchIndex
+        from kb_rank import rank
+
+        in_title = write_entry(kb_dir, "KB-2026-01-02-001-a.md", "Caching strategy",
+                               "Notes about invalidation", tags='perf')
+        in_body = write_entry(kb_dir, "KB-2026-01-02-002-b.md", "Misc notes",
+                              "We looked at caching once", tags='perf')
+        write_entry(kb_dir, "KB-2026-01-02-003-c.md", "Unrelated", "Nothing", tags='perf')
+
+        index = SearchIndex(KBConfig())
+        index.sync([in_title, in_body, kb_dir / "KB-2026-01-02-003-c.md"])
+        ranked = rank(index, "caching", k=10)
+
+        assert [path for _, path in ranked] == [in_title, in_body]
+        assert ranked[0][0] > ranked[1][0]
+
+    def test_rank_returns_only_top_k(self, kb_dir):
+        """rank() should return at most k results, best first"""
+        from kb_common import KBConfig
+        from kb_search_index import SearchIndex
+        from kb_rank import rank
+
+        paths = [
+            write_entry(kb_dir, f"KB-2026-01-02-00{i}-x.md", f"Entry {i}",
+                        " ".join(["oauth"] * i) + " filler text here")
+            for i in range(1, 6)
+        ]
+        index = SearchIndex(KBConfig())
+        index.sync(paths)
+        ranked = rank(index, "oauth", k=2)
+
+        assert len(ranked) == 2
+        assert [path for _, path in ranked] == [paths[4], paths[3]]
+
+    def test_parse_search_args(self):
+        """kb search should accept --ranked and -k options"""
+        from kb_search import parse_search_args
+
+        args = parse_search_args(['--ranked', '-k', '3', 'react', 'hydration'])
+        assert args.ranked is True
+        assert args.top == 3
+        assert args.terms == ['react', 'hydration']
+
+
+class TestParallelScan:
+    """Tests for the parallel ingestion scanner"""
+
+    def test_parallel_matches_serial(self, kb_dir):
+        """scan_files with several jobs should match the serial scan"""
+        from kb_common import scan_files
+
+        paths = [
+            write_entry(kb_dir, f"KB-2026-01-02-{i:03d}-x.md", f"Entry {i}", f"body {i}")
+            for i in range(1, 9)
+        ]
+        paths.append(kb_dir / "missing.md")
+
+        serial = scan_files(paths, jobs=1)
+        with patch('kb_common.PARALLEL_MIN_FILES', 1):
+            parallel = scan_files(paths, jobs=4)
+
+        assert parallel == serial
+        assert serial[-1] is None
+        assert serial[0]['metadata']['title'] == "Entry 1"
+        assert serial[0]['heading'] == "Entry 1"
+
+    def test_refresh_with_jobs(self, kb_dir):
+        """KBCache.refresh(jobs=N) should build the same manifest"""
+        from kb_common import KBConfig, KBCache
+
+        paths = [
+            write_entry(kb_dir, f"KB-2026-01-02-{i:03d}-x.md", f"Entry {i}", f"body {i}")
+            for i in range(1, 6)
+        ]
+        with patch('kb_common.PARALLEL_MIN_FILES', 1):
+            cache = KBCache(KBConfig())
+            delta = cache.refresh(paths, jobs=3)
+
+        assert delta['added'] == paths
+        assert [m['title'] for _, m in cache.entries()] == [f"Entry {i}" for i in range(1, 6)]
+
+    def test_resolve_jobs(self):
+        """0 should mean one worker per CPU"""
+        import os
+        from kb_common import resolve_jobs
+
+        assert resolve_jobs(0) == (os.cpu_count() or 1)
+        assert resolve_jobs(3) == 3
+        assert resolve_jobs(-2) == 1
+
+
+class TestFrontmatterParser:
+    """Tests for the shared single-pass frontmatter parser"""
+
+    def test_values_and_arrays(self):
+        """Quoted values, inline arrays and block lists should be parsed"""
+        from kb_common import parse_frontmatter
+
+        content = (
+            '---\r\n'
+            'title: "Hydration: SSR mismatch"\r\n'
+            "tags: [react, 'ssr', \"next\"]\r\n"
+            'related_files: []\r\n'
+            'steps:\r\n'
+            '  - .agent/workflows/cleanup.md\r\n'
+            '  - docs/plan.md\r\n'
+            'attempts: 2\r\n'
+            '---\r\n'
+            'body: not frontmatter\r\n'
+        )
+        metadata = parse_frontmatter(content)
+
+        assert metadata == {
+            'title': 'Hydration: SSR mismatch',
+            'tags': ['react', 'ssr', 'next'],
+            'related_files': [],
+            'steps': ['.agent/workflows/cleanup.md', 'docs/plan.md'],
+            'attempts': '2',
+        }
+
+    def test_missing_or_unclosed_frontmatter(self):
+        """Files without a closed block should have no metadata"""
+        from kb_common import parse_frontmatter, split_frontmatter
+
+        assert parse_frontmatter("# Title\n\ntitle: nope\n") == {}
+        assert parse_frontmatter("---\ntitle: open\n\n# Body\n") == {}
+        assert split_frontmatter("# Title\n") == (None, "# Title\n")
+
+    def test_split_frontmatter_returns_body(self):
+        """split_frontmatter should return the text after the closing ---"""
+        from kb_common import split_frontmatter
+
+        metadata, body = split_frontmatter("---\ntitle: A\n---\n\n# A\n---\nmore\n")
+        assert metadata == {'title': 'A'}
+        assert body == "\n# A\n---\nmore\n"
+
+    def test_read_frontmatter_stops_at_head(self, tmp_path):
+        """read_frontmatter should not decode the body"""
+        from kb_common import read_frontmatter
+
+        path = tmp_path / "big.md"
+        path.write_bytes(
+            b'---\ntitle: Big\ntags: [a]\n---\n' + b'x' * 65536 + b'\xff\xfe'
+        )
+
+        assert read_frontmatter(path) == {'title': 'Big', 'tags': ['a']}
+
+
+class TestHeadReads:
+    """Tests for metadata-only (head) reads"""
+
+    def test_read_head_is_bounded(self, tmp_path):
+        """Only the first HEAD_BYTES are read once the frontmatter is closed"""
+        from kb_common import HEAD_BYTES, read_head
+
+        path = tmp_path / "doc.md"
+        path.write_text("---\ntitle: Doc\n---\n\n# Doc\n" + "body line\n" * 10000,
+                        encoding='utf-8')
+        head = read_head(path)
+
+        assert len(head) <= HEAD_BYTES
+        assert head.endswith(b'\n')
+        assert head.startswith(b'---\ntitle: Doc\n---\n')
+
+    def test_read_head_grows_until_frontmatter_closes(self, tmp_path):
+        """A frontmatter block larger than the prefix should be read whole"""
+        from kb_common import HEAD_BYTES, read_frontmatter
+
+        path = tmp_path / "doc.md"
+        steps = "".join(f"  - step {i}\n" for i in range(HEAD_BYTES // 5))
+        path.write_text(f"---\nsteps:\n{steps}title: Late\n---\n" + "x\n" * 10000,
+                        encoding='utf-8')
+        metadata = read_frontmatter(path)
+
+        assert metadata['title'] == "Late"
+        assert len(metadata['steps']) == HEAD_BYTES // 5
+
+    def test_cache_reads_only_heads(self, kb_dir):
+        """KBCache should never read whole files"""
+        from kb_common import KBConfig, KBCache
+
+        entry = write_entry(kb_dir, "KB-2026-01-02-001-a.md", "Big", "word " * 50000)
+        with patch.object(Path, 'read_bytes', side_effect=AssertionError("read")):
+            cache = KBCache(KBConfig())
+            cache.refresh([entry])
+
+        assert cache.get_metadata(entry)['title'] == "Big"
+
+    def test_scan_files_head_only_heading(self, kb_dir):
+        """Head-only scans should still find the leading heading"""
+        from kb_common import scan_files
+
+        entry = write_entry(kb_dir, "KB-2026-01-02-001-a.md", "Big", "word " * 50000)
+        full, head = scan_files([entry]), scan_files([entry], head_only=True)
+
+        assert head[0]['metadata'] == full[0]['metadata']
+        assert head[0]['heading'] == full[0]['heading'] == "Big"
+
+
+class TestScanEngine:
+    """Tests for the memory-mapped multi-term scan engine"""
+
+    def test_find_lines_any_term(self, tmp_path):
+        """Lines matching any term are returned, decoded and stripped"""
+        from kb_scan import LiteralMatcher, scan_lines
+
+        path = tmp_path / "doc.md"
+        path.write_bytes(b"intro\r\n  OAuth token expired\r\nnone\r\nJWT refresh\r\n"
+                         b"session cookie\r\nmore jwt\r\n")
+        lines = scan_lines(path, LiteralMatcher(["oauth", "jwt", "session"]))
+
+        assert lines == ["OAuth token expired", "JWT refresh", "session cookie"]
+
+    def test_find_terms_reports_overlapping_terms(self):
+        """Terms inside or overlapping other matches are all reported"""
+        from kb_scan import LiteralMatcher
+
+        matcher = LiteralMatcher(["react", "act", "reactor", "tor", "vue"])
+        assert matcher.find_terms(b"A REACTOR core") == {"react", "act", "reactor", "tor"}
+
+    def test_non_ascii_terms(self):
+        """Non-ASCII terms should still match case-insensitively"""
+        from kb_scan import LiteralMatcher
+
+        matcher = LiteralMatcher(["über", "cache"])
+        data = "Über cached\nnothing\n".encode('utf-8')
+
+        assert matcher.find_terms(data) == {"über", "cache"}
+        assert matcher.find_lines(data) == ["Über cached"]
+
+    def test_empty_and_missing_files(self, tmp_path):
+        """Empty files have no matches; missing files are unreadable"""
+        from kb_scan import LiteralMatcher, scan_lines, scan_terms
+
+        empty = tmp_path / "empty.md"
+        empty.write_bytes(b"")
+        matcher = LiteralMatcher(["x"])
+
+        assert scan_lines(empty, matcher) == []
+        assert scan_terms(tmp_path / "missing.md", matcher) is None
+
+    def test_search_files_multiple_terms(self, kb_dir):
+        """search_files should return files matching any of the terms"""
+        from kb_common import KBConfig
+        from kb_search import search_files, parse_search_args, search_terms
+
+        write_entry(kb_dir, "KB-2026-01-02-001-a.md", "Auth", "OAuth token expired")
+        write_entry(kb_dir, "KB-2026-01-02-002-b.md", "Cache", "Redis cache miss")
+        write_entry(kb_dir, "KB-2026-01-02-003-c.md", "Other", "nothing here")
+
+        terms = search_terms(parse_search_args(['oauth', '-e', 'redis']))
+        with patch('builtins.print'):
+            results = search_files(KBConfig(), terms)
+
+        assert terms == ['oauth', 'redis']
+        assert [r['title'] for r in results] == ["Auth", "Cache"]
+
+
+class TestStreamingSearch:
+    """Tests for streaming search output"""
+
+    def test_limit_stops_scan(self, kb_dir):
+        """search_files should stop scanning once the limit is reached"""
+        from kb_common import KBConfig
+        import kb_engine
+        import kb_search
+
+        for i in range(1, 6):
+            write_entry(kb_dir, f"KB-2026-01-02-00{i}-x.md", f"Entry {i}", "shared keyword")
+
+        emitted = []
+        with patch('kb_engine.scan_lines', wraps=kb_engine.scan_lines) as scan:
+            results = kb_search.search_files(KBConfig(), "keyword", limit=2,
+                                             emit=emitted.append)
+
+        assert [r['title'] for r in results] == ["Entry 1", "Entry 2"]
+        assert emitted == results
+        assert scan.call_count == 2
+
+    def test_json_lines_output(self, kb_dir, capsys):
+        """--json-lines should print one JSON object per result and nothing else"""
+        import json
+        from kb_search import search_kb
+
+        write_entry(kb_dir, "KB-2026-01-02-001-a.md", "Hydration", "React hydration mismatch")
+        write_entry(kb_dir, "KB-2026-01-02-002-b.md", "Other", "hydration again")
+
+        search_kb("hydration", limit=1, json_lines=True)
+        lines = capsys.readouterr().out.strip().split('\n')
+
+        assert len(lines) == 1
+        record = json.loads(lines[0])
+        assert record['title'] == "Hydration"
+        assert record['path'] == ".agent/knowledge-base/KB-2026-01-02-001-a.md"
+
+    def test_index_search_stops_at_limit(self, kb_dir):
+        """search_index should stop reading INDEX.md after the limit"""
+        from kb_common import KBConfig
+        from kb_search import search_index
+
+        (kb_dir / "INDEX.md").write_text(
+            "".join(f"- oauth entry {i}\n" for i in range(20)), encoding='utf-8'
+        )
+        with patch('builtins.print'):
+            results = search_index(KBConfig(), "oauth", limit=3)
+
+        assert results == ["- oauth entry 0", "- oauth entry 1", "- oauth entry 2"]
+
+
+class TestIncrementalIndex:
+    """Tests for the incremental INDEX.md model"""
+
+    def render_fresh(self):
+        """INDEX.md content rendered from an empty model"""
+        from kb_common import KBConfig, load_kb_cache
+        from kb_index import IndexModel
+
+        config = KBConfig()
+        model = IndexModel(config)
+        model.clear()
+        model.sync(load_kb_cache(config))
+        return model.render()
+
+    def test_deltas_match_full_rebuild(self, kb_dir):
+        """Applying add/modify/delete deltas should render like a rebuild"""
+        from kb_common import KBConfig, LAST_UPDATED_PATTERN
+        from kb_index import refresh_index
+
+        config = KBConfig()
+        write_entry(kb_dir, "KB-2026-01-02-001-a.md", "Alpha", "first")
+        write_entry(kb_dir, "KB-2026-01-02-002-b.md", "Beta", "second", category='feature')
+        report = refresh_index(config)
+        assert sorted(report['delta']['added']) == [
+            ".agent/knowledge-base/KB-2026-01-02-001-a.md",
+            ".agent/knowledge-base/KB-2026-01-02-002-b.md",
+        ]
+
+        write_entry(kb_dir, "KB-2026-01-02-001-a.md", "Alpha v2", "first, edited", priority='low')
+        (kb_dir / "KB-2026-01-02-002-b.md").unlink()
+        write_entry(kb_dir, "KB-2026-01-03-003-c.md", "Gamma", "third", date='2026-01-03')
+        report = refresh_index(config)
+
+        assert report['delta'] == {
+            'added': [".agent/knowledge-base/KB-2026-01-03-003-c.md"],
+            'changed': [".agent/knowledge-base/KB-2026-01-02-001-a.md"],
+            'removed': [".agent/knowledge-base/KB-2026-01-02-002-b.md"],
+        }
+        assert 'feature' not in report['model'].groups['category']
+        written = config.get_index_path().read_text(encoding='utf-8')
+        assert LAST_UPDATED_PATTERN.sub('', written) == LAST_UPDATED_PATTERN.sub('', self.render_fresh())
+
+    def test_unchanged_index_is_not_rewritten(self, kb_dir):
+        """INDEX.md should be written only when its content changes"""
+        from kb_common import KBConfig
+        from kb_index import refresh_index
+
+        config = KBConfig()
+        write_entry(kb_dir, "KB-2026-01-02-001-a.md", "Alpha", "first")
+        assert refresh_index(config)['written'] is True
+
+        with patch.object(Path, 'write_text') as write_text:
+            report = refresh_index(config)
+        assert report['written'] is False
+        write_text.assert_not_called()
+
+    def test_watch_files_debounces_changes(self, kb_dir):
+        """A burst of changes should produce one on_change call with the delta"""
+        import threading
+        import time
+        from kb_common import watch_files
+
+        first = write_entry(kb_dir, "KB-2026-01-02-001-a.md", "Alpha", "first")
+        stop = threading.Event()
+        calls = []
+
+        def on_change(delta):
+            calls.append(delta)
+            stop.set()
+
+        thread = threading.Thread(
+            target=watch_files,
+            args=(lambda: sorted(kb_dir.glob("KB-*.md")), on_change),
+            kwargs={'interval': 0.05, 'debounce': 0.2, 'stop': stop},
+        )
+        thread.start()
+        time.sleep(0.1)
+        first.unlink()
+        second = write_entry(kb_dir, "KB-2026-01-02-002-b.md", "Beta", "second")
+        third = write_entry(kb_dir, "KB-2026-01-02-003-c.md", "Gamma", "third")
+        thread.join(timeout=5)
+
+        assert len(calls) == 1
+        assert sorted(calls[0]['changed']) == [second, third]
+        assert calls[0]['removed'] == [first]
+
+
+class TestEntryIds:
+    """Tests for KB ID allocation and bulk add"""
+
+    def test_seeds_from_existing_entries(self, kb_dir):
+        """The first ID of a day should follow the highest one on disk"""
+        from kb_common import KBConfig
+        from kb_add import EntryIdAllocator
+
+        write_entry(kb_dir, "bugs/high/KB-2026-01-02-007-a.md", "A", "a")
+        write_entry(kb_dir, "KB-2026-01-02-windows-fix.md", "B", "b")
+
+        allocator = EntryIdAllocator(KBConfig())
+        assert allocator.allocate("2026-01-02") == 8
+        assert allocator.allocate("2026-01-02") == 9
+        assert allocator.allocate("2026-01-03") == 1
+
+    def test_counter_avoids_globbing(self, kb_dir):
+        """With a persisted counter, allocation should not walk the KB"""
+        from kb_common import KBConfig
+        from kb_add import EntryIdAllocator
+
+        EntryIdAllocator(KBConfig()).allocate("2026-01-02")
+        with patch.object(Path, 'rglob', side_effect=AssertionError("rglob called")):
+            assert EntryIdAllocator(KBConfig()).allocate("2026-01-02") == 2
+
+    def test_skips_ids_that_arrived_without_reservation(self, kb_dir):
+        """Entries pulled in after a day's counter exists should not get their ID reused"""
+        from kb_common import KBConfig
+        from kb_add import EntryIdAllocator
+
+        assert EntryIdAllocator(KBConfig()).allocate("2026-01-02") == 1
+        write_entry(kb_dir, "features/KB-2026-01-02-002-pulled.md", "Pulled", "x")
+        write_entry(kb_dir, "bugs/low/KB-2026-01-02-003-pulled.md", "Pulled", "x")
+        with patch.object(Path, 'rglob', side_effect=AssertionError("rglob called")):
+            assert EntryIdAllocator(KBConfig()).allocate("2026-01-02") == 4
+
+    def test_import_reserves_ids(self, kb_dir, tmp_path):
+        """IDs written by kb import should be reserved"""
+        from kb_common import KBConfig
+        from kb_add import EntryIdAllocator
+        from kb_snapshot import export_snapshot, import_snapshot
+
+        write_entry(kb_dir, "KB-2026-01-02-005-a.md", "A", "a")
+        snapshot = tmp_path / "kb.kbsnap"
+        export_snapshot(KBConfig(), snapshot)
+        (kb_dir / "KB-2026-01-02-005-a.md").unlink()
+
+        EntryIdAllocator(KBConfig()).allocate("2026-01-03")  # catch up before the import
+        assert import_snapshot(KBConfig(), snapshot)['created'] == [".agent/knowledge-base/KB-2026-01-02-005-a.md"]
+        assert (kb_dir / ".cache" / "ids" / "2026-01-02" / "5").exists()
+
+    def test_concurrent_writers_never_collide(self, kb_dir):
+        """Independent allocators racing on one day should get distinct IDs"""
+        from concurrent.futures import ThreadPoolExecutor
+        from kb_common import KBConfig
+        from kb_add import EntryIdAllocator
+
+        def worker(_):
+            allocator = EntryIdAllocator(KBConfig(), autosave=False)
+            ids = [allocator.allocate("2026-01-02") for _ in range(25)]
+            allocator.save()
+            return ids
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            ids = [i for batch in pool.map(worker, range(8)) for i in batch]
+
+        assert sorted(ids) == list(range(1, 201))
+
+    def test_add_from_jsonl(self, kb_dir, tmp_path):
+        """Bulk add should create valid entries and skip invalid lines"""
+        import json
+        from kb_common import read_frontmatter
+        from kb_add import add_from_jsonl
+
+        source = tmp_path / "entries.jsonl"
+        source.write_text("\n".join([
+            json.dumps({'title': "Cache Bug", 'category': 'bug', 'priority': 'high',
+                        'date': '2026-01-02', 'tags': ['cache', 'redis']}),
+            json.dumps({'title': "Fast Path", 'category': 'performance', 'date': '2026-01-02',
+                        'tags': 'perf, hot', 'body': "## Solution\n\nMemoize it."}),
+            "{not json",
+            json.dumps({'title': "Bad", 'category': '../escape'}),
+            json.dumps({'category': 'bug'}),
+            json.dumps({'title': "Object body", 'body': {'text': 'x'}}),
+            json.dumps({'title': ["List title"]}),
+            json.dumps({'title': "Numeric tags", 'tags': [1, 2]}),
+        ]), encoding='utf-8')
+
+        with patch('builtins.print') as printed:
+            created = add_from_jsonl(str(source))
+        output = ' '.join(str(call.args[0]) for call in printed.call_args_list if call.args)
+        assert "Line 6: 'body' must be a string or null" in output
+        assert "Line 7: 'title' must be a string" in output
+        assert "Line 8: 'tags' must contain only strings" in output
+
+        assert [p.relative_to(kb_dir).as_posix() for p in created] == [
+            "bugs/high/KB-2026-01-02-001-cache-bug.md",
+            "performance/KB-2026-01-02-002-fast-path.md",
+        ]
+        metadata = read_frontmatter(created[1])
+        assert metadata['tags'] == ['perf', 'hot']
+        assert metadata['priority'] == 'medium'
+        assert "Memoize it." in created[1].read_text(encoding='utf-8')
+
+    def test_jsonl_fields_cannot_break_frontmatter(self):
+        """Line breaks, quotes and bad dates in single-line fields should be rejected"""
+        from kb_add import parse_jsonl_record
+
+        for record in (
+            {'title': 'x"\npriority: critical\n---\nboom'},
+            {'title': "ok", 'tags': ["a]\nevil: 1"]},
+            {'title': "ok", 'time_saved': "1 hour\nevil: 1"},
+            {'title': "ok", 'date': "2026-10-18\n"},
+            {'title': "ok", 'attempts': "3\nevil: 1"},
+        ):
+            with pytest.raises(ValueError):
+                parse_jsonl_record(record, "2026-10-18")
+
+        fields = parse_jsonl_record({'title': "ok", 'tags': "c++, ci/cd", 'attempts': 3}, "2026-10-18")
+        assert fields['tags_list'] == ['c++', 'ci/cd'] and fields['attempts'] == '3'
+
+
+class TestSnapshot:
+    """Tests for kb export / kb import snapshots"""
+
+    def test_round_trip_is_idempotent(self, kb_dir, tmp_path, monkeypatch):
+        """Import should restore identical files, and a second import change nothing"""
+        from kb_common import KBConfig
+        from kb_snapshot import export_snapshot, import_snapshot
+
+        write_entry(kb_dir, "bugs/high/KB-2026-01-02-001-a.md", "Über Cache", "Body ünïcode")
+        write_entry(kb_dir, "KB-2026-01-02-002-b.md", "Beta", "second " * 500)
+        snapshot = tmp_path / "kb.kbsnap"
+        export_snapshot(KBConfig(), snapshot)
+
+        target = tmp_path / "restore"
+        (target / ".agent" / "knowledge-base").mkdir(parents=True)
+        monkeypatch.chdir(target)
+        first = import_snapshot(KBConfig(), snapshot)
+        second = import_snapshot(KBConfig(), snapshot)
+
+        assert sorted(first['created']) == [
+            ".agent/knowledge-base/KB-2026-01-02-002-b.md",
+            ".agent/knowledge-base/bugs/high/KB-2026-01-02-001-a.md",
+        ]
+        assert len(second['unchanged']) == 2 and not second['created']
+        for key in first['created']:
+            restored = target / key
+            original = kb_dir.parent.parent / key
+            assert restored.read_bytes() == original.read_bytes()
+            assert restored.stat().st_mtime_ns == original.stat().st_mtime_ns
+
+    def test_conflicts_kept_unless_overwrite(self, kb_dir, tmp_path):
+        """Locally modified files should be reported, not replaced, by default"""
+        from kb_common import KBConfig
+        from kb_snapshot import export_snapshot, import_snapshot
+
+        entry = write_entry(kb_dir, "KB-2026-01-02-001-a.md", "Alpha", "original")
+        snapshot = tmp_path / "kb.kbsnap"
+        export_snapshot(KBConfig(), snapshot)
+        original = entry.read_bytes()
+        entry.write_text("local edit", encoding='utf-8')
+
+        result = import_snapshot(KBConfig(), snapshot)
+        assert result['conflicts'] == [".agent/knowledge-base/KB-2026-01-02-001-a.md"]
+        assert entry.read_text(encoding='utf-8') == "local edit"
+
+        result = import_snapshot(KBConfig(), snapshot, overwrite=True)
+        assert result['updated'] == [".agent/knowledge-base/KB-2026-01-02-001-a.md"]
+        assert entry.read_bytes() == original
+
+    def test_metadata_reader_matches_cache(self, kb_dir, tmp_path):
+        """Snapshot.entries should list what the manifest cache lists, without bodies"""
+        from kb_common import KBConfig, load_kb_cache
+        from kb_snapshot import Snapshot, export_snapshot
+
+        write_entry(kb_dir, "KB-2026-01-02-001-a.md", "Alpha", "first", tags='a, b')
+        write_entry(kb_dir, "features/KB-2026-01-03-002-b.md", "Beta", "second", category='feature')
+        (kb_dir / "KB-2026-01-04-003-plain.md").write_text("# No frontmatter\n", encoding='utf-8')
+        config = KBConfig()
+        snapshot = tmp_path / "kb.kbsnap"
+        export_snapshot(config, snapshot)
+
+        with patch('kb_snapshot.iter_bodies', side_effect=AssertionError("bodies read")):
+            reader = Snapshot(snapshot, config)
+            assert reader.entries() == load_kb_cache(config).entries()
+            assert [p.name for p, _ in reader.entries(under=kb_dir / "features")] == [
+                "KB-2026-01-03-002-b.md"
+            ]
+
+    def test_rejects_corrupt_and_unsafe_input(self, kb_dir, tmp_path):
+        """Truncated snapshots and paths escaping the project should be refused"""
+        from kb_common import KBConfig
+        from kb_snapshot import export_snapshot, read_snapshot_metadata, is_safe_key
+
+        write_entry(kb_dir, "KB-2026-01-02-001-a.md", "Alpha", "first")
+        snapshot = tmp_path / "kb.kbsnap"
+        export_snapshot(KBConfig(), snapshot)
+        truncated = tmp_path / "truncated.kbsnap"
+        truncated.write_bytes(snapshot.read_bytes()[:-20])
+
+        with pytest.raises(ValueError):
+            read_snapshot_metadata(truncated)
+        assert is_safe_key(".agent/knowledge-base/KB-1.md")
+        assert not is_safe_key("../outside.md")
+        assert not is_safe_key("/etc/passwd")
+
+    def write_snapshot(self, path, files):
+        """A snapshot holding arbitrary keys, as a crafted file could"""
+        import hashlib
+        import json
+        import zlib
+        from kb_snapshot import SNAPSHOT_FOOTER, SNAPSHOT_MAGIC, SNAPSHOT_VERSION
+
+        body = zlib.compress(b''.join(files.values()))
+        metadata = zlib.compress(json.dumps({
+            'version': SNAPSHOT_VERSION, 'count': len(files), 'body_length': len(body),
+            'columns': {'path': list(files), 'size': [len(d) for d in files.values()],
+                        'hash': [hashlib.sha1(d).hexdigest() for d in files.values()],
+                        'mtime': [0] * len(files), 'frontmatter': [False] * len(files)},
+            'metadata': {},
+        }).encode('utf-8'))
+        path.write_bytes(SNAPSHOT_MAGIC + body + metadata
+                         + SNAPSHOT_FOOTER.pack(len(SNAPSHOT_MAGIC) + len(body), len(metadata)))
+
+    def test_import_rejects_keys_outside_kb(self, kb_dir, tmp_path):
+        """Only .md files under the KB or docs/ are written; other keys and symlinked dirs are rejected"""
+        from kb_common import KBConfig
+        from kb_snapshot import import_snapshot
+
+        root = kb_dir.parent.parent
+        outside = tmp_path / "outside"
+        outside.mkdir()
+        (kb_dir / "linked").symlink_to(outside, target_is_directory=True)
+        snapshot = tmp_path / "crafted.kbsnap"
+        self.write_snapshot(snapshot, {
+            "bin/x.py": b"print('pwned')",
+            ".git/hooks/x": b"#!/bin/sh",
+            ".agent/knowledge-base/linked/KB-x.md": b"# Redirected",
+            "docs/guide.md": b"# Guide",
+        })
+
+        result = import_snapshot(KBConfig(), snapshot)
+        assert result['rejected'] == ["bin/x.py", ".git/hooks/x", ".agent/knowledge-base/linked/KB-x.md"]
+        assert result['created'] == ["docs/guide.md"]
+        assert not (root / "bin" / "x.py").exists()
+        assert not (root / ".git" / "hooks" / "x").exists()
+        assert not (outside / "KB-x.md").exists()
+
+
+class TestAggregates:
+    """Tests for the persisted aggregate store"""
+
+    def open_store(self, verify=False):
+        from kb_common import KBConfig, load_kb_cache
+        from kb_aggregates import load_aggregates
+        from kb_stats import stats_facts, STATS_SCHEMA
+
+        config = KBConfig()
+        return load_aggregates(config, load_kb_cache(config), 'aggregates', stats_facts,
+                               STATS_SCHEMA, under=config.get_kb_path(), verify=verify)
+
+    def test_incremental_matches_rebuild(self, kb_dir):
+        """Adding, editing and deleting entries should leave the same tables as a rebuild"""
+        from kb_common import KBConfig, load_kb_cache
+
+        write_entry(kb_dir, "KB-2026-01-02-001-a.md", "Alpha", "a")
+        removed = write_entry(kb_dir, "KB-2026-01-02-002-b.md", "Beta", "b", priority='low')
+        self.open_store()
+
+        write_entry(kb_dir, "KB-2026-01-02-001-a.md", "Alpha", "a", category='feature', date='2026-02-01')
+        write_entry(kb_dir, "KB-2026-01-03-003-c.md", "Gamma", "c")
+        removed.unlink()
+        store = self.open_store()
+
+        assert store.count == 2
+        assert store.table('category') == {'bug': 1, 'feature': 1}
+        assert store.table('priority') == {'high': 2}
+        assert store.table('month') == {'2026-01': 1, '2026-02': 1}
+        assert store.total('attempts') == 4 and store.total('hours') == 6
+        assert store.verify()
+
+        rebuilt = self.open_store()
+        rebuilt.rebuild(load_kb_cache(KBConfig()), under=kb_dir)
+        assert (rebuilt.count, rebuilt.tables, rebuilt.totals) == (store.count, store.tables, store.totals)
+
+    def test_unchanged_run_counts_nothing(self, kb_dir):
+        """A second run should not call the facts function or rewrite the store"""
+        write_entry(kb_dir, "KB-2026-01-02-001-a.md", "Alpha", "a")
+        store = self.open_store()
+        stored = store.path.stat().st_mtime_ns
+
+        with patch('kb_stats.stats_facts', side_effect=AssertionError("recounted")):
+            again = self.open_store()
+        assert again.count == 1
+        assert store.path.stat().st_mtime_ns == stored
+
+    def test_drift_is_rebuilt(self, kb_dir):
+        """Tables that disagree with the stored facts should be detected and rebuilt"""
+        import json
+
+        write_entry(kb_dir, "KB-2026-01-02-001-a.md", "Alpha", "a")
+        write_entry(kb_dir, "KB-2026-01-02-002-b.md", "Beta", "b", category='feature')
+        path = self.open_store().path
+
+        data = json.loads(path.read_text(encoding='utf-8'))
+        data['tables']['category']['bug'] = 5
+        path.write_text(json.dumps(data), encoding='utf-8')
+        # Fails the cheap check on load, so the store is recounted
+        assert self.open_store().table('category') == {'bug': 1, 'feature': 1}
+
+        # Plausible but wrong: only the full recount notices
+        data['tables']['category'] = {'bug': 2}
+        path.write_text(json.dumps(data), encoding='utf-8')
+        assert not self.open_store().verify()
+        assert self.open_store(verify=True).table('category') == {'bug': 1, 'feature': 1}
+
+    def test_sync_visits_only_journaled_keys(self, kb_dir):
+        """After the first run, sync should only look at keys the manifest changed"""
+        from kb_aggregates import AggregateStore
+
+        for number in range(1, 4):
+            write_entry(kb_dir, f"KB-2026-01-02-00{number}-e.md", f"Entry {number}", "x")
+        self.open_store()
+        write_entry(kb_dir, "KB-2026-01-02-002-e.md", "Entry 2", "edited", category='feature')
+
+        sync_key = AggregateStore._sync_key
+        visited = []
+        with patch.object(AggregateStore, '_sync_key',
+                          lambda self, key, *a: visited.append(key) or sync_key(self, key, *a)):
+            store = self.open_store()
+        assert visited == [".agent/knowledge-base/KB-2026-01-02-002-e.md"]
+        assert store.table('category') == {'bug': 2, 'feature': 1}
+
+    def test_newest_follows_mtimes(self, kb_dir):
+        """The recent list should match a full sort after edits, touches and deletes"""
+        import os
+        from kb_common import KBConfig, load_kb_cache
+
+        paths = []
+        for number in range(1, 25):
+            path = write_entry(kb_dir, f"KB-2026-01-02-{number:03d}-e.md", f"Entry {number}", "x")
+            os.utime(path, ns=(number * 10**9, number * 10**9))
+            paths.append(path)
+        newest = self.open_store().newest(3)
+        assert [key.rpartition('/')[2] for key in newest] == [p.name for p in paths[:-4:-1]]
+
+        # Leaves fewer than half of the kept entries, so the list is refilled
+        for path in paths[-14:]:
+            path.unlink()
+        os.utime(paths[0], ns=(100 * 10**9, 100 * 10**9))
+        store = self.open_store()
+
+        cache = load_kb_cache(KBConfig())
+        expected = sorted(cache.files, key=lambda key: -cache.files[key]['mtime'])
+        assert store.newest(5) == expected[:5]
+        assert store.newest(1) == [cache.key(paths[0])]
+
+
+class TestListIndex:
+    """Tests for the sorted, paginated kb list index"""
+
+    def age_dirs(self, kb_dir):
+        """Backdate directory mtimes so they are trusted by the next scan"""
+        import os
+        import time
+
+        old = time.time() - 60
+        for directory in [kb_dir] + [p for p in kb_dir.rglob('*') if p.is_dir()]:
+            os.utime(directory, (old, old))
+
+    def test_cursor_pages_are_stable(self, kb_dir):
+        """A cursor should continue after the last row even when entries are added"""
+        from kb_common import KBConfig
+        from kb_list import load_list_index
+
+        for day in range(1, 6):
+            write_entry(kb_dir, f"KB-2026-01-0{day}-001-e{day}.md", f"Entry {day}", "x",
+                        date=f"2026-01-0{day}")
+        first, cursor = load_list_index(KBConfig()).page('date', size=2)
+        assert [m['title'] for _, m, _ in first] == ["Entry 5", "Entry 4"]
+
+        write_entry(kb_dir, "KB-2026-01-09-001-new.md", "Newest", "x", date="2026-01-09")
+        index = load_list_index(KBConfig())
+        second, cursor = index.page('date', size=2, cursor=cursor)
+        assert [m['title'] for _, m, _ in second] == ["Entry 3", "Entry 2"]
+        last, cursor = index.page('date', size=2, cursor=cursor)
+        assert [m['title'] for _, m, _ in last] == ["Entry 1"] and cursor is None
+        assert [m['title'] for _, m, _ in index.page('date', size=2, page=1)[0]] == ["Newest", "Entry 5"]
+
+    def test_unchanged_tree_stats_only_directories(self, kb_dir):
+        """With no directory changed, listing should not stat any entry file"""
+        from pathlib import Path
+        from kb_common import KBConfig
+        from kb_list import load_list_index
+
+        write_entry(kb_dir, "bugs/KB-2026-01-02-001-a.md", "Alpha", "a")
+        write_entry(kb_dir, "features/KB-2026-01-03-002-b.md", "Beta", "b", category='feature')
+        self.age_dirs(kb_dir)
+        load_list_index(KBConfig())
+
+        stat = Path.stat
+        stated = []
+        with patch.object(Path, 'stat', lambda self, *a, **k: stated.append(self) or stat(self, *a, **k)):
+            index = load_list_index(KBConfig())
+        assert index.count() == 2
+        assert not [p for p in stated if p.suffix == '.md']
+
+        write_entry(kb_dir, "bugs/KB-2026-01-04-003-c.md", "Gamma", "c")
+        (kb_dir / "features" / "KB-2026-01-03-002-b.md").unlink()
+        index = load_list_index(KBConfig())
+        assert [m['title'] for _, m, _ in index.page('name')[0]] == ["Gamma", "Alpha"]
+
+    def test_refresh_picks_up_edits_in_place(self, kb_dir):
+        """Edits that leave directories untouched should appear with refresh"""
+        from kb_common import KBConfig
+        from kb_list import load_list_index
+
+        write_entry(kb_dir, "KB-2026-01-02-001-a.md", "Alpha", "a")
+        self.age_dirs(kb_dir)
+        load_list_index(KBConfig())
+
+        write_entry(kb_dir, "KB-2026-01-02-001-a.md", "Alpha v2", "a")
+        self.age_dirs(kb_dir)
+        index = load_list_index(KBConfig(), refresh=True)
+        assert [m['title'] for _, m, _ in index.page('title')[0]] == ["Alpha v2"]
+
+    def test_edits_in_place_follow_the_manifest(self, kb_dir):
+        """kb recent should see an edit in place once another command refreshed the manifest"""
+        import os
+        import time
+        from kb_common import KBConfig, KBCache
+        from kb_engine import KBEngine
+        from kb_list import load_list_index
+
+        old = time.time() - 120
+        os.utime(write_entry(kb_dir, "KB-2026-01-02-001-a.md", "a", "x"), (old, old))
+        os.utime(write_entry(kb_dir, "KB-2026-01-03-002-b.md", "b", "x"), (old + 10, old + 10))
+        load_list_index(KBConfig())
+        self.age_dirs(kb_dir)
+        manifest = kb_dir / ".cache" / "manifest.json"
+        os.utime(manifest, (old, old))
+        assert [m['title'] for _, m, _ in load_list_index(KBConfig()).page('modified')[0]] == ["b", "a"]
+
+        # Nothing changed: neither the manifest nor any entry is read
+        with patch.object(KBCache, 'load', side_effect=AssertionError("manifest loaded")):
+            assert load_list_index(KBConfig()).count() == 2
+
+        # Rewriting a file leaves its directory's mtime alone
+        write_entry(kb_dir, "KB-2026-01-02-001-a.md", "a v2", "x")
+        assert load_list_index(KBConfig()).page('modified')[0][0][1]['title'] == "b"
+        KBEngine(KBConfig()).cache  # e.g. kb search
+        assert load_list_index(KBConfig()).page('modified')[0][0][1]['title'] == "a v2"
+
+    def test_update_from_delta_matches_sync(self, kb_dir):
+        """Applying manifest deltas should give the same orders as a full sync"""
+        import os
+        import time
+        from kb_common import KBConfig
+        from kb_engine import KBEngine
+        from kb_list import ListIndex
+
+        old = time.time() - 120
+        for i, name in enumerate(("KB-2026-01-02-001-a.md", "KB-2026-01-03-002-b.md", "KB-2026-01-04-003-c.md")):
+            os.utime(write_entry(kb_dir, name, name[18], "x"), (old + i, old + i))
+        engine = KBEngine(KBConfig())
+        index = ListIndex(KBConfig(), name=None)
+        index.sync(engine.cache)
+
+        write_entry(kb_dir, "KB-2026-01-02-001-a.md", "a v2", "x", priority='critical')
+        (kb_dir / "KB-2026-01-03-002-b.md").unlink()
+        write_entry(kb_dir, "bugs/KB-2026-01-05-004-d.md", "d", "x")
+        os.utime(kb_dir / "KB-2026-01-04-003-c.md")  # touched only
+        assert index.update(engine.cache, engine.refresh()) == 4
+
+        fresh = ListIndex(KBConfig(), name=None)
+        fresh.sync(engine.cache)
+        assert index.records == fresh.records and index.orders == fresh.orders
+
+    def test_entry_without_frontmatter_is_listed(self, kb_dir):
+        """Entries without frontmatter should be listed as Unknown, as before the index"""
+        from kb_common import KBConfig
+        from kb_list import load_list_index
+
+        write_entry(kb_dir, "KB-2026-01-02-001-a.md", "Alpha", "a")
+        (kb_dir / "KB-2026-01-03-002-plain.md").write_text("# Plain\n\nNo frontmatter\n", encoding='utf-8')
+        index = load_list_index(KBConfig())
+        assert index.count() == 2
+        rows = index.page('title')[0]
+        assert [m.get('title', 'Unknown') for _, m, _ in rows] == ["Alpha", "Unknown"]
+        assert rows[1][0].name == "KB-2026-01-03-002-plain.md"
+
+
+class FakeDriver:
+    """Stand-in for a neo4j driver"""
+
+    created = []
+    delay = 0
+
+    def __init__(self, uri, auth):
+        self.closed = False
+        FakeDriver.created.append(self)
+
+    def verify_connectivity(self):
+        time.sleep(FakeDriver.delay)
+
+    def close(self):
+        self.closed = True
+
+
+def fake_neo4j_tools():
+    """sync_skills_to_neo4j / query_skills_neo4j modules without neo4j"""
+    import types
+
+    class Query:
+        def __init__(self, database='neo4j', driver=None):
+            self.driver = driver
+
+        def search_skills(self, term):
+            return [{'skill': f"{term} skill"}]
+
+        def get_related_skills(self, skill):
+            return [{'related_skill': 'other'}]
+
+        def search_entries(self, query, limit=20):
+            time.sleep(Query.delay)
+            return [dict(entry) for entry in Query.entries][:limit]
+
+    Query.delay = 0
+    Query.entries = []
+
+    sync_module = types.ModuleType('sync_skills_to_neo4j')
+    sync_module.GraphDatabase = types.SimpleNamespace(driver=FakeDriver)
+    query_module = types.ModuleType('query_skills_neo4j')
+    query_module.Neo4jSkillQuery = Query
+    query_module.print_skills = lambda skills, title: print(title, skills)
+    return {'sync_skills_to_neo4j': sync_module, 'query_skills_neo4j': query_module}
+
+
+class TestCompound:
+    """Tests for in-process kb compound dispatch"""
+
+    @pytest.fixture
+    def neo4j_project(self, kb_project, monkeypatch):
+        tools_dir = kb_project / "tools" / "neo4j"
+        tools_dir.mkdir(parents=True)
+        (tools_dir / "sync_skills_to_neo4j.py").write_text("", encoding='utf-8')
+        for name, value in [('NEO4J_URI', 'bolt://localhost'), ('NEO4J_USERNAME', 'neo4j'),
+                            ('NEO4J_PASSWORD', 'secret')]:
+            monkeypatch.setenv(name, value)
+        FakeDriver.created = []
+        FakeDriver.delay = 0
+        with patch.dict(sys.modules, fake_neo4j_tools()):
+            yield kb_project
+
+    def test_query_shares_one_driver(self, neo4j_project, capsys):
+        """Both query phases should run in-process on one driver, closed at the end"""
+        from kb_compound import compound_operation
+
+        compound_operation('query', 'react', timings=True)
+        out = capsys.readouterr().out
+
+        assert "Search Results for 'react'" in out and "Skills Related to 'react'" in out
+        assert len(FakeDriver.created) == 1 and FakeDriver.created[0].closed
+        assert "Neo4j connect" in out and "2 Neo4j call(s)" in out
+
+    def test_missing_credentials_fall_back_to_files(self, neo4j_project, kb_dir, monkeypatch, capsys):
+        """Without credentials the Neo4j phase is skipped and the file search still runs"""
+        from kb_compound import compound_operation
+
+        monkeypatch.delenv('NEO4J_PASSWORD')
+        write_entry(kb_dir, "KB-2026-01-02-001-a.md", "Hydration", "react hydration")
+        compound_operation('search', 'hydration')
+        out = capsys.readouterr().out
+
+        assert "credentials not found" in out
+        assert "#1 Hydration" in out
+        assert not FakeDriver.created
+
+    def test_merge_keeps_documents_with_the_same_stem(self, tmp_path):
+        """Non-KB documents should be merged by path, KB entries by id"""
+        from kb_compound import merge_results
+
+        def found(rel_path, title):
+            return {'path': tmp_path / rel_path, 'title': title, 'category': 'docs',
+                    'priority': 'low', 'context': []}
+
+        merged = merge_results(
+            [found("docs/a/README.md", "A"), found("docs/b/README.md", "B"),
+             found(".agent/knowledge-base/KB-2026-01-02-001-x.md", "X")],
+            [{'id': 'README', 'title': 'B', 'file_path': str(tmp_path / "docs/b/README.md")},
+             {'id': 'KB-2026-01-02-001-x', 'title': 'X', 'file_path': 'elsewhere/x.md'}],
+            root=tmp_path,
+        )
+        assert {entry['id']: entry['sources'] for entry in merged} == {
+            'docs/a/README.md': ['files'],
+            'docs/b/README.md': ['files', 'graph'],
+            'KB-2026-01-02-001-x': ['files', 'graph'],
+        }
+
+    def test_search_merges_backends(self, neo4j_project, kb_dir, capsys):
+        """An entry found by both backends should be listed once, ranked first"""
+        from kb_compound import compound_operation
+
+        write_entry(kb_dir, "KB-2026-01-02-001-a.md", "Hydration", "react hydration")
+        write_entry(kb_dir, "KB-2026-01-02-002-b.md", "Hydration SSR", "hydration on the server")
+        sys.modules['query_skills_neo4j'].Neo4jSkillQuery.entries = [
+            {'id': 'KB-2026-01-02-001-a', 'title': 'Hydration', 'category': 'bug',
+             'file_path': 'a.md', 'skills': ['React']},
+            {'id': 'KB-2026-01-03-001-graph', 'title': 'Graph only', 'category': 'pattern',
+             'file_path': 'graph.md', 'skills': []},
+        ]
+        compound_operation('search', 'hydration')
+        out = capsys.readouterr().out
+
+        assert "#1 Hydration" in out and "(files + graph, rrf" in out
+        assert "#2 Hydration SSR" in out and "#3 Graph only" in out
+        assert "(graph, rrf" in out and "React" in out
+        assert "3 merged results" in out
+
+    def test_slow_graph_times_out(self, neo4j_project, kb_dir, capsys):
+        """File results should come back at the file backend's pace when Neo4j hangs"""
+        from kb_compound import compound_operation
+
+        write_entry(kb_dir, "KB-2026-01-02-001-a.md", "Hydration", "react hydration")
+        sys.modules['query_skills_neo4j'].Neo4jSkillQuery.delay = 2.0
+        start = time.perf_counter()
+        compound_operation('search', 'hydration', timeouts={'graph': 0.2})
+        elapsed = time.perf_counter() - start
+        out = capsys.readouterr().out
+
+        assert elapsed < 1.5
+        assert "no answer within 0.2s" in out
+        assert "#1 Hydration" in out and "(files, rrf" in out
+
+    def test_late_driver_is_closed(self, neo4j_project, kb_dir, capsys):
+        """A driver a timed-out worker creates after the operation ends should be closed"""
+        import threading
+        from kb_compound import CLOSE_GRACE, compound_operation
+
+        FakeDriver.delay = CLOSE_GRACE + 0.5
+        compound_operation('search', 'hydration', timeouts={'graph': 0.1})
+        assert "no answer within 0.1s" in capsys.readouterr().out
+        for thread in threading.enumerate():
+            if thread.name == 'kb-compound-graph':
+                thread.join(5)
+
+        assert len(FakeDriver.created) == 1 and FakeDriver.created[0].closed
+
+    def test_parse_compound_args(self):
+        """--timings and --timeout may appear anywhere after the action"""
+        from kb_compound import parse_compound_args
+
+        args = parse_compound_args(['Search', 'oauth', '--timeout', '1.5', 'token', '--timings'])
+        assert (args.action, args.terms, args.timeout, args.timings) == \
+            ('search', ['oauth', 'token'], 1.5, True)
+
+    @pytest.mark.skipif(
+        not all(__import__('importlib').util.find_spec(m) for m in ('neo4j', 'dotenv')),
+        reason="needs neo4j and python-dotenv"
+    )
+    def test_shared_driver_left_open(self):
+        """Script classes given a driver should not close it"""
+        sys.path.insert(0, str(LIB_DIR.parent.parent / "tools" / "neo4j"))
+        from query_skills_neo4j import Neo4jSkillQuery
+        from sync_skills_to_neo4j import Neo4jSkillSync
+
+        driver = FakeDriver('bolt://localhost', None)
+        Neo4jSkillQuery(driver=driver).close()
+        Neo4jSkillSync(driver=driver).close()
+        assert not driver.closed
+
+    @pytest.mark.skipif(
+        not all(__import__('importlib').util.find_spec(m) for m in ('neo4j', 'dotenv')),
+        reason="needs neo4j and python-dotenv"
+    )
+    def test_sync_batches_entries(self, kb_dir):
+        """run_sync should write each batch with UNWIND statements in one transaction"""
+        sys.path.insert(0, str(LIB_DIR.parent.parent / "tools" / "neo4j"))
+        from sync_skills_to_neo4j import Neo4jSkillSync, run_sync
+
+        transactions = []
+
+        class Session:
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *exc):
+                return False
+
+            def run(self, query, **params):
+                return MagicMock()
+
+            def execute_write(self, work, *args):
+                tx = MagicMock()
+                transactions.append(tx)
+                return work(tx, *args)
+
+        driver = MagicMock()
+        driver.session.side_effect = lambda **kwargs: Session()
+        for i in range(5):
+            write_entry(kb_dir, f"KB-2026-01-02-00{i}-a.md", f"Entry {i}", "Uses React and #hooks")
+
+        with patch('builtins.print'):
+            assert run_sync(Neo4jSkillSync(driver=driver), kb_dir, kb_dir / "none", batch_size=2) == 5
+
+        # Three entry batches, then the relationship rebuild of a first sync
+        assert len(transactions) == 4
+        rows = [call.kwargs['rows'] for call in transactions[0].run.call_args_list]
+        assert all('UNWIND $rows' in call.args[0] for call in transactions[0].run.call_args_list)
+        assert len(rows[0]) == 2 and rows[0][0]['title'].startswith("Entry")
+        assert {r['tech'] for r in rows[1]} == {'React', 'react'}
+        assert [r['tag'] for r in rows[2]] == ['hooks', 'hooks']
+
+    @pytest.mark.skipif(
+        not all(__import__('importlib').util.find_spec(m) for m in ('neo4j', 'dotenv')),
+        reason="needs neo4j and python-dotenv"
+    )
+    def test_sync_writes_only_delta(self, kb_dir):
+        """A second run_sync should skip unchanged files and delete removed entries"""
+        sys.path.insert(0, str(LIB_DIR.parent.parent / "tools" / "neo4j"))
+        from sync_skills_to_neo4j import (
+            DELETE_ENTRIES_QUERY, ENTRY_ROWS_QUERY, Neo4jSkillSync, run_sync
+        )
+
+        transactions = []
+
+        class Session:
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *exc):
+                return False
+
+            def run(self, query, **params):
+                return MagicMock()
+
+            def execute_write(self, work, *args):
+                tx = MagicMock()
+                transactions.append(tx)
+                return work(tx, *args)
+
+        driver = MagicMock()
+        driver.session.side_effect = lambda **kwargs: Session()
+        for i in range(3):
+            write_entry(kb_dir, f"KB-2026-01-02-00{i}-a.md", f"Entry {i}", "Uses React")
+
+        def sync():
+            transactions.clear()
+            with patch('builtins.print'):
+                return run_sync(Neo4jSkillSync(driver=driver), kb_dir, kb_dir / "none")
+
+        assert sync() == 3
+        assert sync() == 0 and transactions == []
+
+        (kb_dir / "KB-2026-01-02-000-a.md").unlink()
+        write_entry(kb_dir, "KB-2026-01-02-001-a.md", "Entry 1", "Uses Vue now")
+        assert sync() == 1
+        queries = [call.args[0] for tx in transactions for call in tx.run.call_args_list]
+        deleted = [call.kwargs['ids'] for tx in transactions for call in tx.run.call_args_list
+                   if call.args[0] == DELETE_ENTRIES_QUERY]
+        assert deleted == [['KB-2026-01-02-000-a']]
+        assert queries.count(ENTRY_ROWS_QUERY) == 1
+
+    @pytest.mark.skipif(
+        not all(__import__('importlib').util.find_spec(m) for m in ('neo4j', 'dotenv')),
+        reason="needs neo4j and python-dotenv"
+    )
+    def test_relationship_rows_are_absolute(self):
+        """Strengths count shared entries; pairs left without one are stale"""
+        sys.path.insert(0, str(LIB_DIR.parent.parent / "tools" / "neo4j"))
+        from sync_skills_to_neo4j import relationship_rows
+
+        postings = ({'hooks': {'a', 'b'}, 'memo': {'a', 'b', 'c'}, 'css': {'c'}},
+                    {'React': {'a', 'b'}})
+        links = [(['hooks', 'memo'], ['React']), (['css', 'hooks'], [])]
+        rows = relationship_rows(postings, links)
+
+        assert rows['related'] == [{'source': 'hooks', 'target': 'memo', 'strength': 2}]
+        assert rows['stale_related'] == [{'source': 'css', 'target': 'hooks', 'strength': 0}]
+        assert [(r['target'], r['strength']) for r in rows['required']] == [('hooks', 2), ('memo', 2)]
+        assert rows == relationship_rows(postings, links + links)
+
+    @pytest.mark.skipif(
+        not all(__import__('importlib').util.find_spec(m) for m in ('neo4j', 'dotenv')),
+        reason="needs neo4j and python-dotenv"
+    )
+    def test_parallel_parse_feeds_one_writer(self, kb_dir):
+        """Entries parsed by a process pool reach the writer thread once each, in order"""
+        sys.path.insert(0, str(LIB_DIR.parent.parent / "tools" / "neo4j"))
+        from sync_skills_to_neo4j import BatchWriter, Neo4jSkillSync, run_sync
+
+        batches = []
+        sync = Neo4jSkillSync(driver=MagicMock())
+        sync.sync_kb_entries = lambda batch: batches.append([entry['id'] for entry in batch])
+        for i in range(40):
+            write_entry(kb_dir, f"KB-2026-01-02-{i:03d}-a.md", f"Entry {i}", "Uses React")
+
+        with patch('builtins.print'):
+            assert run_sync(sync, kb_dir, kb_dir / "none", batch_size=16, jobs=2) == 40
+
+        assert [len(batch) for batch in batches] == [16, 16, 8]
+        assert sorted(sum(batches, [])) == sorted(p.stem for p in kb_dir.glob("KB-*.md"))
+
+        def fail(batch):
+            raise RuntimeError("write failed")
+        sync.sync_kb_entries = fail
+        writer = BatchWriter(sync, total=2)
+        writer.put([{'id': 'a'}])
+        with pytest.raises(RuntimeError):
+            writer.close()
+
+
+class TestEngine:
+    """Tests for the shared KB engine"""
+
+    def test_corpora_are_separate(self, kb_dir):
+        """'entries' covers KB-*.md, 'documents' every KB markdown file but INDEX/README"""
+        from kb_common import KBConfig
+        from kb_engine import KBEngine
+
+        write_entry(kb_dir, "KB-2026-01-02-001-a.md", "Entry", "body")
+        write_entry(kb_dir, "guides/setup.md", "Guide", "body")
+        (kb_dir / "README.md").write_text("# Readme\n", encoding='utf-8')
+
+        names = lambda corpus: sorted(p.name for p, _ in KBEngine(KBConfig(), corpus).entries())
+        assert names('entries') == ["KB-2026-01-02-001-a.md"]
+        assert names('documents') == ["KB-2026-01-02-001-a.md", "setup.md"]
+        with pytest.raises(ValueError):
+            KBEngine(KBConfig(), 'nope')
+
+    def test_find_reads_only_candidates(self, kb_dir):
+        """find() should match fields from the manifest and read only index candidates"""
+        from kb_common import KBConfig
+        from kb_engine import KBEngine
+
+        write_entry(kb_dir, "bugs/a.md", "OAuth refresh", "token expiry")
+        write_entry(kb_dir, "bugs/b.md", "Hydration", "oauth callback mismatch", priority='low')
+        write_entry(kb_dir, "bugs/c.md", "Unrelated", "nothing here")
+        engine = KBEngine(KBConfig(), 'documents')
+        engine.index
+
+        read = []
+        original = Path.read_text
+        with patch.object(Path, 'read_text', lambda self, *a, **k: read.append(self.name) or original(self, *a, **k)):
+            found = [(p.name, body) for p, _, body in engine.find("OAuth")]
+        assert [name for name, _ in found] == ["a.md", "b.md"]
+        assert found[1][1].endswith("oauth callback mismatch")
+        assert "c.md" not in read
+
+        assert [p.name for p, _, _ in engine.find("oauth", {'priority': 'low'})] == ["b.md"]
+
+    def test_heading_cached(self, kb_dir):
+        """The manifest should keep each file's first heading"""
+        from kb_common import KBConfig
+        from kb_engine import KBEngine
+
+        path = write_entry(kb_dir, "KB-2026-01-02-001-a.md", "Entry", "body")
+        assert KBEngine(KBConfig()).heading(path) == "Entry"
+
+
+class TestFuzzySearch:
+    """Tests for the trigram index and typo-tolerant search"""
+
+    def test_levenshtein_bounded(self):
+        """Distances above the limit should be reported as limit + 1"""
+        from kb_fuzzy import levenshtein, max_edits
+
+        assert levenshtein("authentcation", "authentication", 2) == 1
+        assert levenshtein("kitten", "sitting", 3) == 3
+        assert levenshtein("kitten", "sitting", 1) == 2
+        assert [max_edits(t) for t in ("js", "oauth", "hydration")] == [0, 1, 2]
+
+    def test_substring_lookup_matches_vocabulary_scan(self, kb_dir):
+        """Trigram-served substring lookups should equal a scan of every token"""
+        from kb_common import KBConfig
+        from kb_search_index import SearchIndex
+
+        first = write_entry(kb_dir, "KB-2026-01-02-001-a.md", "Auth", "authentication reauthorize oauth")
+        second = write_entry(kb_dir, "KB-2026-01-02-002-b.md", "Hydration", "dehydrated hydration mismatch")
+        index = SearchIndex(KBConfig())
+        index.sync([first, second])
+
+        for query, position in [("auth", 'only'), ("hydrat", 'only'), ("au", 'only'),
+                                ("auth", 'last'), ("ation", 'first'), ("ydr", 'first')]:
+            expected = {
+                'only': lambda t: query in t,
+                'last': lambda t: t.startswith(query),
+                'first': lambda t: t.endswith(query),
+            }[position]
+            assert sorted(index._matching_tokens(query, position)) == \
+                sorted(t for t in index.postings if expected(t))
+
+    def test_trigrams_follow_vocabulary(self, kb_dir):
+        """Removing a file should drop its tokens from the trigram index"""
+        from kb_common import KBConfig
+        from kb_search_index import SearchIndex, token_trigrams
+
+        first = write_entry(kb_dir, "KB-2026-01-02-001-a.md", "First", "zebracorn")
+        second = write_entry(kb_dir, "KB-2026-01-02-002-b.md", "Second", "alpha")
+        SearchIndex(KBConfig()).sync([first, second])
+        index = SearchIndex(KBConfig())
+        assert "zebracorn" in index.trigrams["^ze"]
+
+        first.unlink()
+        index.sync([second])
+        rebuilt = {}
+        for token in index.postings:
+            for gram in token_trigrams(token):
+                rebuilt.setdefault(gram, set()).add(token)
+        assert {gram: set(tokens) for gram, tokens in index.trigrams.items()} == rebuilt
+
+    def test_fuzzy_search_finds_misspelled_terms(self, kb_dir, capsys):
+        """search_kb(fuzzy=True) should rank entries matching a typo and suggest the spelling"""
+        from kb_search import search_kb
+
+        write_entry(kb_dir, "bugs/KB-2026-01-02-001-a.md", "OAuth authentication loop",
+                    "The authentication callback loops.")
+        write_entry(kb_dir, "bugs/KB-2026-01-02-002-b.md", "Hydration", "Server mismatch.")
+
+        search_kb("authentcation", fuzzy=True)
+        out = capsys.readouterr().out
+        assert "authentcation → authentication" in out
+        assert "OAuth authentication loop" in out
+        assert "Hydration" not in out
+
+        search_kb("authentcation")
+        assert "kb search --fuzzy" in capsys.readouterr().out
+
+
+class TestSemanticSearch:
+    """Tests for the local vector index (kb search --semantic)"""
+
+    def write_topics(self, kb_dir):
+        write_entry(kb_dir, "bugs/KB-2026-01-02-001-a.md", "OAuth redirect loop",
+                    "# OAuth\nLogin keeps redirecting to the callback.\n\n## Fix\nClear the session cookie.")
+        write_entry(kb_dir, "bugs/KB-2026-01-02-002-b.md", "Hydration mismatch",
+                    "# Hydration\nServer rendered markup differs from the client.")
+        write_entry(kb_dir, "bugs/KB-2026-01-02-003-c.md", "Slow build",
+                    "# Build\nWebpack takes minutes; enable the persistent cache.")
+
+    def test_chunk_markdown_splits_at_headers(self):
+        """Sections should split at '#' and '##' headers, dropping short ones"""
+        from kb_common import chunk_markdown
+
+        content = "intro\n# One\nfirst section\n## Two\nsecond\n### Three\nnested\n"
+        assert chunk_markdown(content, min_length=0) == [
+            ("", "intro\n"), ("# One", "\nfirst section\n"), ("## Two", "\nsecond\n### Three\nnested\n")]
+        assert [h for h, _ in chunk_markdown(content, min_length=10)] == ["# One", "## Two"]
+
+    def test_semantic_search_ranks_similar_section(self, kb_dir):
+        """The entry whose section shares the query's terms should rank first"""
+        from kb_common import KBConfig
+        from kb_engine import KBEngine
+
+        self.write_topics(kb_dir)
+        results = list(KBEngine(KBConfig()).semantic("login redirecting callback", top_k=2))
+        assert results[0]['title'] == "OAuth redirect loop"
+        assert results[0]['context'][0] == "OAuth"
+        assert all(r['title'] != "Slow build" for r in results)
+
+    def test_sync_embeds_only_changed_files(self, kb_dir):
+        """Re-syncing should re-embed changed files and keep document frequencies exact"""
+        from kb_common import KBConfig
+        from kb_engine import KBEngine
+        from kb_vector import VectorIndex
+
+        self.write_topics(kb_dir)
+        assert len(KBEngine(KBConfig()).vectors) == 4
+
+        write_entry(kb_dir, "bugs/KB-2026-01-02-003-c.md", "Slow build", "# Build\nVite is faster.")
+        (kb_dir / "bugs" / "KB-2026-01-02-002-b.md").unlink()
+        engine = KBEngine(KBConfig())
+        vectors = engine.vectors
+        assert [p.name for p in engine.embedded] == ["KB-2026-01-02-003-c.md"]
+
+        fresh = VectorIndex(KBConfig(), name="fresh")
+        fresh.sync(engine.paths())
+        assert vectors.df == fresh.df
+        assert vectors.chunks == fresh.chunks
+
+    def test_ivf_matches_exact_scan(self, kb_dir, monkeypatch):
+        """IVF probing every list, and the no-NumPy scan, should match exact scores"""
+        pytest.importorskip("numpy")
+        import kb_vector
+        from kb_common import KBConfig
+        from kb_engine import KBEngine
+
+        self.write_topics(kb_dir)
+        for i in range(12):
+            write_entry(kb_dir, f"bugs/KB-2026-01-03-{i:03d}-x.md", f"Note {i}",
+                        f"# Note\ncache session build markup {' '.join(['token'] * i)} item{i}")
+        monkeypatch.setattr(kb_vector, 'IVF_MIN_CHUNKS', 4)
+        vectors = KBEngine(KBConfig()).vectors
+
+        query = "session cache build"
+        probed = vectors.search(query, k=5, nprobe=len(vectors))
+        assert vectors._dense[3] is not None
+        assert vectors.lists_path.exists()
+
+        monkeypatch.setattr(kb_vector, 'np', None)
+        exact = vectors.search(query, k=5)
+        assert [key for _, key, _ in probed] == [key for _, key, _ in exact]
+        assert [round(s, 5) for s, _, _ in probed] == [round(s, 5) for s, _, _ in exact]
+
+
+
+class TestExtract:
+    """Tests for the single-pass technology/skill/tag extractor"""
+
+    def test_trie_pattern_prefers_longer_words(self):
+        """Shared prefixes share a branch; the longest word ending on a boundary wins"""
+        import re
+        from kb_extract import trie_pattern
+
+        pattern = trie_pattern(['Git', 'GitHub', 'GitLab', 'Java', 'JavaScript'])
+        assert pattern == '(?:git(?:hub|lab)?|java(?:script)?)'
+        found = re.findall(rf'\b({pattern})\b', "GitHub, git and JavaScript, not Gitter", re.I)
+        assert found == ['GitHub', 'git', 'JavaScript']
+
+    def test_extract_finds_nested_items_in_one_pass(self):
+        """Technologies and tags inside headers, bullets and tags are still found"""
+        from kb_extract import extract
+
+        content = ("# Title\n\n### 1. Caching with Redis\n"
+                   "- **Use Node.js workers**: with #react-hooks\n"
+                   "#neo4j graph in JavaScript, see api/REST\n## Problem\n")
+        found = extract(content)
+
+        assert set(found['technologies']) == {'Redis', 'Node.js', 'react', 'neo4j', 'JavaScript',
+                                              'api', 'REST'}
+        assert sorted(found['tags']) == ['neo4j', 'react-hooks']
+        assert found['skills'] == [
+            {'name': 'Caching with Redis', 'level': 'intermediate', 'source': 'header'},
+            {'name': 'Use Node.js workers', 'level': 'beginner', 'source': 'bullet'},
+        ]
+
+
+# Import-time budgets (ms) for `python -X importtime bin/kb_cli.py ...`:
+# the summed cumulative time of top-level imports, best of IMPORT_RUNS
+IMPORT_BUDGET_MS = {'help': 25, 'search': 60}
+IMPORT_RUNS = 3
+
+# Modules only other subcommands need
+NOT_FOR_SEARCH = {'kb_add', 'kb_index', 'kb_stats', 'kb_list', 'kb_compound',
+                  'kb_snapshot', 'kb_aggregates'}
+
+
+def import_times(argv, cwd):
+    """Run kb_cli.py under -X importtime; returns ({module: cumulative us}, top-level total us)"""
+    import os
+    import re
+    import subprocess
+
+    env = dict(os.environ, KB_NO_DAEMON='1')
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', str(LIB_DIR.parent / "kb_cli.py")] + argv,
+        cwd=str(cwd), env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+        encoding='utf-8'
+    )
+    modules, total = {}, 0
+    for line in result.stderr.splitlines():
+        match = re.match(r'import time:\s+\d+ \|\s+(\d+) \| (\s*)(\S+)', line)
+        if match:
+            modules[match.group(3)] = int(match.group(1))
+            if not match.group(2):
+                total += int(match.group(1))
+    return modules, total
+
+
+class TestStartup:
+    """Tests for lazy subcommand imports in kb_cli.py"""
+
+    def test_help_loads_no_kb_modules(self, kb_project):
+        """kb help should not import any KB library module"""
+        modules, _ = import_times(['help'], kb_project)
+        assert not [name for name in modules if name.startswith('kb_')]
+
+    def test_search_loads_only_search_modules(self, kb_dir):
+        """kb search should not import the other subcommands' modules"""
+        write_entry(kb_dir, "KB-2026-01-02-001-a.md", "Hydration", "react hydration")
+        modules, _ = import_times(['search', 'hydration'], kb_dir.parent.parent)
+        assert 'kb_search' in modules
+        assert not NOT_FOR_SEARCH & set(modules)
+
+    @pytest.mark.parametrize('command', sorted(IMPORT_BUDGET_MS))
+    def test_import_time_budget(self, kb_project, command):
+        """Startup imports should stay within budget"""
+        argv = [command] + (['hydration'] if command == 'search' else [])
+        best = min(import_times(argv, kb_project)[1] for _ in range(IMPORT_RUNS))
+        assert best / 1000 < IMPORT_BUDGET_MS[command], \
+            f"kb {command} spent {best / 1000:.1f} ms importing (budget {IMPORT_BUDGET_MS[command]} ms)"
+
+
+@pytest.mark.skipif(not hasattr(__import__('socket'), 'AF_UNIX'), reason="needs Unix domain sockets")
+class TestDaemon:
+    """Tests for the kb serve daemon"""
+
+    @pytest.fixture
+    def daemon(self, kb_dir):
+        """A daemon serving kb_project on a background thread"""
+        import threading
+        from kb_common import KBConfig
+        from kb_daemon import KBDaemonServer, WarmState, get_socket_path
+
+        config = KBConfig()
+        socket_path = get_socket_path(config)
+        socket_path.parent.mkdir(parents=True, exist_ok=True)
+        server = KBDaemonServer(socket_path, WarmState(config))
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        yield server
+        server.shutdown()
+        server.server_close()
+        socket_path.unlink()
+
+    def test_forward_without_daemon_runs_locally(self, kb_dir, capsys):
+        """forward() should return False and print nothing when no daemon runs"""
+        from kb_daemon import forward
+
+        assert forward(['search', 'hydration']) is False
+        assert capsys.readouterr().out == ""
+
+    def test_daemon_output_matches_in_process(self, kb_dir, daemon, capsys):
+        """Search and list through the daemon should print what they print locally"""
+        from kb_daemon import forward
+        from kb_search import search_kb
+        from kb_list import list_entries
+
+        write_entry(kb_dir, "KB-2026-01-02-001-a.md", "Hydration", "React hydration mismatch")
+
+        for argv, local in (
+            (['search', 'hydration'], lambda: search_kb("hydration")),
+            (['list'], lambda: list_entries()),
+        ):
+            local()
+            expected = capsys.readouterr().out
+            assert forward(argv) is True
+            assert capsys.readouterr().out == expected
+
+    def test_daemon_sees_new_entries(self, kb_dir, daemon, capsys):
+        """A request should pick up an entry added since the last poll"""
+        import json
+        from kb_daemon import forward
+
+        forward(['search', '--json-lines', 'oauth'])
+        assert capsys.readouterr().out == ""
+
+        write_entry(kb_dir, "KB-2026-01-02-002-b.md", "OAuth", "oauth token refresh")
+        forward(['search', '--json-lines', 'oauth'])
+        record = json.loads(capsys.readouterr().out)
+        assert record['title'] == "OAuth"
+
+    def test_unchanged_directories_skip_refresh(self, kb_dir, daemon, capsys):
+        """With no KB directory changed, a request should not walk the corpus"""
+        import os
+        import time
+        from kb_daemon import forward
+
+        old = time.time() - 60
+        for top in daemon.state.config.get_all_kb_paths():
+            for directory in [top] + [p for p in top.rglob('*') if p.is_dir()]:
+                os.utime(directory, (old, old))
+        daemon.state.refresh()
+
+        with patch.object(daemon.state.engine, 'refresh', side_effect=AssertionError("refreshed")):
+            assert forward(['list']) is True
+        assert "refreshed" not in capsys.readouterr().out
+
+    def test_status_and_stop(self, kb_dir, daemon):
+        """daemon_status should report the pid; stop_daemon should shut it down"""
+        import os
+        from kb_common import KBConfig
+        from kb_daemon import daemon_status, stop_daemon
+
+        assert daemon_status(KBConfig()) == os.getpid()
+        assert stop_daemon() is True
+
+    def test_argument_errors_reach_client(self, kb_dir, daemon, capsys):
+        """argparse errors in the daemon should print on the client's stderr and exit 2"""
+        from kb_daemon import forward
+
+        with pytest.raises(SystemExit) as exc:
+            forward(['search', '--no-such-flag', 'x'])
+        assert exc.value.code == 2
+        captured = capsys.readouterr()
+        assert "--no-such-flag" in captured.err and captured.out == ""
+
+    def test_client_hangup_is_dropped(self, kb_dir, daemon):
+        """A client closing mid-reply should not raise in the handler"""
+        import io
+        import json
+        from kb_daemon import PROTOCOL_VERSION, _Handler
+
+        class HungUp(io.RawIOBase):
+            def writable(self):
+                return True
+
+            def write(self, data):
+                raise BrokenPipeError(32, "Broken pipe")
+
+        handler = _Handler.__new__(_Handler)
+        handler.server = daemon
+        handler.rfile = io.BytesIO((json.dumps({
+            'version': PROTOCOL_VERSION, 'root': str(daemon.state.config.root_dir),
+            'argv': ['list'],
+        }) + '\n').encode('utf-8'))
+        handler.wfile = HungUp()
+        handler.handle()
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -53,6 +53,34 @@ class TestKBStats:
             pytest.fail(f"Failed to import stats module: {e}")
 
 
+class TestKBFrontmatter:
+    """Tests for kb_manager frontmatter parsing"""
+    
+    def test_plain_frontmatter_skips_yaml(self):
+        """Plain key: value blocks should not go through yaml.safe_load"""
+        from utils.kb_manager import parse_yaml_frontmatter
+        
+        content = "---\ntitle: Fix hydration\ncategory: bug\n---\n\nBody\n"
+        with patch('yaml.safe_load', side_effect=AssertionError("yaml used")):
+            frontmatter, body = parse_yaml_frontmatter(content)
+        assert frontmatter == {'title': 'Fix hydration', 'category': 'bug'}
+        assert body == "Body"
+    
+    def test_typed_values_keep_yaml_types(self):
+        """Numbers, dates, booleans and lists should load as YAML types"""
+        import datetime
+        from utils.kb_manager import parse_yaml_frontmatter
+        
+        content = ("---\ntitle: Fix hydration\nattempts: 3\ndate: 2026-01-02\n"
+                   "tags: [react, ssr]\nverified: true\n---\nBody\n")
+        frontmatter, body = parse_yaml_frontmatter(content)
+        assert frontmatter == {
+            'title': 'Fix hydration', 'attempts': 3, 'date': datetime.date(2026, 1, 2),
+            'tags': ['react', 'ssr'], 'verified': True,
+        }
+        assert body == "Body"
+
+
 class TestKBUpdateIndex:
     """Tests for KB index update functionality"""
     
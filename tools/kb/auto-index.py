@@ -9,6 +9,10 @@ Usage:
     python tools/kb/auto-index.py           # Regenerate INDEX.md
     python tools/kb/auto-index.py --verify  # Verify without overwriting
     python tools/kb/auto-index.py --dry-run # Show what would be generated
+    python tools/kb/auto-index.py --jobs 8  # Parallel scan (0 = one per CPU)
+    python tools/kb/auto-index.py --watch   # Keep INDEX.md current as entries change
+
+INDEX.md is only rewritten when its content (apart from the date) changes.
 """
 
 import os
@@ -29,6 +33,12 @@ if sys.platform == 'win32':
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+# Add KB library (bin/lib) to path for the KB engine and shared helpers
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / 'bin' / 'lib'))
+
+from kb_common import KBConfig, watch_files, write_text_if_changed, LAST_UPDATED_PATTERN
+from kb_engine import KBEngine
+
 try:
     from utils.common import print_success, print_error, print_warning, print_info, print_header, get_project_root
 except ImportError:
@@ -41,33 +51,6 @@ except ImportError:
     def get_project_root(): return Path.cwd()
 
 
-def parse_yaml_frontmatter(content):
-    """Extract YAML frontmatter from markdown content."""
-    pattern = r'^---\s*\n(.*?)\n---\s*\n'
-    match = re.match(pattern, content, re.DOTALL)
-    
-    if not match:
-        return {}
-    
-    yaml_content = match.group(1)
-    metadata = {}
-    
-    # Simple YAML parsing (key: value pairs)
-    for line in yaml_content.split('\n'):
-        if ':' in line:
-            key, _, value = line.partition(':')
-            key = key.strip()
-            value = value.strip().strip('"').strip("'")
-            
-            # Handle arrays like [tag1, tag2]
-            if value.startswith('[') and value.endswith(']'):
-                value = [v.strip().strip('"').strip("'") for v in value[1:-1].split(',')]
-            
-            metadata[key] = value
-    
-    return metadata
-
-
 def get_priority_emoji(priority):
     """Get emoji for priority level."""
     priority_map = {
@@ -92,11 +75,11 @@ def get_category_emoji(category):
     return category_map.get(category.lower() if category else 'feature', '📄')
 
 
-def scan_knowledge_base(kb_path):
-    """Scan knowledge base and extract all entries."""
-    entries = []
+def list_entry_files(kb_path):
+    """List KB entry files, skipping INDEX.md, README.md and guides."""
+    md_files = []
     
-    for md_file in kb_path.rglob('*.md'):
+    for md_file in sorted(kb_path.rglob('*.md')):
         # Skip INDEX.md, README.md, and guide files
         if md_file.name.upper() in ['INDEX.MD', 'README.MD']:
             continue
@@ -104,22 +87,39 @@ def scan_knowledge_base(kb_path):
             continue
         if md_file.name.startswith('.'):
             continue
-            
-        try:
-            content = md_file.read_text(encoding='utf-8')
-        except Exception as e:
-            print_warning(f"Could not read {md_file.name}: {e}")
+        md_files.append(md_file)
+    
+    return md_files
+
+
+def scan_knowledge_base(kb_path, jobs=1, md_files=None):
+    """Scan knowledge base and extract all entries.
+    
+    Frontmatter and leading heading come from the KB engine's manifest:
+    only files changed since the last run have their head read (on a
+    thread pool, parsed on a process pool when jobs > 1). Pass md_files
+    to extract only those files.
+    """
+    entries = []
+    if md_files is None:
+        md_files = list_entry_files(kb_path)
+    
+    engine = KBEngine(KBConfig(kb_path.parent.parent), corpus='documents', jobs=jobs)
+    
+    for md_file in md_files:
+        record = engine.cache.get(md_file)
+        if record is None or record['metadata'] is None:
+            print_warning(f"Could not read {md_file.name}")
             continue
         
-        metadata = parse_yaml_frontmatter(content)
+        metadata = dict(record['metadata'])
         
         # Extract title from frontmatter or filename
         title = metadata.get('title', '')
         if not title:
-            # Try to extract from first heading
-            heading_match = re.search(r'^#\s+(.+)$', content, re.MULTILINE)
-            if heading_match:
-                title = heading_match.group(1).strip()
+            # Fall back to first heading
+            if record.get('heading'):
+                title = record['heading']
             else:
                 title = md_file.stem.replace('-', ' ').title()
         
@@ -300,6 +300,28 @@ def generate_index_content(entries):
     return '\n'.join(lines)
 
 
+def watch_knowledge_base(kb_path, entries, jobs=1, interval=1.0):
+    """Regenerate INDEX.md as entries change, re-scanning only changed files."""
+    index_path = kb_path / 'INDEX.md'
+    by_path = {entry['full_path']: entry for entry in entries}
+    
+    def on_change(delta):
+        for path in delta['removed']:
+            by_path.pop(path, None)
+        for entry in scan_knowledge_base(kb_path, jobs=jobs, md_files=delta['changed']):
+            by_path[entry['full_path']] = entry
+        
+        current = [by_path[path] for path in sorted(by_path)]
+        if write_text_if_changed(index_path, generate_index_content(current), ignore=LAST_UPDATED_PATTERN):
+            print_success(f"INDEX.md updated with {len(current)} entries")
+    
+    print_info(f"Watching {kb_path} (polling every {interval:g}s, Ctrl+C to stop)")
+    try:
+        watch_files(lambda: list_entry_files(kb_path), on_change, interval=interval)
+    except KeyboardInterrupt:
+        print_info("Stopped watching")
+
+
 def main():
     """Main entry point."""
     import argparse
@@ -307,6 +329,12 @@ def main():
     parser = argparse.ArgumentParser(description='Auto-generate Knowledge Base INDEX.md')
     parser.add_argument('--verify', action='store_true', help='Verify only, do not overwrite')
     parser.add_argument('--dry-run', action='store_true', help='Show what would be generated')
+    parser.add_argument('-j', '--jobs', type=int, default=1,
+                        help='Parallel scan workers (0 = one per CPU)')
+    parser.add_argument('--watch', action='store_true',
+                        help='Keep running and regenerate INDEX.md when entries change')
+    parser.add_argument('--interval', type=float, default=1.0,
+                        help='Seconds between filesystem polls in --watch mode')
     args = parser.parse_args()
     
     print_header("Knowledge Base Auto-Index Generator")
@@ -322,7 +350,7 @@ def main():
     print_info(f"Scanning: {kb_path}")
     
     # Scan entries
-    entries = scan_knowledge_base(kb_path)
+    entries = scan_knowledge_base(kb_path, jobs=args.jobs)
     print_success(f"Found {len(entries)} KB entries")
     
     # Group by category for stats
@@ -364,9 +392,14 @@ def main():
             print_error("INDEX.md does not exist")
             return 1
     
-    # Write new INDEX.md
-    index_path.write_text(content, encoding='utf-8')
-    print_success(f"INDEX.md updated with {len(entries)} entries")
+    # Write new INDEX.md (unless only the date would change)
+    if write_text_if_changed(index_path, content, ignore=LAST_UPDATED_PATTERN):
+        print_success(f"INDEX.md updated with {len(entries)} entries")
+    else:
+        print_info(f"INDEX.md already up to date ({len(entries)} entries)")
+    
+    if args.watch:
+        watch_knowledge_base(kb_path, entries, jobs=args.jobs, interval=args.interval)
     
     return 0
 
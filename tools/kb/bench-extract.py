@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Technology/Skill Extractor Microbenchmark
+
+Compares the legacy extraction in sync_skills_to_neo4j.py (three technology
+regexes, then header, bullet and tag regexes: six passes per document) with
+the single-pass extractor in bin/lib/kb_extract.py, reporting the cost per
+document.
+
+Usage:
+    python tools/kb/bench-extract.py                  # docs/ corpus
+    python tools/kb/bench-extract.py --synthetic 200  # Add 200 large files
+    python tools/kb/bench-extract.py --repeat 10      # Best of 10 runs
+"""
+
+import re
+import sys
+import time
+from pathlib import Path
+
+# Fix Windows console encoding
+if sys.platform == 'win32':
+    try:
+        sys.stdout.reconfigure(encoding='utf-8', errors='replace')
+        sys.stderr.reconfigure(encoding='utf-8', errors='replace')
+    except (AttributeError, OSError):
+        pass
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+# Add KB library (bin/lib) to path for the shared extractor
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / 'bin' / 'lib'))
+
+from kb_extract import extract
+
+try:
+    from utils.common import print_info, print_header, get_project_root
+except ImportError:
+    def print_info(msg): print(f"[INFO] {msg}")
+    def print_header(msg): print(f"\n{'='*60}\n{msg}\n{'='*60}")
+    def get_project_root(): return Path.cwd()
+
+
+LEGACY_TECH_PATTERNS = [
+    r'\b(Neo4j|Cypher|AuraDB|Figma|Adobe XD|Sketch|Framer|React|Vue|Angular|Python|JavaScript|TypeScript|Java|Node\.js|HTML|CSS)\b',
+    r'\b(GraphQL|REST|API|SQL|NoSQL|MongoDB|PostgreSQL|Redis|Docker|Kubernetes|AWS|Azure|GCP)\b',
+    r'\b(Git|GitHub|GitLab|CI/CD|Jenkins|Webpack|Vite|Next\.js|Astro|Tailwind|Bootstrap)\b',
+]
+
+
+def legacy_extract(content):
+    """Reference: the per-pattern extraction sync_skills_to_neo4j.py used before kb_extract"""
+    technologies = set()
+    for pattern in LEGACY_TECH_PATTERNS:
+        technologies.update(re.findall(pattern, content, re.IGNORECASE))
+
+    skills = []
+    for skill in re.findall(r'###?\s+\d+\.?\d*\.?\s*(.+)', content)[:20]:
+        clean_skill = re.sub(r'[#*`]', '', skill).strip()
+        if len(clean_skill) > 5 and len(clean_skill) < 100:
+            skills.append({'name': clean_skill, 'level': 'intermediate', 'source': 'header'})
+    for skill in re.findall(r'[-*]\s+\*\*(.+?)\*\*', content)[:15]:
+        clean_skill = re.sub(r'[:#]', '', skill).strip()
+        if len(clean_skill) > 5 and len(clean_skill) < 100:
+            skills.append({'name': clean_skill, 'level': 'beginner', 'source': 'bullet'})
+
+    return {
+        'technologies': list(technologies),
+        'skills': skills,
+        'tags': list(set(re.findall(r'#([\w-]+)', content))),
+    }
+
+
+def normalized(found):
+    """Extraction result with its unordered lists sorted, for comparison"""
+    return (sorted(found['technologies']), found['skills'], sorted(found['tags']))
+
+
+def synthetic_documents(count, sections=40):
+    """Large entries dense in headers, bullets, tags and technology names"""
+    section = ("### {n}. Caching GraphQL responses with Redis\n\n"
+               "- **Invalidate on mutation**: keep the #cache-key stable across Node.js workers\n"
+               "- **Measure first**: profile the PostgreSQL query plan before adding Docker layers\n\n"
+               + "Prose about deployment on Kubernetes, AWS and CI/CD pipelines. " * 20 + "\n\n")
+    return [f"# Synthetic {i}\n\n#bench #synthetic\n\n"
+            + "".join(section.format(n=n + 1) for n in range(sections))
+            for i in range(count)]
+
+
+def best_of(repeat, func, contents):
+    """Best wall time of `repeat` runs of func over all contents"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for content in contents:
+            func(content)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    """Main entry point."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Benchmark technology/skill extractors')
+    parser.add_argument('--synthetic', type=int, default=0,
+                        help='Add N synthetic documents with many sections')
+    parser.add_argument('--repeat', type=int, default=5, help='Runs per extractor (best is kept)')
+    args = parser.parse_args()
+
+    print_header("Technology/Skill Extractor Benchmark")
+
+    docs = get_project_root() / 'docs'
+    paths = sorted(docs.rglob('*.md')) if docs.exists() else []
+    contents = [p.read_text(encoding='utf-8', errors='replace') for p in paths]
+    contents += synthetic_documents(args.synthetic)
+    if not contents:
+        print_info("No documents to benchmark (docs/ is empty; try --synthetic N)")
+        return 1
+
+    total_mb = sum(len(c) for c in contents) / (1024 * 1024)
+    print_info(f"Corpus: {len(contents)} documents, {total_mb:.1f} MB")
+
+    differ = sum(1 for c in contents if normalized(legacy_extract(c)) != normalized(extract(c)))
+    print_info(f"Extractor differences: {differ} documents")
+
+    results = [
+        ("legacy (6 regex passes)", best_of(args.repeat, legacy_extract, contents)),
+        ("kb_extract (single pass)", best_of(args.repeat, extract, contents)),
+    ]
+
+    print()
+    baseline = results[0][1]
+    for name, seconds in results:
+        per_doc = seconds / len(contents) * 1e6
+        speedup = baseline / seconds if seconds else float('inf')
+        print(f"  {name:<26} {seconds * 1000:9.2f} ms   {per_doc:8.1f} µs/doc   {speedup:5.1f}x")
+    print()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Frontmatter Parser Microbenchmark
+
+Compares the legacy DOTALL-regex frontmatter parser (previously copied into
+kb_common, auto-index, metrics-dashboard and document_sync) with the shared
+single-pass parser in bin/lib/kb_common.py.
+
+Usage:
+    python tools/kb/bench-frontmatter.py                  # KB + docs corpus
+    python tools/kb/bench-frontmatter.py --synthetic 200  # Add 200 large files
+    python tools/kb/bench-frontmatter.py --repeat 10      # Best of 10 runs
+"""
+
+import re
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Fix Windows console encoding
+if sys.platform == 'win32':
+    try:
+        sys.stdout.reconfigure(encoding='utf-8', errors='replace')
+        sys.stderr.reconfigure(encoding='utf-8', errors='replace')
+    except (AttributeError, OSError):
+        pass
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+# Add KB library (bin/lib) to path for the shared frontmatter parser
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / 'bin' / 'lib'))
+
+from kb_common import parse_frontmatter, read_frontmatter
+
+try:
+    from utils.common import print_info, print_header, get_project_root
+except ImportError:
+    def print_info(msg): print(f"[INFO] {msg}")
+    def print_header(msg): print(f"\n{'='*60}\n{msg}\n{'='*60}")
+    def get_project_root(): return Path.cwd()
+
+
+def legacy_parse(content):
+    """Reference: the regex parser the tools used before kb_common"""
+    metadata = {}
+    match = re.search(r'^---\s*\n(.*?)\n---\s*\n', content, re.DOTALL)
+    if match:
+        for line in match.group(1).split('\n'):
+            if ':' in line:
+                key, value = line.split(':', 1)
+                value = value.strip().strip('"\'')
+                if value.startswith('[') and value.endswith(']'):
+                    value = [v.strip().strip('"\'') for v in value[1:-1].split(',')]
+                metadata[key.strip()] = value
+    return metadata
+
+
+def write_synthetic(directory, count, body_kb=256):
+    """Write entries with small frontmatter and large bodies (design-doc sized)"""
+    body = ("Lorem ipsum dolor sit amet, consectetur adipiscing elit.\n" * 18) * body_kb
+    paths = []
+    for i in range(count):
+        path = directory / f"KB-2026-01-01-{i:03d}-synthetic.md"
+        path.write_text(
+            f'---\ntitle: "Synthetic {i}"\ncategory: performance\npriority: low\n'
+            f'tags: [bench, synthetic]\n---\n\n# Synthetic {i}\n\n{body}',
+            encoding='utf-8'
+        )
+        paths.append(path)
+    return paths
+
+
+def best_of(repeat, func, paths):
+    """Best wall time of `repeat` runs of func over all paths"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for path in paths:
+            func(path)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    """Main entry point."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Benchmark frontmatter parsers')
+    parser.add_argument('--synthetic', type=int, default=0,
+                        help='Add N synthetic entries with large bodies')
+    parser.add_argument('--repeat', type=int, default=5, help='Runs per parser (best is kept)')
+    args = parser.parse_args()
+
+    print_header("Frontmatter Parser Benchmark")
+
+    root = get_project_root()
+    paths = [
+        path
+        for base in (root / '.agent' / 'knowledge-base', root / 'docs')
+        if base.exists()
+        for path in sorted(base.rglob('*.md'))
+    ]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.synthetic:
+            paths += write_synthetic(Path(tmp), args.synthetic)
+
+        contents = [p.read_text(encoding='utf-8', errors='replace') for p in paths]
+        total_mb = sum(len(c) for c in contents) / (1024 * 1024)
+        print_info(f"Corpus: {len(paths)} files, {total_mb:.1f} MB")
+
+        differ = sum(1 for c in contents if legacy_parse(c) != parse_frontmatter(c))
+        print_info(f"Parser differences: {differ} files (block lists, empty [] arrays)")
+
+        by_content = dict(zip(paths, contents))
+        results = [
+            ("legacy regex (in memory)", best_of(args.repeat, lambda p: legacy_parse(by_content[p]), paths)),
+            ("shared parser (in memory)", best_of(args.repeat, lambda p: parse_frontmatter(by_content[p]), paths)),
+            ("read_text + legacy regex", best_of(args.repeat, lambda p: legacy_parse(p.read_text(encoding='utf-8', errors='replace')), paths)),
+            ("read_frontmatter (head only)", best_of(args.repeat, read_frontmatter_safe, paths)),
+        ]
+
+    print()
+    baseline = results[0][1]
+    file_baseline = results[2][1]
+    for i, (name, seconds) in enumerate(results):
+        reference = baseline if i < 2 else file_baseline
+        speedup = reference / seconds if seconds else float('inf')
+        print(f"  {name:<30} {seconds * 1000:9.2f} ms   {speedup:5.1f}x")
+    print()
+    return 0
+
+
+def read_frontmatter_safe(path):
+    """read_frontmatter, ignoring undecodable files like the legacy loop"""
+    try:
+        return read_frontmatter(path)
+    except (OSError, UnicodeDecodeError):
+        return {}
+
+
+if __name__ == '__main__':
+    sys.exit(main())
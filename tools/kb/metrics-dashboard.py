@@ -17,7 +17,6 @@ import sys
 import re
 from pathlib import Path
 from datetime import datetime, timedelta
-from collections import defaultdict
 
 # Fix Windows console encoding
 if sys.platform == 'win32':
@@ -30,6 +29,13 @@ if sys.platform == 'win32':
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+# Add KB library (bin/lib) to path for the KB engine and aggregate store
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / 'bin' / 'lib'))
+
+from kb_common import KBConfig
+from kb_engine import KBEngine
+from kb_aggregates import as_bucket
+
 try:
     from utils.common import print_success, print_error, print_info, print_header, get_project_root
     from utils.kb_manager import get_kb_stats
@@ -42,71 +48,51 @@ except ImportError:
     def get_kb_stats(): return {'total_entries': 0, 'by_category': {}}
 
 
-def parse_yaml_frontmatter(content):
-    """Extract YAML frontmatter from markdown content."""
-    pattern = r'^---\s*\n(.*?)\n---\s*\n'
-    match = re.match(pattern, content, re.DOTALL)
-    
-    if not match:
-        return {}
-    
-    yaml_content = match.group(1)
-    metadata = {}
-    
-    for line in yaml_content.split('\n'):
-        if ':' in line:
-            key, _, value = line.partition(':')
-            key = key.strip()
-            value = value.strip().strip('"').strip("'")
-            if value.startswith('[') and value.endswith(']'):
-                value = [v.strip().strip('"').strip("'") for v in value[1:-1].split(',')]
-            metadata[key] = value
+# Bump when metrics_facts changes, so persisted aggregates are rebuilt
+METRICS_SCHEMA = 'metrics-dashboard/1'
+
+
+def metrics_facts(key, metadata):
+    """Buckets and time saved one KB file contributes to the dashboard."""
+    name = key.rsplit('/', 1)[-1].upper()
+    if name in ['INDEX.MD', 'README.MD']:
+        return None
+    if 'HOW-IT-WORKS' in name or 'AUTO-LEARNING-GUIDE' in name:
+        return None
+    metadata = metadata or {}
+    
+    date = metadata.get('date', '')
+    if not date:
+        date_match = re.search(r'(\d{4}-\d{2}-\d{2})', name)
+        if date_match:
+            date = date_match.group(1)
+    
+    time_saved = metadata.get('time_saved', '0')
+    # Parse time saved (e.g., "2 hours" -> 2)
+    time_match = re.search(r'(\d+)', str(time_saved))
+    hours_saved = int(time_match.group(1)) if time_match else 0
     
-    return metadata
+    return {
+        'date': as_bucket(date) if date else None,
+        'category': as_bucket(metadata.get('category', 'uncategorized')),
+        'priority': as_bucket(metadata.get('priority', 'medium')),
+        'author': as_bucket(metadata.get('author', 'unknown')),
+    }, {'time_saved': hours_saved}
 
 
 def get_kb_metrics(kb_path):
-    """Calculate KB metrics."""
-    entries = []
+    """
+    Load the KB aggregates (counts per date, category, priority, author).
     
-    for md_file in kb_path.rglob('*.md'):
-        if md_file.name.upper() in ['INDEX.MD', 'README.MD']:
-            continue
-        if 'HOW-IT-WORKS' in md_file.name.upper() or 'AUTO-LEARNING-GUIDE' in md_file.name.upper():
-            continue
-        
-        try:
-            content = md_file.read_text(encoding='utf-8')
-            metadata = parse_yaml_frontmatter(content)
-            
-            date = metadata.get('date', '')
-            if not date:
-                date_match = re.search(r'(\d{4}-\d{2}-\d{2})', md_file.name)
-                if date_match:
-                    date = date_match.group(1)
-            
-            time_saved = metadata.get('time_saved', '0')
-            # Parse time saved (e.g., "2 hours" -> 2)
-            time_match = re.search(r'(\d+)', str(time_saved))
-            hours_saved = int(time_match.group(1)) if time_match else 0
-            
-            entries.append({
-                'file': md_file.name,
-                'date': date,
-                'category': metadata.get('category', 'uncategorized'),
-                'priority': metadata.get('priority', 'medium'),
-                'time_saved': hours_saved,
-                'author': metadata.get('author', 'unknown')
-            })
-        except:
-            continue
-    
-    return entries
+    Only files changed since the last run are re-read and re-counted.
+    """
+    engine = KBEngine(KBConfig(kb_path.parent.parent), corpus='documents')
+    return engine.aggregates('aggregates-metrics', metrics_facts, METRICS_SCHEMA)
 
 
-def calculate_metrics(entries):
-    """Calculate comprehensive metrics."""
-    if not entries:
+def calculate_metrics(store):
+    """Calculate comprehensive metrics from the aggregates (O(buckets))."""
+    if not store.count:
         return {}
     
     # Date calculations
@@ -114,40 +100,30 @@ def calculate_metrics(entries):
     week_ago = today - timedelta(days=7)
     month_ago = today - timedelta(days=30)
     
-    # Category breakdown
-    by_category = defaultdict(int)
-    by_priority = defaultdict(int)
-    by_author = defaultdict(int)
-    
     entries_this_week = 0
     entries_this_month = 0
-    total_time_saved = 0
-    
-    for entry in entries:
-        by_category[entry['category']] += 1
-        by_priority[entry['priority']] += 1
-        by_author[entry['author']] += 1
-        total_time_saved += entry['time_saved']
-        
-        if entry['date']:
-            try:
-                entry_date = datetime.strptime(entry['date'], '%Y-%m-%d').date()
-                if entry_date >= week_ago:
-                    entries_this_week += 1
-                if entry_date >= month_ago:
-                    entries_this_month += 1
-            except:
-                pass
+    
+    for date, count in store.table('date').items():
+        try:
+            entry_date = datetime.strptime(date, '%Y-%m-%d').date()
+        except ValueError:
+            continue
+        if entry_date >= week_ago:
+            entries_this_week += count
+        if entry_date >= month_ago:
+            entries_this_month += count
+    
+    total_time_saved = int(store.total('time_saved'))
     
     return {
-        'total_entries': len(entries),
+        'total_entries': store.count,
         'entries_this_week': entries_this_week,
         'entries_this_month': entries_this_month,
-        'by_category': dict(by_category),
-        'by_priority': dict(by_priority),
-        'by_author': dict(by_author),
+        'by_category': store.table('category'),
+        'by_priority': store.table('priority'),
+        'by_author': store.table('author'),
         'total_time_saved': total_time_saved,
-        'avg_time_saved': total_time_saved / len(entries) if entries else 0
+        'avg_time_saved': total_time_saved / store.count
     }
 
 
@@ -325,8 +301,8 @@ def main():
     
     # Get KB entries and metrics
     print_info("Analyzing knowledge base...")
-    entries = get_kb_metrics(kb_path)
-    metrics = calculate_metrics(entries)
+    store = get_kb_metrics(kb_path)
+    metrics = calculate_metrics(store)
     
     print_success(f"Analyzed {metrics['total_entries']} entries")
     
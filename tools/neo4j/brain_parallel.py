@@ -4,7 +4,8 @@
 Parallel Brain Workflow Executor
 
 This script runs all Brain workflow operations in parallel for faster execution.
-Combines LEANN indexing, Neo4j syncs, and document processing into concurrent tasks.
+Combines vector indexing (built-in, plus LEANN if installed), Neo4j syncs, and
+document processing into concurrent tasks.
 
 Usage:
     python brain_parallel.py --setup      # First-time setup (sequential)
@@ -126,6 +127,11 @@ def get_project_root() -> Path:
     """Get the project root directory"""
     return Path(__file__).parent.parent.parent
 
+def vector_index_task() -> Tuple[List[str], str]:
+    """Built-in KB vector index update (local, no external binary or service)"""
+    kb_cli = get_project_root() / "bin" / "kb_cli.py"
+    return [sys.executable, str(kb_cli), "index", "--semantic"], "Update KB Vector Index"
+
 def check_dependencies() -> bool:
     """Check if required dependencies are installed"""
     required = ['neo4j', 'python-dotenv']
@@ -148,6 +154,7 @@ def setup_sequential():
     setup_tasks = [
         (["pip", "install", "-r", str(tools_dir / "requirements.txt")], "Install Python Dependencies"),
         (["python", str(tools_dir / "learning_engine.py"), "--setup"], "Setup Neo4j Learning Schema"),
+        vector_index_task(),
     ]
     
     # Check if LEANN is installed
@@ -156,7 +163,7 @@ def setup_sequential():
         if result.returncode == 0:
             setup_tasks.insert(1, (["leann", "index", "--path", str(project_root)], "Initialize LEANN Index"))
     except FileNotFoundError:
-        print(f"{Colors.YELLOW}  ℹ️  LEANN not installed - skipping vector index{Colors.ENDC}")
+        print(f"{Colors.YELLOW}  ℹ️  LEANN not installed - using the built-in vector index only{Colors.ENDC}")
     
     results = []
     for cmd, name in setup_tasks:
@@ -184,13 +191,14 @@ def sync_parallel(include_leann: bool = True):
         ([sys.executable, str(tools_dir / "document_sync.py"), "--all"], "Sync All Documents to Neo4j"),
     ]
     
-    # Add LEANN update if available
+    # Vector indexes: built-in always, LEANN if available
     if include_leann:
+        parallel_tasks.insert(0, vector_index_task())
         try:
             subprocess.run(["leann", "--version"], capture_output=True, check=True)
             parallel_tasks.insert(0, (["leann", "index", "--update"], "Update LEANN Vector Index"))
         except (subprocess.CalledProcessError, FileNotFoundError):
-            print(f"{Colors.YELLOW}  ℹ️  LEANN not available - skipping vector index update{Colors.ENDC}")
+            print(f"{Colors.YELLOW}  ℹ️  LEANN not available - using the built-in vector index only{Colors.ENDC}")
     
     # Run all tasks in parallel
     start_time = time.time()
@@ -238,7 +246,7 @@ def full_sync():
     # Phase 1: Independent sync tasks (parallel)
     print(f"\n{Colors.BOLD}Phase 1: Parallel Sync Operations{Colors.ENDC}")
     
-    parallel_tasks = []
+    parallel_tasks = [vector_index_task()]
     
     # Check LEANN availability
     try:
@@ -335,8 +343,8 @@ Examples:
                        help='Run full sync with all operations')
     parser.add_argument('--stats', action='store_true',
                        help='View all statistics in parallel')
-    parser.add_argument('--no-leann', action='store_true',
-                       help='Skip LEANN index operations')
+    parser.add_argument('--no-leann', '--no-vectors', action='store_true', dest='no_leann',
+                       help='Skip vector index operations (built-in and LEANN)')
     parser.add_argument('--recommend', type=str,
                        help='Get recommendations for a task description')
     parser.add_argument('--workers', type=int, default=4,
@@ -31,6 +31,11 @@ from dotenv import load_dotenv
 from neo4j import GraphDatabase
 import argparse
 
+# Add KB library (bin/lib) to path for the shared frontmatter parser and chunker
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / 'bin' / 'lib'))
+
+from kb_common import parse_frontmatter, chunk_markdown
+
 # Set UTF-8 encoding for Windows console
 if sys.platform == 'win32':
     try:
@@ -158,20 +163,10 @@ class DocumentSyncNeo4j:
     
     def parse_frontmatter(self, content: str) -> Dict:
         """Parse YAML frontmatter from markdown content"""
-        metadata = {}
-        match = re.match(r'^---\s*\n(.*?)\n---\s*\n', content, re.DOTALL)
-        
-        if match:
-            frontmatter = match.group(1)
-            # Parse YAML-like key: value pairs
-            for line in frontmatter.split('\n'):
-                if ':' in line:
-                    key, value = line.split(':', 1)
-                    key = key.strip().lower().replace('-', '_')
-                    value = value.strip().strip('"\'')
-                    metadata[key] = value
-        
-        return metadata
+        return {
+            key.lower().replace('-', '_'): value
+            for key, value in parse_frontmatter(content).items()
+        }
     
     def extract_title(self, content: str, filename: str) -> str:
         """Extract document title"""
@@ -210,41 +205,12 @@ class DocumentSyncNeo4j:
     
     def chunk_content(self, content: str, chunk_size: int = 1000) -> List[Dict]:
         """Split content into semantic chunks for large documents"""
-        chunks = []
-        
-        # Split by headers first
-        sections = re.split(r'(^##?\s+.+$)', content, flags=re.MULTILINE)
-        
-        current_chunk = ""
-        current_header = ""
-        chunk_index = 0
-        
-        for section in sections:
-            if re.match(r'^##?\s+', section):
-                # This is a header
-                if current_chunk and len(current_chunk) > 100:
-                    chunks.append({
-                        'index': chunk_index,
-                        'header': current_header,
-                        'content': current_chunk[:chunk_size],
-                        'length': len(current_chunk)
-                    })
-                    chunk_index += 1
-                current_header = section.strip()
-                current_chunk = ""
-            else:
-                current_chunk += section
-        
-        # Add last chunk
-        if current_chunk and len(current_chunk) > 100:
-            chunks.append({
-                'index': chunk_index,
-                'header': current_header,
-                'content': current_chunk[:chunk_size],
-                'length': len(current_chunk)
-            })
-        
-        return chunks
+        return [{
+            'index': chunk_index,
+            'header': header,
+            'content': text[:chunk_size],
+            'length': len(text)
+        } for chunk_index, (header, text) in enumerate(chunk_markdown(content))]
     
     def determine_document_type(self, file_path: Path) -> str:
         """Determine document type from file path and name"""
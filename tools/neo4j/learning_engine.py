@@ -32,6 +32,11 @@ from dotenv import load_dotenv
 from neo4j import GraphDatabase
 import argparse
 
+# Add KB library (bin/lib) to path for local semantic search over the KB
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / 'bin' / 'lib'))
+
+from kb_engine import KBEngine
+
 # Set UTF-8 encoding for Windows console
 if sys.platform == 'win32':
     try:
@@ -276,6 +281,9 @@ class LearningEngine:
         # Extract keywords from task description
         keywords = self._extract_keywords(task_description)
         
+        # KB sections similar to the whole description (local vector index)
+        semantic = self.get_semantic_matches(task_description, limit=3)
+        
         with self.driver.session(database=self.database) as session:
             # Search for relevant patterns
             for keyword in keywords[:5]:  # Limit keyword search
@@ -298,6 +306,9 @@ class LearningEngine:
                     rec['source'] = 'pattern'
                     recommendations.append(rec)
             
+            # Ranked by similarity, so ahead of the keyword matches below
+            recommendations.extend(semantic)
+            
             # Search for relevant KB entries
             for keyword in keywords[:3]:
                 result = session.run("""
@@ -341,13 +352,25 @@ class LearningEngine:
         seen = set()
         unique_recs = []
         for rec in recommendations:
-            key = rec.get('pattern_id') or rec.get('kb_id') or rec.get('doc_id')
+            key = rec.get('pattern_id') or rec.get('kb_id') or rec.get('doc_id') or rec.get('path')
             if key not in seen:
                 seen.add(key)
                 unique_recs.append(rec)
         
         return unique_recs[:limit]
     
+    def get_semantic_matches(self, task_description: str, limit: int = 3) -> List[Dict]:
+        """KB documents whose sections are most similar to a task description"""
+        engine = KBEngine()
+        return [{
+            'path': result['path'].relative_to(engine.config.root_dir).as_posix(),
+            'title': result['title'],
+            'category': result['category'],
+            'section': result['context'][0] if result['context'] else '',
+            'similarity': result['score'],
+            'source': 'semantic',
+        } for result in engine.semantic(task_description, limit)]
+    
     def _extract_keywords(self, text: str) -> List[str]:
         """Extract meaningful keywords from text"""
         # Remove common words
@@ -505,6 +528,14 @@ def print_recommendations(recommendations: List[Dict]):
             print(f"     Type: {rec['doc_type']}")
             print(f"     Author: {rec['author']}")
         
+        elif source == 'semantic':
+            print(f"  {i}. [KB] {rec['title']}")
+            print(f"     File: {rec['path']}")
+            print(f"     Section: {rec['section']}")
+            print(f"     Similarity: {rec['similarity']:.2f}")
+            print()
+            continue
+        
         print(f"     Matched: '{rec.get('matched_keyword', 'N/A')}'")
         print()
 
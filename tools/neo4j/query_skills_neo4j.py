@@ -16,7 +16,7 @@ import os
 from dotenv import load_dotenv
 from neo4j import GraphDatabase
 import argparse
-from typing import List, Dict
+from typing import List, Dict, Optional
 
 load_dotenv()
 
@@ -24,12 +24,16 @@ load_dotenv()
 class Neo4jSkillQuery:
     """Query skills from Neo4j knowledge graph"""
     
-    def __init__(self, uri: str, user: str, password: str, database: str = "neo4j"):
-        self.driver = GraphDatabase.driver(uri, auth=(user, password))
+    def __init__(self, uri: Optional[str] = None, user: Optional[str] = None,
+                 password: Optional[str] = None, database: str = "neo4j", driver=None):
+        """Connect, or reuse an open `driver` (left open by close())"""
+        self.owns_driver = driver is None
+        self.driver = driver or GraphDatabase.driver(uri, auth=(user, password))
         self.database = database
     
     def close(self):
-        self.driver.close()
+        if self.owns_driver:
+            self.driver.close()
     
     def get_all_skills(self) -> List[Dict]:
         """Get all skills in the knowledge base"""
@@ -117,6 +121,25 @@ class Neo4jSkillQuery:
             """, query=query)
             return [dict(record) for record in result]
     
+    def search_entries(self, query: str, limit: int = 20) -> List[Dict]:
+        """Search KB entries by title or taught skill, most matching skills first"""
+        with self.driver.session(database=self.database) as session:
+            result = session.run("""
+                MATCH (k:KBEntry)
+                OPTIONAL MATCH (k)-[:TEACHES]->(s:Skill)
+                WITH k, collect(CASE WHEN toLower(s.name) CONTAINS toLower($query)
+                                     THEN s.name END) as skills
+                WHERE size(skills) > 0 OR toLower(k.title) CONTAINS toLower($query)
+                RETURN k.id as id,
+                       k.title as title,
+                       k.category as category,
+                       k.file_path as file_path,
+                       skills
+                ORDER BY size(skills) DESC, title
+                LIMIT $limit
+            """, query=query, limit=limit)
+            return [dict(record) for record in result]
+    
     def get_author_expertise(self, author: str) -> List[Dict]:
         """Get skills by author"""
         with self.driver.session(database=self.database) as session:
@@ -10,19 +10,36 @@ Usage:
     python bin/sync_skills_to_neo4j.py
     python bin/sync_skills_to_neo4j.py --kb-path .agent/knowledge-base
     python bin/sync_skills_to_neo4j.py --dry-run
+    python bin/sync_skills_to_neo4j.py --batch-size 1000
+    python bin/sync_skills_to_neo4j.py --batch-size 0   # one round-trip per node (old path)
+    python bin/sync_skills_to_neo4j.py --full           # ignore the sync manifest
+    python bin/sync_skills_to_neo4j.py --jobs 0         # parse on every CPU
 """
 
 import os
 import re
 import json
 import sys
+import time
+import queue
+import hashlib
+import threading
+from collections import deque
+from collections import defaultdict
+from itertools import combinations
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Set, Tuple
 from dotenv import load_dotenv
 from neo4j import GraphDatabase
 import argparse
 
+# Add KB library (bin/lib) to path for the shared JSON cache helpers and extractor
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / 'bin' / 'lib'))
+
+from kb_common import PARALLEL_MIN_FILES, load_json, resolve_jobs, write_json_atomic
+from kb_extract import extract
+
 # Set UTF-8 encoding for Windows console
 if sys.platform == 'win32':
     try:
@@ -34,21 +51,330 @@ if sys.platform == 'win32':
 # Load environment variables
 load_dotenv()
 
+# Entries written per UNWIND batch (one write transaction each)
+DEFAULT_BATCH_SIZE = 500
+
+# Parsed batches waiting for the writer thread before parsing blocks
+WRITE_QUEUE_DEPTH = 2
+
+# Parse tasks in flight per worker process
+PARSE_TASKS_PER_JOB = 2
+
+MANIFEST_VERSION = 2
+
+# Sync manifest, relative to the KB directory
+MANIFEST_PATH = Path('.cache') / 'neo4j-sync.json'
+
+# Batched writes: each statement takes one row per entry (or per entry item)
+# and runs once per batch, instead of once per entry and item
+ENTRY_ROWS_QUERY = """
+    UNWIND $rows AS row
+    MERGE (k:KBEntry {id: row.id})
+    SET k.title = row.title,
+        k.date = date(row.date),
+        k.category = row.category,
+        k.author = row.author,
+        k.file_path = row.file_path,
+        k.content_length = row.content_length,
+        k.content_hash = row.content_hash,
+        k.updated_at = datetime()
+    MERGE (c:Category {name: row.category})
+    MERGE (k)-[:BELONGS_TO]->(c)
+    MERGE (p:Person {name: row.author})
+    MERGE (p)-[:CREATED]->(k)
+"""
+
+TECHNOLOGY_ROWS_QUERY = """
+    UNWIND $rows AS row
+    MATCH (k:KBEntry {id: row.id})
+    MERGE (t:Technology {name: row.tech})
+    MERGE (k)-[:USES_TECHNOLOGY]->(t)
+"""
+
+SKILL_ROWS_QUERY = """
+    UNWIND $rows AS row
+    MATCH (k:KBEntry {id: row.id})
+    MERGE (s:Skill {name: row.name})
+    SET s.level = row.level,
+        s.source = row.source
+    MERGE (k)-[:TEACHES]->(s)
+"""
+
+TAG_ROWS_QUERY = """
+    UNWIND $rows AS row
+    MATCH (k:KBEntry {id: row.id})
+    MERGE (k)-[:TAGGED_WITH {tag: row.tag}]->(k)
+"""
+
+# Outgoing and authorship edges of changed entries (rewritten from the file)
+CLEAR_ENTRY_EDGES_QUERY = """
+    UNWIND $ids AS id
+    MATCH (k:KBEntry {id: id})
+    OPTIONAL MATCH (k)-[r:BELONGS_TO|USES_TECHNOLOGY|TEACHES|TAGGED_WITH]->()
+    OPTIONAL MATCH (:Person)-[c:CREATED]->(k)
+    WITH collect(r) + collect(c) AS edges
+    UNWIND edges AS edge
+    WITH DISTINCT edge
+    DELETE edge
+"""
+
+DELETE_ENTRIES_QUERY = """
+    UNWIND $ids AS id
+    MATCH (k:KBEntry {id: id})
+    DETACH DELETE k
+"""
+
+# Skills and technologies no entry links to any more
+PRUNE_SKILLS_QUERY = """
+    UNWIND $names AS name
+    MATCH (s:Skill {name: name})
+    WHERE NOT (s)<-[:TEACHES]-(:KBEntry)
+    DETACH DELETE s
+"""
+
+PRUNE_TECHNOLOGIES_QUERY = """
+    UNWIND $names AS name
+    MATCH (t:Technology {name: name})
+    WHERE NOT (t)<-[:USES_TECHNOLOGY]-(:KBEntry)
+    DETACH DELETE t
+"""
+
+# Relationship strengths computed locally (relationship_rows), written as
+# absolute values; pairs that no longer share an entry are deleted
+RELATED_ROWS_QUERY = """
+    UNWIND $rows AS row
+    MATCH (s1:Skill {name: row.source}), (s2:Skill {name: row.target})
+    MERGE (s1)-[r:RELATED_TO]-(s2)
+    SET r.strength = row.strength
+"""
+
+DELETE_RELATED_ROWS_QUERY = """
+    UNWIND $rows AS row
+    MATCH (:Skill {name: row.source})-[r:RELATED_TO]-(:Skill {name: row.target})
+    DELETE r
+"""
+
+REQUIRED_ROWS_QUERY = """
+    UNWIND $rows AS row
+    MATCH (t:Technology {name: row.source}), (s:Skill {name: row.target})
+    MERGE (t)-[r:REQUIRES_SKILL]->(s)
+    SET r.strength = row.strength
+"""
+
+DELETE_REQUIRED_ROWS_QUERY = """
+    UNWIND $rows AS row
+    MATCH (:Technology {name: row.source})-[r:REQUIRES_SKILL]->(:Skill {name: row.target})
+    DELETE r
+"""
+
+# Before rebuilding from an empty manifest: strengths written by older syncs
+CLEAR_SKILL_RELATIONSHIPS_QUERY = """
+    MATCH ()-[r:RELATED_TO|REQUIRES_SKILL]->()
+    DELETE r
+"""
+
+
+def content_hash(content: str) -> str:
+    """SHA-1 of a file's text, stored on its KBEntry node and in the sync manifest"""
+    return hashlib.sha1(content.encode('utf-8')).hexdigest()
+
+
+def batched(items: List, batch_size: int):
+    """Consecutive slices of at most batch_size items"""
+    for start in range(0, len(items), max(1, batch_size)):
+        yield items[start:start + max(1, batch_size)]
+
+
+def batch_rows(entries: List[Dict]) -> List[tuple]:
+    """(query, rows) pairs that write a batch of parsed entries, in dependency order"""
+    entry_fields = ('id', 'title', 'date', 'category', 'author', 'file_path', 'content_length',
+                    'content_hash')
+    return [
+        (ENTRY_ROWS_QUERY, [{field: entry[field] for field in entry_fields} for entry in entries]),
+        (TECHNOLOGY_ROWS_QUERY, [{'id': entry['id'], 'tech': tech}
+                                 for entry in entries for tech in entry['technologies']]),
+        (SKILL_ROWS_QUERY, [{'id': entry['id'], 'name': skill['name'],
+                             'level': skill['level'], 'source': skill['source']}
+                            for entry in entries for skill in entry['skills']]),
+        (TAG_ROWS_QUERY, [{'id': entry['id'], 'tag': tag}
+                          for entry in entries for tag in entry['tags']]),
+    ]
+
+
+def _write_rows(tx, statements: List[tuple]):
+    """Write transaction body: run each non-empty batch statement"""
+    for query, rows in statements:
+        if rows:
+            tx.run(query, rows=rows).consume()
+
+
+def _run_names(tx, queries: List[str], names: List[str]):
+    """Write transaction body: run each query over a list of names"""
+    for query in queries:
+        tx.run(query, names=names).consume()
+
+
+def entry_links(entry: Dict) -> Tuple[List[str], List[str]]:
+    """(skill names, technology names) an entry links to, sorted and distinct"""
+    return (sorted({skill['name'] for skill in entry['skills']}),
+            sorted(set(entry['technologies'])))
+
+
+def relationship_rows(postings: Tuple[Dict[str, Set[str]], Dict[str, Set[str]]],
+                      links: List[Tuple[List[str], List[str]]]) -> Dict[str, List[Dict]]:
+    """
+    Absolute RELATED_TO and REQUIRES_SKILL strengths of the pairs in `links`.
+    
+    `postings` is the sparse entry matrix (skill -> entry ids, technology
+    -> entry ids) of every synced entry; `links` holds the (skills,
+    technologies) of the entries a sync changed, before and after. Only
+    pairs those entries contain are counted, each as the size of the
+    intersection of its two postings, so the work follows the delta.
+    
+    Returns {'related': rows, 'required': rows, 'stale_related': rows,
+    'stale_required': rows}; rows are {'source', 'target', 'strength'},
+    and stale rows are pairs that no longer share an entry.
+    """
+    skill_entries, tech_entries = postings
+    related_pairs, required_pairs = set(), set()
+    for skills, technologies in links:
+        related_pairs.update(combinations(sorted(skills), 2))
+        required_pairs.update((tech, skill) for tech in technologies for skill in skills)
+    
+    rows = {'related': [], 'required': [], 'stale_related': [], 'stale_required': []}
+    for kind, pairs, sources in (('related', related_pairs, skill_entries),
+                                 ('required', required_pairs, tech_entries)):
+        for source, target in sorted(pairs):
+            strength = len(sources.get(source, set()) & skill_entries.get(target, set()))
+            rows[kind if strength else 'stale_' + kind].append(
+                {'source': source, 'target': target, 'strength': strength})
+    return rows
+
+
+class SyncManifest:
+    """
+    Local record of what the last sync wrote to one Neo4j database
+    
+    Maps each file (path relative to the project root) to its size,
+    mtime, content hash, entry id and the skills and technologies it
+    links to (for relationship_rows()). diff() compares it with the files
+    on disk: a file whose size and mtime match is unchanged without being
+    read; otherwise its content hash decides. Stored in
+    .agent/knowledge-base/.cache/neo4j-sync.json together with the
+    target database, so syncing to another database starts over.
+    """
+    
+    def __init__(self, path: Path, target: str, root_dir: Optional[Path] = None):
+        self.path = path
+        self.target = target
+        self.root_dir = root_dir or Path.cwd()
+        # rel_path -> [size, mtime_ns, content_hash, entry_id, skills, technologies]
+        self.files: Dict[str, List] = {}
+        self.load()
+    
+    def load(self) -> bool:
+        """Load the manifest; one for another version or database is ignored"""
+        data = load_json(self.path)
+        if not data or data.get('version') != MANIFEST_VERSION or data.get('target') != self.target:
+            return False
+        self.files = data.get('files', {})
+        return True
+    
+    def save(self):
+        """Persist the manifest"""
+        write_json_atomic(self.path, {
+            'version': MANIFEST_VERSION,
+            'target': self.target,
+            'files': self.files,
+        })
+    
+    def key(self, file_path: Path) -> str:
+        """Manifest key for a file (path relative to the project root)"""
+        try:
+            return file_path.resolve().relative_to(self.root_dir.resolve()).as_posix()
+        except ValueError:
+            return file_path.as_posix()
+    
+    def diff(self, files: List[Path], full: bool = False) -> Dict[str, List]:
+        """
+        Compare the manifest with the files on disk.
+        
+        Returns {'added': [(key, path, content)], 'changed': [...],
+        'removed': [key], 'touched': [key], 'unchanged': count}; 'touched'
+        files only changed mtime and need just record(). With `full`,
+        every recorded file counts as changed.
+        """
+        delta = {'added': [], 'changed': [], 'removed': [], 'touched': [], 'unchanged': 0}
+        current = {self.key(path): path for path in files}
+        delta['removed'] = [key for key in self.files if key not in current]
+        
+        for key, path in current.items():
+            record = self.files.get(key)
+            try:
+                stat = path.stat()
+                if record and not full and record[:2] == [stat.st_size, stat.st_mtime_ns]:
+                    delta['unchanged'] += 1
+                    continue
+                content = path.read_text(encoding='utf-8')
+            except (OSError, UnicodeDecodeError):
+                continue
+            if record and not full and record[2] == content_hash(content):
+                self.record(key, path, record[2], record[3], (record[4], record[5]))
+                delta['touched'].append(key)
+                delta['unchanged'] += 1
+                continue
+            delta['changed' if record else 'added'].append((key, path, content))
+        return delta
+    
+    def record(self, key: str, path: Path, digest: str, entry_id: str,
+               links: Tuple[List[str], List[str]]):
+        """Remember a file as synced, with its entry_links()"""
+        stat = path.stat()
+        self.files[key] = [stat.st_size, stat.st_mtime_ns, digest, entry_id,
+                           list(links[0]), list(links[1])]
+    
+    def entry_id(self, key: str) -> str:
+        """Entry id last synced for a file"""
+        return self.files[key][3]
+    
+    def links(self, key: str) -> Tuple[List[str], List[str]]:
+        """(skills, technologies) last synced for a file"""
+        return self.files[key][4], self.files[key][5]
+    
+    def postings(self) -> Tuple[Dict[str, Set[str]], Dict[str, Set[str]]]:
+        """Sparse entry matrix of all synced files: skill -> entry ids, technology -> entry ids"""
+        skill_entries, tech_entries = defaultdict(set), defaultdict(set)
+        for _, _, _, entry_id, skills, technologies in self.files.values():
+            for skill in skills:
+                skill_entries[skill].add(entry_id)
+            for tech in technologies:
+                tech_entries[tech].add(entry_id)
+        return skill_entries, tech_entries
+
 
 class Neo4jSkillSync:
     """Sync knowledge base skills to Neo4j Cloud"""
     
-    def __init__(self, uri: str, user: str, password: str, database: str = "neo4j"):
-        """Initialize Neo4j connection"""
+    def __init__(self, uri: Optional[str] = None, user: Optional[str] = None,
+                 password: Optional[str] = None, database: str = "neo4j", driver=None):
+        """Initialize Neo4j connection, or reuse an open `driver` (left open by close())"""
+        self.owns_driver = driver is None
+        self.database = database
+        if driver is not None:
+            self.driver = driver
+            self.uri = os.getenv('NEO4J_URI', '')
+            return
+        self.uri = uri
         self.driver = GraphDatabase.driver(
             uri,
             auth=(user, password)
         )
-        self.database = database
         print(f"✅ Connected to Neo4j Cloud: {uri}")
     
     def close(self):
-        """Close Neo4j connection"""
+        """Close Neo4j connection (a shared driver stays open)"""
+        if not self.owns_driver:
+            return
         self.driver.close()
         print("✅ Neo4j connection closed")
     
@@ -88,10 +414,16 @@ class Neo4jSkillSync:
                     if "already exists" not in str(e).lower():
                         print(f"⚠️  Index warning: {e}")
     
-    def parse_kb_entry(self, file_path: Path) -> Optional[Dict]:
-        """Parse knowledge base markdown file"""
+    def target(self) -> str:
+        """Identity of the database synced to (keys the sync manifest)"""
+        return f"{self.uri}#{self.database}"
+    
+    @staticmethod
+    def parse_kb_entry(file_path: Path, content: Optional[str] = None) -> Optional[Dict]:
+        """Parse knowledge base markdown file (`content`: its text, if already read)"""
         try:
-            content = file_path.read_text(encoding='utf-8')
+            if content is None:
+                content = file_path.read_text(encoding='utf-8')
             
             # Extract metadata
             entry_id = file_path.stem
@@ -100,10 +432,11 @@ class Neo4jSkillSync:
             frontmatter_match = re.search(r'^---\s*\n(.*?)\n---\s*\n', content, re.DOTALL)
             if frontmatter_match:
                 frontmatter = frontmatter_match.group(1)
-                title = self._extract_yaml_field(frontmatter, 'title') or file_path.stem
-                date = self._extract_yaml_field(frontmatter, 'date') or datetime.now().strftime('%Y-%m-%d')
-                category = self._extract_yaml_field(frontmatter, 'category') or "Documentation"
-                author = self._extract_yaml_field(frontmatter, 'author') or "@SYSTEM"
+                title = Neo4jSkillSync._extract_yaml_field(frontmatter, 'title') or file_path.stem
+                date = (Neo4jSkillSync._extract_yaml_field(frontmatter, 'date')
+                        or datetime.now().strftime('%Y-%m-%d'))
+                category = Neo4jSkillSync._extract_yaml_field(frontmatter, 'category') or "Documentation"
+                author = Neo4jSkillSync._extract_yaml_field(frontmatter, 'author') or "@SYSTEM"
             else:
                 # Fallback to content parsing
                 title_match = re.search(r'^#\s+(.+)$', content, re.MULTILINE)
@@ -118,13 +451,8 @@ class Neo4jSkillSync:
                 author_match = re.search(r'\*\*Prepared By:\*\*\s+(@\w+)', content)
                 author = author_match.group(1) if author_match else "@SYSTEM"
             
-            # Extract tags
-            tags_match = re.findall(r'#([\w-]+)', content)
-            tags = list(set(tags_match))  # Remove duplicates
-            
-            # Extract technologies/skills mentioned
-            technologies = self._extract_technologies(content)
-            skills = self._extract_skills(content, title)
+            # Technologies, skills and tags, in one scan (kb_extract)
+            found = extract(content)
             
             return {
                 'id': entry_id,
@@ -132,17 +460,19 @@ class Neo4jSkillSync:
                 'date': date,
                 'category': category,
                 'author': author,
-                'tags': tags,
-                'technologies': technologies,
-                'skills': skills,
+                'tags': found['tags'],
+                'technologies': found['technologies'],
+                'skills': found['skills'],
                 'file_path': str(file_path),
-                'content_length': len(content)
+                'content_length': len(content),
+                'content_hash': content_hash(content)
             }
         except Exception as e:
             print(f"❌ Error parsing {file_path}: {e}")
             return None
     
-    def _extract_yaml_field(self, frontmatter: str, field: str) -> Optional[str]:
+    @staticmethod
+    def _extract_yaml_field(frontmatter: str, field: str) -> Optional[str]:
         """Extract field from YAML frontmatter"""
         match = re.search(rf'^{field}:\s*(.+)$', frontmatter, re.MULTILINE)
         if match:
@@ -150,49 +480,6 @@ class Neo4jSkillSync:
             return value
         return None
     
-    def _extract_technologies(self, content: str) -> List[str]:
-        """Extract technology names from content"""
-        tech_patterns = [
-            r'\b(Neo4j|Cypher|AuraDB|Figma|Adobe XD|Sketch|Framer|React|Vue|Angular|Python|JavaScript|TypeScript|Java|Node\.js|HTML|CSS)\b',
-            r'\b(GraphQL|REST|API|SQL|NoSQL|MongoDB|PostgreSQL|Redis|Docker|Kubernetes|AWS|Azure|GCP)\b',
-            r'\b(Git|GitHub|GitLab|CI/CD|Jenkins|Webpack|Vite|Next\.js|Astro|Tailwind|Bootstrap)\b',
-        ]
-        
-        technologies = set()
-        for pattern in tech_patterns:
-            matches = re.findall(pattern, content, re.IGNORECASE)
-            technologies.update(matches)
-        
-        return list(technologies)
-    
-    def _extract_skills(self, content: str, title: str) -> List[Dict]:
-        """Extract skills from content"""
-        skills = []
-        
-        # Extract from headers
-        skill_headers = re.findall(r'###?\s+\d+\.?\d*\.?\s*(.+)', content)
-        for skill in skill_headers[:20]:  # Limit to first 20
-            clean_skill = re.sub(r'[#*`]', '', skill).strip()
-            if len(clean_skill) > 5 and len(clean_skill) < 100:
-                skills.append({
-                    'name': clean_skill,
-                    'level': 'intermediate',
-                    'source': 'header'
-                })
-        
-        # Extract from bullet points with skill indicators
-        skill_bullets = re.findall(r'[-*]\s+\*\*(.+?)\*\*', content)
-        for skill in skill_bullets[:15]:  # Limit to first 15
-            clean_skill = re.sub(r'[:#]', '', skill).strip()
-            if len(clean_skill) > 5 and len(clean_skill) < 100:
-                skills.append({
-                    'name': clean_skill,
-                    'level': 'beginner',
-                    'source': 'bullet'
-                })
-        
-        return skills
-    
     def sync_kb_entry(self, entry: Dict, dry_run: bool = False):
         """Sync single KB entry to Neo4j"""
         if dry_run:
@@ -212,6 +499,7 @@ class Neo4jSkillSync:
                     k.author = $author,
                     k.file_path = $file_path,
                     k.content_length = $content_length,
+                    k.content_hash = $content_hash,
                     k.updated_at = datetime()
             """, **entry)
             
@@ -261,29 +549,56 @@ class Neo4jSkillSync:
             
             print(f"✅ Synced: {entry['title']}")
     
-    def create_skill_relationships(self):
-        """Create relationships between related skills"""
+    def sync_kb_entries(self, entries: List[Dict]):
+        """
+        Sync a batch of parsed KB entries in one write transaction.
+        
+        Writes the same nodes and relationships as sync_kb_entry, with four
+        UNWIND statements per batch instead of a round-trip per node.
+        """
+        if not entries:
+            return
         with self.driver.session(database=self.database) as session:
-            # Connect skills that appear in same KB entry
-            session.run("""
-                MATCH (k:KBEntry)-[:TEACHES]->(s1:Skill)
-                MATCH (k)-[:TEACHES]->(s2:Skill)
-                WHERE s1 <> s2
-                MERGE (s1)-[r:RELATED_TO]-(s2)
-                ON CREATE SET r.strength = 1
-                ON MATCH SET r.strength = r.strength + 1
-            """)
-            
-            # Connect technologies to skills
-            session.run("""
-                MATCH (k:KBEntry)-[:USES_TECHNOLOGY]->(t:Technology)
-                MATCH (k)-[:TEACHES]->(s:Skill)
-                MERGE (t)-[r:REQUIRES_SKILL]->(s)
-                ON CREATE SET r.strength = 1
-                ON MATCH SET r.strength = r.strength + 1
-            """)
-            
-            print("✅ Created skill relationships")
+            session.execute_write(_write_rows, batch_rows(entries))
+    
+    def clear_entries(self, ids: List[str], batch_size: int = DEFAULT_BATCH_SIZE):
+        """Remove the edges of entries about to be rewritten or deleted"""
+        with self.driver.session(database=self.database) as session:
+            for batch in batched(ids, batch_size):
+                session.execute_write(
+                    lambda tx, batch: tx.run(CLEAR_ENTRY_EDGES_QUERY, ids=batch).consume(), batch)
+    
+    def delete_entries(self, ids: List[str], batch_size: int = DEFAULT_BATCH_SIZE):
+        """Delete entry nodes and all their edges (files removed from the KB)"""
+        with self.driver.session(database=self.database) as session:
+            for batch in batched(ids, batch_size):
+                session.execute_write(
+                    lambda tx, batch: tx.run(DELETE_ENTRIES_QUERY, ids=batch).consume(), batch)
+    
+    def prune_orphans(self, linked: Dict[str, set], batch_size: int = DEFAULT_BATCH_SIZE):
+        """Delete skills and technologies (of `linked`) no entry links to any more"""
+        with self.driver.session(database=self.database) as session:
+            for field, query in (('skills', PRUNE_SKILLS_QUERY),
+                                 ('technologies', PRUNE_TECHNOLOGIES_QUERY)):
+                for batch in batched(sorted(linked[field]), batch_size):
+                    session.execute_write(_run_names, [query], batch)
+    
+    def clear_skill_relationships(self):
+        """Delete every RELATED_TO and REQUIRES_SKILL edge (before a rebuild)"""
+        with self.driver.session(database=self.database) as session:
+            session.execute_write(lambda tx: tx.run(CLEAR_SKILL_RELATIONSHIPS_QUERY).consume())
+    
+    def write_skill_relationships(self, rows: Dict[str, List[Dict]],
+                                  batch_size: int = DEFAULT_BATCH_SIZE):
+        """Write relationship_rows(): set absolute strengths, delete stale pairs"""
+        statements = [(RELATED_ROWS_QUERY, rows['related']),
+                      (DELETE_RELATED_ROWS_QUERY, rows['stale_related']),
+                      (REQUIRED_ROWS_QUERY, rows['required']),
+                      (DELETE_REQUIRED_ROWS_QUERY, rows['stale_required'])]
+        with self.driver.session(database=self.database) as session:
+            for query, query_rows in statements:
+                for batch in batched(query_rows, batch_size):
+                    session.execute_write(_write_rows, [(query, batch)])
     
     def get_stats(self) -> Dict:
         """Get knowledge graph statistics"""
@@ -305,6 +620,232 @@ class Neo4jSkillSync:
             }
 
 
+def find_kb_files(kb_path: Path, docs_path: Path):
+    """KB-*.md entries plus docs/ markdown (excluding sprints), with per-source counts"""
+    kb_files = list(kb_path.rglob('KB-*.md'))
+    kb_count = len(kb_files)
+    docs_count = 0
+    
+    if docs_path.exists():
+        for md_file in docs_path.rglob('*.md'):
+            # Skip sprint artifacts
+            if 'sprints' in str(md_file):
+                continue
+            kb_files.append(md_file)
+            docs_count += 1
+    
+    return kb_files, kb_count, docs_count
+
+
+def _parse_chunk(items: List[tuple]) -> List[Optional[Dict]]:
+    """Parse (path, content) pairs (process pool worker)"""
+    return [Neo4jSkillSync.parse_kb_entry(path, content) for path, content in items]
+
+
+def parse_entries(items: List[tuple], jobs: int = 1):
+    """
+    Parse (path, content) pairs, yielding entries (None if unparsable) in order.
+    
+    With several jobs the files are parsed in a process pool, but only
+    PARSE_TASKS_PER_JOB chunks per worker are in flight: a consumer that
+    stops pulling (a full write queue) stops the parsing too. Falls back to
+    the serial path for the remaining files if the pool fails.
+    """
+    done = 0
+    jobs = resolve_jobs(jobs)
+    if jobs > 1 and len(items) >= PARALLEL_MIN_FILES:
+        # Imported on demand, as in kb_common.parse_contents()
+        from concurrent.futures import ProcessPoolExecutor
+        from concurrent.futures.process import BrokenProcessPool
+        chunksize = max(1, len(items) // (jobs * 4))
+        chunks = iter(list(batched(items, chunksize)))
+        try:
+            with ProcessPoolExecutor(max_workers=jobs) as pool:
+                pending = deque(pool.submit(_parse_chunk, chunk)
+                                for chunk in _take(chunks, jobs * PARSE_TASKS_PER_JOB))
+                while pending:
+                    entries = pending.popleft().result()
+                    pending.extend(pool.submit(_parse_chunk, chunk) for chunk in _take(chunks, 1))
+                    for entry in entries:
+                        done += 1
+                        yield entry
+            return
+        except (OSError, NotImplementedError, BrokenProcessPool):
+            pass
+    for path, content in items[done:]:
+        yield Neo4jSkillSync.parse_kb_entry(path, content)
+
+
+def _take(iterator, count: int) -> List:
+    """Up to `count` next items of an iterator"""
+    return [item for _, item in zip(range(count), iterator)]
+
+
+class BatchWriter:
+    """
+    Single writer thread flushing entry batches to Neo4j.
+    
+    put() blocks while WRITE_QUEUE_DEPTH batches are waiting, so parsing
+    cannot run further ahead of the writes; close() waits for the queue to
+    drain and re-raises the first write error.
+    """
+    
+    def __init__(self, sync: Neo4jSkillSync, total: int, depth: int = WRITE_QUEUE_DEPTH):
+        self.sync = sync
+        self.total = total
+        self.written = 0
+        self.error: Optional[BaseException] = None
+        self.queue = queue.Queue(maxsize=depth)
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+    
+    def put(self, batch: List[Dict]):
+        """Queue a batch for writing (blocks while the queue is full)"""
+        if self.error is not None:
+            raise self.error
+        self.queue.put(batch)
+    
+    def close(self):
+        """Write the queued batches and stop the thread"""
+        self.queue.put(None)
+        self.thread.join()
+        if self.error is not None:
+            raise self.error
+    
+    def _run(self):
+        while True:
+            batch = self.queue.get()
+            if batch is None:
+                return
+            if self.error is not None:
+                continue  # keep draining so put() never blocks forever
+            try:
+                self.sync.sync_kb_entries(batch)
+            except Exception as e:
+                self.error = e
+                continue
+            self.written += len(batch)
+            print(f"✅ Synced {self.written}/{self.total} entries")
+
+
+def run_sync(sync: Neo4jSkillSync, kb_path: Path, docs_path: Path, dry_run: bool = False,
+             batch_size: int = DEFAULT_BATCH_SIZE, full: bool = False, jobs: int = 1) -> int:
+    """
+    Sync added, changed and deleted KB + docs entries, then the skill
+    relationships they touch; returns the number of entries written.
+    
+    The sync manifest (SyncManifest) decides which files changed since
+    the last run; with `full` every file is written again. Files are
+    parsed by `jobs` processes (0 = one per CPU) while a BatchWriter
+    thread writes them `batch_size` at a time with UNWIND statements; a
+    batch size of 0 syncs them one by one (sync_kb_entry).
+    """
+    # Create constraints and indexes
+    if not dry_run:
+        print("\n🔧 Setting up database schema...")
+        sync.create_constraints()
+        sync.create_indexes()
+    
+    # Find all KB markdown files from both locations
+    kb_files, kb_count, docs_count = find_kb_files(kb_path, docs_path)
+    
+    print(f"\n📚 Found {len(kb_files)} knowledge base entries")
+    print(f"   - From {kb_path}: {kb_count} entries")
+    print(f"   - From {docs_path}: {docs_count} entries")
+    
+    manifest = SyncManifest(kb_path / MANIFEST_PATH, sync.target())
+    # Without a manifest, relationship strengths are rebuilt from scratch
+    rebuild = full or not manifest.files
+    delta = manifest.diff(kb_files, full=full)
+    pending = delta['added'] + delta['changed']
+    print(f"   - Delta: +{len(delta['added'])} ~{len(delta['changed'])} -{len(delta['removed'])}"
+          f" ({delta['unchanged']} unchanged)")
+    
+    # Entries of deleted files (unless another file now has the same id)
+    current_ids = {path.stem for path in kb_files}
+    removed_ids = sorted({manifest.entry_id(key) for key in delta['removed']} - current_ids)
+    changed_ids = [manifest.entry_id(key) for key, _, _ in delta['changed']]
+    
+    # Skills and technologies of the changed entries, before and after
+    links = [manifest.links(key) for key in [key for key, _, _ in delta['changed']] + delta['removed']]
+    linked = {'skills': {skill for skills, _ in links for skill in skills},
+              'technologies': {tech for _, technologies in links for tech in technologies}}
+    
+    if dry_run:
+        for entry_id in removed_ids:
+            print(f"\n🗑️  [DRY RUN] Would remove: {entry_id}")
+    else:
+        # Old edges of changed and deleted entries; their links are rechecked below
+        sync.clear_entries(changed_ids + removed_ids, batch_size or DEFAULT_BATCH_SIZE)
+        sync.delete_entries(removed_ids, batch_size or DEFAULT_BATCH_SIZE)
+        for key in delta['removed']:
+            del manifest.files[key]
+    
+    # Parse pending entries (in a process pool with several jobs) and hand
+    # them to one writer thread in batches, unless dry run or batch size 0
+    use_batches = batch_size > 0 and not dry_run
+    writer = BatchWriter(sync, len(pending)) if use_batches else None
+    synced_count = 0
+    batch = []
+    start = time.perf_counter()
+    try:
+        parsed = parse_entries([(kb_file, content) for _, kb_file, content in pending], jobs)
+        for (key, kb_file, _), entry in zip(pending, parsed):
+            if not entry:
+                continue
+            synced_count += 1
+            if not dry_run:
+                links.append(entry_links(entry))
+                manifest.record(key, kb_file, entry['content_hash'], entry['id'], links[-1])
+            if writer is None:
+                sync.sync_kb_entry(entry, dry_run=dry_run)
+                continue
+            batch.append(entry)
+            if len(batch) >= batch_size:
+                writer.put(batch)
+                batch = []
+        if batch:
+            writer.put(batch)
+    finally:
+        if writer is not None:
+            writer.close()
+    elapsed = time.perf_counter() - start
+    
+    if not dry_run and synced_count > 0:
+        mode = f"batches of {batch_size}" if use_batches else "one entry at a time"
+        mode += f", {resolve_jobs(jobs)} parse job(s)"
+        rate = synced_count / elapsed if elapsed > 0 else float('inf')
+        print(f"\n⏱️  Entries: {synced_count} in {elapsed:.2f}s ({rate:.1f} entries/sec, {mode})")
+    
+    # Orphaned nodes are pruned; relationships of the pairs the delta touched
+    # are counted from the manifest and written as absolute strengths
+    if not dry_run and (synced_count or removed_ids or changed_ids):
+        sync.prune_orphans(linked, batch_size or DEFAULT_BATCH_SIZE)
+        if rebuild:
+            sync.clear_skill_relationships()
+        rows = relationship_rows(manifest.postings(), links)
+        print(f"\n🔗 Writing {len(rows['related']) + len(rows['required'])} skill relationships"
+              f" ({len(rows['stale_related']) + len(rows['stale_required'])} stale)...")
+        sync.write_skill_relationships(rows, batch_size or DEFAULT_BATCH_SIZE)
+        print("✅ Updated skill relationships")
+    
+    if not dry_run and (pending or delta['removed'] or delta['touched']):
+        manifest.save()
+    
+    # Show final stats
+    if not dry_run:
+        print("\n📊 Final Statistics:")
+        stats = sync.get_stats()
+        print(f"   KB Entries: {stats['kb_entries']}")
+        print(f"   Skills: {stats['skills']}")
+        print(f"   Technologies: {stats['technologies']}")
+        print(f"   Categories: {stats['categories']}")
+    
+    print(f"\n✅ Successfully synced {synced_count} KB entries!"
+          f" ({delta['unchanged']} unchanged, {len(removed_ids)} removed)")
+    return synced_count
+
+
 def main():
     """Main execution function"""
     parser = argparse.ArgumentParser(description='Sync Knowledge Base to Neo4j')
@@ -312,6 +853,13 @@ def main():
     parser.add_argument('--docs-path', default='docs', help='Path to docs directory')
     parser.add_argument('--dry-run', action='store_true', help='Dry run without syncing')
     parser.add_argument('--stats-only', action='store_true', help='Show stats only')
+    parser.add_argument('--full', action='store_true',
+                        help='Write every entry, ignoring the sync manifest')
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+                        help=f'Entries per UNWIND write transaction (default: {DEFAULT_BATCH_SIZE}; '
+                             '0 = one round-trip per node, to compare entries/sec)')
+    parser.add_argument('-j', '--jobs', type=int, default=1,
+                        help='Parallel parse processes feeding the writer (0 = one per CPU)')
     args = parser.parse_args()
     
     # Get Neo4j credentials from environment
@@ -339,61 +887,8 @@ def main():
             print(f"   Categories: {stats['categories']}")
             return
         
-        # Create constraints and indexes
-        if not args.dry_run:
-            print("\n🔧 Setting up database schema...")
-            sync.create_constraints()
-            sync.create_indexes()
-        
-        # Find all KB markdown files from both locations
-        kb_path = Path(args.kb_path)
-        docs_path = Path(args.docs_path)
-        
-        kb_files = []
-        kb_count = 0
-        docs_count = 0
-        
-        # Get KB-*.md files from knowledge base
-        kb_entries = list(kb_path.rglob('KB-*.md'))
-        kb_files.extend(kb_entries)
-        kb_count = len(kb_entries)
-        
-        # Get all markdown files from docs/ (excluding sprints)
-        if docs_path.exists():
-            for md_file in docs_path.rglob('*.md'):
-                # Skip sprint artifacts
-                if 'sprints' in str(md_file):
-                    continue
-                kb_files.append(md_file)
-                docs_count += 1
-        
-        print(f"\n📚 Found {len(kb_files)} knowledge base entries")
-        print(f"   - From {kb_path}: {kb_count} entries")
-        print(f"   - From {docs_path}: {docs_count} entries")
-        
-        # Parse and sync each entry
-        synced_count = 0
-        for kb_file in kb_files:
-            entry = sync.parse_kb_entry(kb_file)
-            if entry:
-                sync.sync_kb_entry(entry, dry_run=args.dry_run)
-                synced_count += 1
-        
-        # Create relationships
-        if not args.dry_run and synced_count > 0:
-            print("\n🔗 Creating skill relationships...")
-            sync.create_skill_relationships()
-        
-        # Show final stats
-        if not args.dry_run:
-            print("\n📊 Final Statistics:")
-            stats = sync.get_stats()
-            print(f"   KB Entries: {stats['kb_entries']}")
-            print(f"   Skills: {stats['skills']}")
-            print(f"   Technologies: {stats['technologies']}")
-            print(f"   Categories: {stats['categories']}")
-        
-        print(f"\n✅ Successfully synced {synced_count} KB entries!")
+        run_sync(sync, Path(args.kb_path), Path(args.docs_path), dry_run=args.dry_run,
+                 batch_size=args.batch_size, full=args.full, jobs=args.jobs)
         
     except Exception as e:
         print(f"\n❌ Error: {e}")
@@ -12,6 +12,7 @@ Usage:
 """
 
 import os
+import re
 import sys
 import json
 import argparse
@@ -19,6 +20,16 @@ from datetime import datetime
 from typing import Dict, List, Optional
 from pathlib import Path
 
+# Add KB library (bin/lib) to path for the KB engine and scan matcher
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / 'bin' / 'lib'))
+
+from kb_common import KBConfig
+from kb_engine import KBEngine
+from kb_scan import LiteralMatcher
+
+# First "# " heading, matched directly on the mapped bytes
+TITLE_PATTERN = re.compile(rb'^# (.*)$', re.MULTILINE)
+
 # Neo4j
 try:
     from neo4j import GraphDatabase
@@ -137,8 +148,13 @@ class ResearchAgent:
         if not self.kb_path.exists():
             return results
         
-        # Extract keywords from task
+        # Extract keywords from task; all keywords are matched in one pass per file
         keywords = self._extract_keywords(task)
+        matcher = LiteralMatcher(keywords)
+        
+        # The KB engine's search index narrows each category to files that
+        # may contain a keyword; only those are mapped and matched
+        engine = KBEngine(KBConfig(self.project_root), corpus='documents')
         
         # Search in relevant categories
         categories = self._get_relevant_categories(task_type)
@@ -148,21 +164,17 @@ class ResearchAgent:
             if not category_path.exists():
                 continue
             
-            # Search markdown files
-            for md_file in category_path.rglob('*.md'):
-                if md_file.name in ['README.md', 'index.md']:
-                    continue
-                
+            for md_file, data in engine.scan(keywords, under=category_path):
                 try:
-                    content = md_file.read_text(encoding='utf-8')
+                    found = matcher.find_terms(data)
                     
                     # Check if any keyword matches
-                    if any(kw.lower() in content.lower() for kw in keywords):
+                    if found:
                         results['entries'].append({
                             'file': str(md_file.relative_to(self.project_root)),
                             'category': category,
-                            'title': self._extract_title(content),
-                            'relevance': self._calculate_relevance(content, keywords)
+                            'title': self._extract_title(data),
+                            'relevance': self._calculate_relevance(found, keywords)
                         })
                         results['found'] = True
                 except Exception as e:
@@ -325,18 +337,16 @@ class ResearchAgent:
         
         return category_map.get(task_type, category_map['general'])
     
-    def _extract_title(self, content: str) -> str:
-        """Extract title from markdown content"""
-        lines = content.split('\n')
-        for line in lines:
-            if line.startswith('# '):
-                return line[2:].strip()
+    def _extract_title(self, data) -> str:
+        """Extract title from (memory-mapped) markdown bytes"""
+        match = TITLE_PATTERN.search(data)
+        if match:
+            return match.group(1).decode('utf-8', errors='replace').strip()
         return 'Untitled'
     
-    def _calculate_relevance(self, content: str, keywords: List[str]) -> float:
-        """Calculate relevance score"""
-        content_lower = content.lower()
-        score = sum(1 for kw in keywords if kw.lower() in content_lower)
+    def _calculate_relevance(self, found: set, keywords: List[str]) -> float:
+        """Calculate relevance score from the keywords found in a file"""
+        score = sum(1 for kw in keywords if kw in found)
         return score / len(keywords) if keywords else 0
     
     def _generate_summary(self, results: Dict) -> Dict:
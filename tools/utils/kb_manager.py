@@ -6,14 +6,33 @@ Handles KB search, creation, and indexing
 
 import os
 import re
+import sys
+import heapq
 import yaml
 from pathlib import Path
 from datetime import datetime
 from .common import (
-    get_project_root, ensure_dir, read_file, write_file,
+    get_project_root, ensure_dir, write_file,
     print_success, print_error, print_info
 )
 
+# The KB engine and shared frontmatter parser live in the KB CLI library (bin/lib)
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / 'bin' / 'lib'))
+
+from kb_common import KBConfig, split_frontmatter
+from kb_engine import KBEngine
+from kb_aggregates import as_bucket
+
+# Bump when kb_stats_facts changes, so persisted aggregates are rebuilt
+KB_STATS_SCHEMA = 'kb-manager-stats/1'
+
+# A `key: value` line whose value YAML loads as the same plain string
+# (no number, date, boolean, null, quoting, comment or nested mapping)
+PLAIN_FRONTMATTER_LINE = re.compile(
+    r'[\w-]+:[ \t]+(?!(?:true|false|yes|no|on|off|null)\s*$)[A-Za-z_/(][^#:\'"\n]*',
+    re.IGNORECASE
+)
+
 
 def get_kb_root():
     """Get knowledge base root directory"""
@@ -25,29 +44,40 @@ def get_kb_index():
     return get_kb_root() / 'INDEX.md'
 
 
+def get_kb_engine():
+    """KB engine over every KB document (all markdown but INDEX.md / README.md)"""
+    return KBEngine(KBConfig(get_project_root()), corpus='documents')
+
+
 def parse_yaml_frontmatter(content):
-    """Parse YAML frontmatter from markdown content"""
-    if not content.startswith('---'):
+    """
+    Parse YAML frontmatter from markdown content
+    
+    Blocks of plain `key: value` lines are taken from the shared flat
+    parser; any other block is loaded with yaml.safe_load, so values keep
+    their YAML types (numbers, dates, booleans, lists).
+    """
+    frontmatter, body = split_frontmatter(content)
+    if frontmatter is None:
         return None, content
     
-    try:
-        # Split content by frontmatter delimiters
-        parts = content.split('---', 2)
-        if len(parts) < 3:
+    lines = content[:len(content) - len(body)].splitlines()[1:-1]
+    if not all(PLAIN_FRONTMATTER_LINE.fullmatch(line.rstrip()) or not line.strip() for line in lines):
+        try:
+            frontmatter = yaml.safe_load('\n'.join(lines))
+        except yaml.YAMLError as e:
+            print_error(f"Failed to parse YAML frontmatter: {str(e)}")
             return None, content
-        
-        # Parse YAML
-        frontmatter = yaml.safe_load(parts[1])
-        body = parts[2].strip()
-        
-        return frontmatter, body
-    except Exception as e:
-        print_error(f"Failed to parse YAML frontmatter: {str(e)}")
-        return None, content
+    return frontmatter, body.strip()
 
 
 def search_kb(query, category=None, priority=None):
-    """Search knowledge base for entries matching query"""
+    """
+    Search knowledge base for entries matching query
+    
+    Title, tags and filters are checked against the cached frontmatter;
+    only files the search index cannot rule out are read for the body.
+    """
     kb_root = get_kb_root()
     results = []
     
@@ -55,44 +85,18 @@ def search_kb(query, category=None, priority=None):
         print_info("Knowledge base not initialized.")
         return results
     
-    # Search in all KB files
-    for kb_file in kb_root.rglob('*.md'):
-        if kb_file.name in ['INDEX.md', 'README.md']:
-            continue
-        
-        content = read_file(kb_file)
-        if not content:
-            continue
-        
-        frontmatter, body = parse_yaml_frontmatter(content)
-        
-        if not frontmatter:
-            continue
-        
-        # Filter by category and priority if specified
-        if category and frontmatter.get('category') != category:
-            continue
-        
-        if priority and frontmatter.get('priority') != priority:
-            continue
-        
-        # Search in title, tags, and body
-        query_lower = query.lower()
-        title = frontmatter.get('title', '').lower()
-        tags = ' '.join(frontmatter.get('tags', [])).lower()
-        body_lower = body.lower()
-        
-        if query_lower in title or query_lower in tags or query_lower in body_lower:
-            results.append({
-                'file': str(kb_file.relative_to(kb_root)),
-                'title': frontmatter.get('title', 'Untitled'),
-                'category': frontmatter.get('category', 'unknown'),
-                'priority': frontmatter.get('priority', 'medium'),
-                'tags': frontmatter.get('tags', []),
-                'date': frontmatter.get('date', 'unknown'),
-                'frontmatter': frontmatter,
-                'body': body
-            })
+    filters = {'category': category, 'priority': priority}
+    for kb_file, frontmatter, body in get_kb_engine().find(query, filters):
+        results.append({
+            'file': str(kb_file.relative_to(kb_root)),
+            'title': frontmatter.get('title', 'Untitled'),
+            'category': frontmatter.get('category', 'unknown'),
+            'priority': frontmatter.get('priority', 'medium'),
+            'tags': frontmatter.get('tags', []),
+            'date': frontmatter.get('date', 'unknown'),
+            'frontmatter': frontmatter,
+            'body': body
+        })
     
     # Sort by priority and date
     priority_order = {'critical': 0, 'high': 1, 'medium': 2, 'low': 3}
@@ -204,19 +208,10 @@ def update_kb_index():
     
     print_info("Updating KB index...")
     
-    # Collect all entries
+    # Collect all entries (frontmatter from the manifest: unchanged files are not read)
     entries_by_category = {}
     
-    for kb_file in kb_root.rglob('*.md'):
-        if kb_file.name in ['INDEX.md', 'README.md']:
-            continue
-        
-        content = read_file(kb_file)
-        if not content:
-            continue
-        
-        frontmatter, _ = parse_yaml_frontmatter(content)
-        
+    for kb_file, frontmatter in get_kb_engine().entries():
         if not frontmatter:
             continue
         
@@ -275,52 +270,40 @@ This index provides a searchable overview of all knowledge base entries.
         return False
 
 
+def kb_stats_facts(key, metadata):
+    """Buckets one KB document contributes to get_kb_stats()"""
+    if not metadata:
+        return None
+    return {
+        'category': as_bucket(metadata.get('category', 'unknown')),
+        'priority': as_bucket(metadata.get('priority', 'medium')),
+    }, {}
+
+
 def get_kb_stats():
-    """Get knowledge base statistics"""
-    kb_root = get_kb_root()
+    """
+    Get knowledge base statistics
     
-    stats = {
-        'total_entries': 0,
-        'by_category': {},
-        'by_priority': {},
-        'recent_entries': []
-    }
-    
-    for kb_file in kb_root.rglob('*.md'):
-        if kb_file.name in ['INDEX.md', 'README.md']:
-            continue
-        
-        content = read_file(kb_file)
-        if not content:
-            continue
-        
-        frontmatter, _ = parse_yaml_frontmatter(content)
-        
-        if not frontmatter:
-            continue
-        
-        stats['total_entries'] += 1
-        
-        # Count by category
-        category = frontmatter.get('category', 'unknown')
-        stats['by_category'][category] = stats['by_category'].get(category, 0) + 1
-        
-        # Count by priority
-        priority = frontmatter.get('priority', 'medium')
-        stats['by_priority'][priority] = stats['by_priority'].get(priority, 0) + 1
-        
-        # Track recent entries
-        stats['recent_entries'].append({
-            'title': frontmatter.get('title', 'Untitled'),
-            'date': frontmatter.get('date', 'unknown'),
-            'category': category
-        })
+    Counts come from a persisted aggregate store that is only updated for
+    files changed since the last call; the recent list is taken from the
+    cached frontmatter, so unchanged files are never read.
+    """
+    engine = get_kb_engine()
+    store = engine.aggregates('aggregates-documents', kb_stats_facts, KB_STATS_SCHEMA)
     
-    # Sort recent entries by date
-    stats['recent_entries'].sort(key=lambda x: x['date'], reverse=True)
-    stats['recent_entries'] = stats['recent_entries'][:10]
+    documents = [metadata for _, metadata in engine.entries() if metadata]
+    recent = heapq.nlargest(10, documents, key=lambda fm: as_bucket(fm.get('date', 'unknown')))
     
-    return stats
+    return {
+        'total_entries': store.count,
+        'by_category': store.table('category'),
+        'by_priority': store.table('priority'),
+        'recent_entries': [{
+            'title': fm.get('title', 'Untitled'),
+            'date': fm.get('date', 'unknown'),
+            'category': fm.get('category', 'unknown')
+        } for fm in recent]
+    }
 
 
 if __name__ == "__main__":